@@ -0,0 +1,154 @@
+"""
+Measures what the lean fetch saves: bytes per event (plain and gzip) and
+JSON parse time for events().list pages with full event resources versus
+pages trimmed to the LEAN_EVENT_FIELDS mask, and the peak memory of
+parsing + formatting a page whole (json.loads) versus streamed
+(JsonStreamNode, STREAM_PARSE).
+
+Full resources are the synthetic events padded with the fields the API
+returns by default (attendees, organizer, reminders, conference data,
+links, etags and timestamps). Live runs report the same numbers per API
+method in the run report (response_bytes, parse_seconds).
+
+Example:
+    python benchmarks/fetch_payload.py --events 20000
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+import tracemalloc
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from benchmarks.synthetic import generate_raw_events
+from src.CalendarNode import event_fields_mask, format_events
+from src.FormatterNode import FormatterNode
+from src.JsonStreamNode import StreamedPage
+
+PAGE_SIZE = 250
+
+
+def full_resource(event, index):
+    """Pads a synthetic event with the fields a default events().list returns."""
+    meeting = f"abc-defg-{index % 1000:03d}"
+    return dict(event, **{
+        'kind': 'calendar#event',
+        'etag': f'"3{index:015d}"',
+        'status': 'confirmed',
+        'htmlLink': f"https://www.google.com/calendar/event?eid=ZXZlbnQ{index:08d}",
+        'created': '2024-12-01T18:22:31.000Z',
+        'updated': '2024-12-03T09:12:44.519Z',
+        'creator': {'email': 'bookings@studio.example.com'},
+        'organizer': {'email': 'bookings@studio.example.com', 'displayName': 'Studio Bookings', 'self': True},
+        'iCalUID': f"{event['id']}@google.com",
+        'sequence': 0,
+        'attendees': [
+            {'email': 'artist@example.com', 'responseStatus': 'accepted'},
+            {'email': 'engineer@studio.example.com', 'responseStatus': 'needsAction'},
+            {'email': 'manager@example.com', 'responseStatus': 'tentative', 'optional': True},
+        ],
+        'reminders': {'useDefault': True},
+        'eventType': 'default',
+        'hangoutLink': f"https://meet.google.com/{meeting}",
+        'conferenceData': {
+            'entryPoints': [{'entryPointType': 'video', 'uri': f"https://meet.google.com/{meeting}",
+                             'label': f"meet.google.com/{meeting}"}],
+            'conferenceSolution': {'key': {'type': 'hangoutsMeet'}, 'name': 'Google Meet',
+                                   'iconUri': 'https://fonts.gstatic.com/s/i/productlogos/meet_2020q4/v6/web-512dp/logo_meet_2020q4_color_2x_web_512dp.png'},
+            'conferenceId': meeting,
+        },
+    })
+
+def lean_fields(mask):
+    """Returns the item fields named in a 'nextPageToken,items(a,b,c)' mask."""
+    return mask[mask.index('items(') + len('items('):-1].split(',')
+
+def pages(events, fields=None):
+    """Serializes events as events().list response pages, optionally projected to `fields`."""
+    bodies = []
+    for offset in range(0, len(events), PAGE_SIZE):
+        items = events[offset:offset + PAGE_SIZE]
+        if fields is None:
+            page = {'kind': 'calendar#events', 'etag': '"p1"', 'summary': 'Studio', 'updated': '2025-01-01T00:00:00Z',
+                    'timeZone': 'America/New_York', 'accessRole': 'owner', 'defaultReminders': [], 'items': items}
+        else:
+            page = {'items': [{key: event[key] for key in fields if key in event} for event in items]}
+        if offset + PAGE_SIZE < len(events):
+            page['nextPageToken'] = f"token{offset}"
+        bodies.append(json.dumps(page).encode())
+    return bodies
+
+def measure(bodies, count, calendar_id, repeat):
+    plain = sum(len(body) for body in bodies)
+    compressed = sum(len(gzip.compress(body)) for body in bodies)
+    best_parse = best_format = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parsed = [json.loads(body) for body in bodies]
+        parse_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        for page in parsed:
+            format_events(page['items'], calendar_id)
+        format_seconds = time.perf_counter() - started
+        best_parse = parse_seconds if best_parse is None else min(best_parse, parse_seconds)
+        best_format = format_seconds if best_format is None else min(best_format, format_seconds)
+    return {
+        'bytes_per_event': plain / count,
+        'gzip_bytes_per_event': compressed / count,
+        'parse_seconds': best_parse,
+        'format_events_seconds': best_format,
+    }
+
+def peak_page_memory(bodies, calendar_id, streamed):
+    """Largest traced peak, in bytes, while parsing and formatting one page."""
+    peak = 0
+    for body in bodies:
+        tracemalloc.start()
+        page = StreamedPage(body) if streamed else json.loads(body)
+        format_events(page.get('items', []), calendar_id)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del page
+    return peak
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare full and lean events().list payloads.")
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    calendar_id, raw = next(iter(generate_raw_events(args.events, calendar_ids=['primary']).items()))
+    full = [full_resource(event, index) for index, event in enumerate(raw)]
+    mask = event_fields_mask(FormatterNode.EVENT_FIELDS)
+
+    results = {
+        'full': measure(pages(full), len(full), calendar_id, args.repeat),
+        'lean': measure(pages(full, lean_fields(mask)), len(full), calendar_id, args.repeat),
+    }
+    print(f"{len(full):,} events, mask: {mask}")
+    print(f"{'':6} {'bytes/event':>12} {'gzip bytes/event':>17} {'parse s':>9} {'format_events s':>16}")
+    for name, r in results.items():
+        print(f"{name:6} {r['bytes_per_event']:>12.0f} {r['gzip_bytes_per_event']:>17.0f} "
+              f"{r['parse_seconds']:>9.4f} {r['format_events_seconds']:>16.4f}")
+    full_bytes, lean_bytes = results['full']['bytes_per_event'], results['lean']['bytes_per_event']
+    print(f"Lean pages are {lean_bytes / full_bytes:.0%} of the full size "
+          f"and parse {results['full']['parse_seconds'] / results['lean']['parse_seconds']:.1f}x faster")
+
+    full_pages = pages(full)
+    results['page_peak_bytes'] = {
+        'loaded': peak_page_memory(full_pages, calendar_id, streamed=False),
+        'streamed': peak_page_memory(full_pages, calendar_id, streamed=True),
+    }
+    peaks = results['page_peak_bytes']
+    print(f"Peak memory per full page: {peaks['loaded'] / 1024:.0f} KiB loaded, "
+          f"{peaks['streamed'] / 1024:.0f} KiB streamed")
+    return results
+
+if __name__ == "__main__":
+    main()
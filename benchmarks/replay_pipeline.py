@@ -0,0 +1,80 @@
+"""
+Times the whole process_pipeline offline, replaying a cassette of real API
+traffic (TransportNode.CassettePlayer) instead of calling Google.
+
+Record a cassette once with real credentials (tokens and secrets are
+scrubbed; event text is kept, so treat cassettes like exports):
+    python cli.py --range 2024-12-01:2024-12-31 --record benchmarks/cassettes/dec.jsonl.gz
+
+Then replay it as often as needed, at full speed or with the recorded
+response times (--timing 1):
+    python benchmarks/replay_pipeline.py benchmarks/cassettes/dec.jsonl.gz --repeat 3
+    python benchmarks/replay_pipeline.py benchmarks/cassettes/dec.jsonl.gz --timing 1 --overlapped
+
+The ranges default to the ones stored in the cassette. The local warehouse
+is redirected to a temporary file so replays leave sessions.db alone.
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+def run_once(path, ranges, timing, overlapped):
+    """Replays every range through process_pipeline; returns (seconds, requests replayed, summaries)."""
+    from src.Controller import process_pipeline
+    from src.ServiceNode import RateLimiter, ServicePool
+    from src.TransportNode import CassettePlayer
+
+    player = CassettePlayer(path, timing)
+    services = ServicePool(RateLimiter(rate=0), transport=player)
+    summaries = []
+    started = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for start_date, end_date in ranges:
+            summaries.append(process_pipeline(start_date, end_date, services=services,
+                                              overlapped=overlapped, report_dir=None))
+    return time.perf_counter() - started, player.replayed, summaries
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded API traffic through the whole pipeline.")
+    parser.add_argument("cassette")
+    parser.add_argument("--range", dest="ranges", action="append", default=[], metavar="START[:END]",
+                        help="Range to run; defaults to the ranges stored in the cassette. Repeatable.")
+    parser.add_argument("--timing", type=float, default=0.0,
+                        help="Fraction of each recorded response time to wait (0 = full speed, 1 = original)")
+    parser.add_argument("--overlapped", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="replay-")
+    os.environ['WAREHOUSE_FILE'] = os.path.join(tmp, 'sessions.db')
+    from src.TransportNode import load_cassette_meta
+
+    ranges = [tuple(r.partition(':')[::2]) for r in args.ranges]
+    ranges = [(start, end or None) for start, end in ranges] or \
+        [tuple(r) for r in load_cassette_meta(args.cassette).get('ranges', [])]
+    if not ranges:
+        parser.error("the cassette stores no ranges; give --range")
+
+    timings = []
+    for _ in range(args.repeat):
+        seconds, replayed, summaries = run_once(args.cassette, ranges, args.timing, args.overlapped)
+        timings.append(seconds)
+    rows = sum(s['rows'] for s in summaries)
+    print(f"{len(ranges)} range(s), {rows} rows, {replayed} requests replayed "
+          f"(timing {args.timing:g}, {'overlapped' if args.overlapped else 'staged'})")
+    print(f"process_pipeline: median {statistics.median(timings):.3f}s, "
+          f"min {min(timings):.3f}s over {len(timings)} run(s)")
+    return {'seconds': timings, 'rows': rows, 'requests': replayed}
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Benchmarks the pipeline stages on synthetic events.
+
+Times CalendarNode.format_events, FormatterNode.sort_events_chronologically,
+FormatterNode.format_data and the sheet writes (write_data_to_sheet and
+write_rows_in_chunks against a stub service that JSON-encodes each request
+body, as the API client would) for each requested size. Results are saved
+as JSON in benchmarks/results/ and compared with the previous run.
+
+Examples:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 1000000 --repeat 1
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/20250401-120000.json
+"""
+import argparse
+import contextlib
+import gc
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from benchmarks.synthetic import generate_raw_events
+from src.CalendarNode import format_events
+from src.FormatterNode import FormatterNode
+from src.SheetNode import write_data_to_sheet, write_rows_in_chunks
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+class StubSheetsService:
+    """Stands in for the Sheets service: encodes each request body like the client, without any I/O."""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def clear(self, **kwargs):
+        return self._request(kwargs.get('body', {}), cells=0)
+
+    def update(self, **kwargs):
+        body = kwargs['body']
+        return self._request(body, cells=sum(len(row) for row in body['values']))
+
+    def _request(self, body, cells):
+        service = self
+
+        class Request:
+            def execute(self):
+                service.requests += 1
+                service.bytes += len(json.dumps(body))
+                return {'updatedCells': cells, 'updatedRows': len(body.get('values', []))}
+        return Request()
+
+
+def time_call(function, repeat, *args):
+    """Runs function(*args) `repeat` times with stdout silenced; returns (seconds per run, last result)."""
+    timings = []
+    result = None
+    with open(os.devnull, 'w') as devnull:
+        for _ in range(repeat):
+            gc.collect()
+            with contextlib.redirect_stdout(devnull):
+                started = time.perf_counter()
+                result = function(*args)
+                timings.append(time.perf_counter() - started)
+    return timings, result
+
+def benchmark_size(size, repeat, seed):
+    """Runs every stage on `size` synthetic events; returns one result dict per stage."""
+    raw_by_calendar = generate_raw_events(size, seed=seed)
+    formatter = FormatterNode()
+    results = []
+
+    def record(stage, timings):
+        best = min(timings)
+        results.append({
+            'size': size,
+            'stage': stage,
+            'best_seconds': best,
+            'mean_seconds': statistics.fmean(timings),
+            'events_per_second': size / best if best else None,
+        })
+
+    timings, events = time_call(
+        lambda raw_by_calendar: [e for calendar_id, raw in raw_by_calendar.items()
+                                 for e in format_events(raw, calendar_id)],
+        repeat, raw_by_calendar
+    )
+    record('format_events', timings)
+    del raw_by_calendar
+
+    timings, _ = time_call(formatter.sort_events_chronologically, repeat, events)
+    record('sort_events_chronologically', timings)
+
+    timings, rows = time_call(formatter.format_data, repeat, events)
+    record('format_data', timings)
+    del events
+
+    timings, _ = time_call(lambda rows: write_data_to_sheet(StubSheetsService(), 'bench', 'Bench', rows), repeat, rows)
+    record('write_data_to_sheet', timings)
+
+    timings, _ = time_call(lambda rows: write_rows_in_chunks(StubSheetsService(), 'bench', 'Bench', rows), repeat, rows)
+    record('write_rows_in_chunks', timings)
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def latest_result():
+    """Returns the path of the most recent saved result, or None."""
+    paths = sorted(glob.glob(str(RESULTS_DIR / "*.json")))
+    return paths[-1] if paths else None
+
+def print_results(results, baseline=None):
+    previous = {}
+    if baseline:
+        previous = {(r['size'], r['stage']): r['best_seconds'] for r in baseline['results']}
+    print(f"{'events':>9}  {'stage':<28} {'best s':>10} {'events/s':>12}  {'vs baseline':>11}")
+    for r in results:
+        before = previous.get((r['size'], r['stage']))
+        change = f"{r['best_seconds'] / before:>10.2f}x" if before else ""
+        rate = f"{r['events_per_second']:>12,.0f}" if r['events_per_second'] else f"{'-':>12}"
+        print(f"{r['size']:>9,}  {r['stage']:<28} {r['best_seconds']:>10.4f} {rate}  {change:>11}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic events.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Event counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; the best is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", help="Result file to compare against (default: the latest saved run)")
+    parser.add_argument("--no-save", action="store_true", help="Do not save this run's results")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        print(f"Benchmarking {size:,} events...", flush=True)
+        results.extend(benchmark_size(size, max(1, args.repeat), args.seed))
+
+    baseline_path = args.compare or latest_result()
+    baseline = None
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        print(f"Comparing with {baseline_path} ({baseline.get('commit') or 'unknown commit'})")
+    print_results(results, baseline)
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+        with open(path, 'w') as f:
+            json.dump({
+                'run_at': datetime.now().isoformat(timespec='seconds'),
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+                'repeat': args.repeat,
+                'results': results,
+            }, f, indent=2)
+        print(f"Saved results to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Synthetic Calendar API events for benchmarks.
+
+Generates events shaped like the items of an events().list response, with
+the variety the formatter has to cope with: recurring sessions,
+one-off bookings, all-day blocks, prices and engineer names in several
+formats, referrals, and start times in several timezone offsets.
+"""
+import random
+from datetime import datetime, timedelta
+
+
+ARTISTS = [
+    "Nova Reyes", "Lil Cassette", "The Marrows", "DJ Kettle", "Amara Blue",
+    "Sonny Vale", "Quiet Harbor", "Kid Meridian", "Juno Park", "Velvet Static",
+]
+
+# Summary formats recognised by FormatterNode.format_artist
+SUMMARY_FORMATS = [
+    "Session w/ {artist}",
+    "Recording session for {artist}",
+    "{artist}: vocals + comping",
+    "{artist}",
+]
+
+# Description formats covering the price, engineer and referral patterns
+DESCRIPTION_FORMATS = [
+    "{engineer} {price}",
+    "{price} {engineer}",
+    "${price} paid, engineer {engineer}",
+    "{price}$ ref: {referrer}",
+    "{price} usd mixing with {engineer}",
+    "mastering {price} dollars",
+    "recording, {engineer} on deck",
+    "deposit {price}, referral {referrer}",
+    "",
+]
+
+ENGINEERS = ["John", "Jaylun", "Aaron", "Chris", "Guest"]
+REFERRERS = ["Mike", "Tasha", "Deon"]
+OFFSETS = ["Z", "-05:00", "-04:00", "+00:00", "+01:00", "-08:00"]
+CALENDAR_IDS = [
+    "primary",
+    "fe8846449c91e6dbd1177a8d1d29cd4e57ad901e44d4262f5fc865cc1720c95e@group.calendar.google.com",
+]
+
+# Share of events that are instances of a recurring series, and all-day blocks
+RECURRING_SHARE = 0.4
+ALL_DAY_SHARE = 0.03
+
+
+def _description(rng):
+    return rng.choice(DESCRIPTION_FORMATS).format(
+        engineer=rng.choice(ENGINEERS),
+        price=rng.choice([50, 75, 80, 100, 120, 150, 200, 250, 300, 450]),
+        referrer=rng.choice(REFERRERS),
+    )
+
+def _timed(start, hours, offset):
+    end = start + timedelta(hours=hours)
+    return (
+        {'dateTime': start.strftime("%Y-%m-%dT%H:%M:%S") + offset},
+        {'dateTime': end.strftime("%Y-%m-%dT%H:%M:%S") + offset},
+    )
+
+def generate_raw_events(count, seed=0, start=datetime(2024, 1, 1), calendar_ids=CALENDAR_IDS):
+    """
+    Returns `count` raw API events split across calendars, keyed by calendar id.
+
+    Events fill four session slots a day per calendar from `start`, and
+    each calendar's list is in slot order, like an orderBy='startTime'
+    response. The same seed always produces the same events.
+
+    Args:
+        count (int): Total number of events, split evenly across calendars
+        seed (int): Random seed
+        start (datetime): First day of the generated range
+        calendar_ids (list): Calendars to generate events for
+
+    Returns:
+        dict: calendar_id -> list of raw event dicts
+    """
+    rng = random.Random(seed)
+    per_calendar = [count // len(calendar_ids)] * len(calendar_ids)
+    per_calendar[0] += count - sum(per_calendar)
+    events_by_calendar = {}
+
+    for calendar_index, (calendar_id, total) in enumerate(zip(calendar_ids, per_calendar)):
+        series = []
+        events = []
+        for index in range(total):
+            day = start + timedelta(days=index // 4)
+            hour = 10 + (index % 4) * 3
+            if rng.random() < ALL_DAY_SHARE:
+                event_start = {'date': day.strftime("%Y-%m-%d")}
+                event_end = {'date': (day + timedelta(days=1)).strftime("%Y-%m-%d")}
+                event = {
+                    'id': f"c{calendar_index}e{index}",
+                    'summary': "Studio maintenance",
+                    'start': event_start,
+                    'end': event_end,
+                }
+            elif series and rng.random() < RECURRING_SHARE:
+                # Another instance of an existing series, at this slot
+                master = rng.choice(series)
+                event_start, event_end = _timed(day.replace(hour=hour), master['hours'], master['offset'])
+                event = {
+                    'id': f"{master['id']}_{day:%Y%m%d}T{hour:02d}0000Z",
+                    'recurringEventId': master['id'],
+                    'summary': master['summary'],
+                    'description': master['description'],
+                    'start': event_start,
+                    'end': event_end,
+                }
+            else:
+                hours = rng.choice([1, 2, 2, 3, 4])
+                offset = rng.choice(OFFSETS)
+                summary = rng.choice(SUMMARY_FORMATS).format(artist=rng.choice(ARTISTS))
+                description = _description(rng)
+                event_start, event_end = _timed(day.replace(hour=hour), hours, offset)
+                event = {
+                    'id': f"c{calendar_index}e{index}",
+                    'summary': summary,
+                    'description': description,
+                    'start': event_start,
+                    'end': event_end,
+                }
+                if len(series) < 50:
+                    series.append({'id': event['id'], 'summary': summary, 'description': description,
+                                   'hours': hours, 'offset': offset})
+            events.append(event)
+        events_by_calendar[calendar_id] = events
+    return events_by_calendar
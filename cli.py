@@ -0,0 +1,294 @@
+"""
+Headless command-line entry point for the calendar pipeline.
+
+Runs process_pipeline for one or more date ranges, concurrently, sharing one
+set of credentials and one API request budget, and prints one JSON line per
+range followed by a JSON summary line. Suitable for cron: stdout holds only
+the JSON lines, and everything the pipeline prints goes to stderr. With --tenants,
+every range is run for every studio location in the tenants file; a failing
+tenant does not stop the others.
+
+Examples:
+    python cli.py --range 2025-01-01:2025-01-15 --range 2025-01-16:2025-01-31
+    python cli.py --months 2024-01 2024-12 --workers 3
+    python cli.py --months 2025-01 2025-03 --tenants tenants.json
+    python cli.py --months 2024-01 2024-12 --batched
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from config.settings import BACKFILL_WORKERS, API_RATE_LIMIT, API_RATE_BURST, TENANTS_FILE
+
+
+def parse_range(value):
+    """Parses 'START[:END]' into (start_date, end_date); END defaults to end of month."""
+    start_date, _, end_date = value.partition(':')
+    try:
+        datetime.strptime(start_date, "%Y-%m-%d")
+        if end_date:
+            datetime.strptime(end_date, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not START[:END] in YYYY-MM-DD format")
+    return start_date, end_date or None
+
+def month_ranges(first_month, last_month):
+    """Returns one (first day, None) range per month from first_month to last_month (YYYY-MM), inclusive."""
+    first = datetime.strptime(first_month, "%Y-%m")
+    last = datetime.strptime(last_month, "%Y-%m")
+    if last < first:
+        raise ValueError(f"{last_month} is before {first_month}")
+    ranges = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        ranges.append((f"{year:04d}-{month:02d}-01", None))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return ranges
+
+def prefetch_batched(ranges, tenants, services):
+    """
+    Fetches every (tenant, range, calendar) with batched list requests and
+    creates every target and summary sheet with batched metadata calls,
+    before any range is processed.
+
+    Returns:
+        tuple: (prefetched, ready, stats) where prefetched maps
+            (tenant name or None, start_date, end_date) to that run's events,
+            ready holds the same keys for runs whose sheets all exist, and
+            stats counts the batch round trips and requests made. Runs with
+            a calendar that failed in the batch are left out of prefetched
+            and fetch on their own, so they never write partial data.
+    """
+    from src.BatchNode import BatchFetchError, fetch_event_lists, ensure_sheets
+    from src.CalendarNode import parse_date, calculate_end_date, format_dates_for_api, format_events
+    from src.Controller import DEFAULT_SPREADSHEET_ID, sheet_name_for
+    from src.TenantNode import default_tenant
+
+    jobs = {}
+    for tenant in tenants or [None]:
+        resolved = tenant or default_tenant(DEFAULT_SPREADSHEET_ID)
+        for start_date, end_date in ranges:
+            jobs[(tenant.name if tenant else None, start_date, end_date)] = resolved
+
+    queries = {}
+    targets = {}
+    for key, tenant in jobs.items():
+        _, start_date, end_date = key
+        start_date_obj = parse_date(start_date)
+        time_min, time_max = format_dates_for_api(start_date_obj, calculate_end_date(start_date_obj, end_date))
+        for calendar_id in tenant.calendar_ids:
+            queries[key + (calendar_id,)] = (calendar_id, time_min, time_max)
+        sheet_name = sheet_name_for(start_date, end_date)
+        targets.setdefault(tenant.spreadsheet_id, []).extend([sheet_name, f"{sheet_name}_summary"])
+
+    try:
+        items, stats = fetch_event_lists(services.calendar(), queries, limiter=services.limiter)
+        failed = set()
+    except BatchFetchError as e:
+        items, stats, failed = e.items, e.stats, {key[:3] for key in e.errors}
+    created, sheet_round_trips = ensure_sheets(services.sheets(), targets, limiter=services.limiter)
+
+    prefetched = {}
+    ready = set()
+    for key, tenant in jobs.items():
+        if key not in failed:
+            events = []
+            for calendar_id in tenant.calendar_ids:
+                events.extend(format_events(items[key + (calendar_id,)], calendar_id))
+            prefetched[key] = events
+        sheet_name = sheet_name_for(key[1], key[2])
+        if {(tenant.spreadsheet_id, sheet_name), (tenant.spreadsheet_id, f"{sheet_name}_summary")} <= created:
+            ready.add(key)
+    stats = {
+        'calendar_round_trips': stats['round_trips'],
+        'calendar_requests': stats['requests'],
+        'calendar_retries': stats['retries'],
+        'calendar_failed_runs': len(failed),
+        'sheets_round_trips': sheet_round_trips,
+    }
+    return prefetched, ready, stats
+
+def run_ranges(ranges, workers=BACKFILL_WORKERS, services=None, export_dir=None, pipeline=None,
+               overlapped=False, profile=False, tenants=None, prefetched=None, sheets_ready=()):
+    """
+    Runs the pipeline for every range with at most `workers` in flight.
+
+    Args:
+        ranges (list): (start_date, end_date) tuples
+        workers (int): Maximum concurrent ranges
+        services (ServicePool, optional): Shared services and request budget
+        export_dir (str, optional): Also export each range's rows as CSV here
+        pipeline (callable, optional): Pipeline to run, defaults to process_pipeline
+        overlapped (bool): Overlap fetch, format and write within each range
+        profile (bool): Write per-stage CPU and memory profiles for each range
+        tenants (list, optional): Tenants to run every range for; the default
+            single location if omitted
+        prefetched (dict, optional): Events per (tenant name, start, end), see
+            prefetch_batched; those runs skip their own fetch
+        sheets_ready (set): (tenant name, start, end) runs whose sheets exist
+
+    Yields:
+        dict: One result per range, in completion order
+    """
+    if pipeline is None:
+        from src.Controller import process_pipeline as pipeline
+
+    def run(tenant, start_date, end_date):
+        started = time.perf_counter()
+        result = {'start_date': start_date, 'end_date': end_date}
+        kwargs = {'overlapped': True} if overlapped else {}
+        if profile:
+            kwargs['profile'] = True
+        if services is not None:
+            kwargs['services'] = services
+        if tenant is not None:
+            kwargs['tenant'] = tenant
+            result['tenant'] = tenant.name
+        key = (tenant.name if tenant is not None else None, start_date, end_date)
+        if prefetched is not None and key in prefetched:
+            kwargs['prefetched'] = prefetched[key]
+        if key in sheets_ready:
+            kwargs['sheets_ready'] = True
+        if export_dir:
+            prefix = f"{tenant.name}_" if tenant is not None else ""
+            kwargs['export_path'] = f"{export_dir}/{prefix}{start_date}_{end_date or 'EOM'}_combined.csv"
+        try:
+            result.update(pipeline(start_date, end_date, **kwargs))
+            result['status'] = 'ok'
+        except Exception as e:
+            result['status'] = 'error'
+            result['error'] = f"{type(e).__name__}: {e}"
+        result['seconds'] = round(time.perf_counter() - started, 3)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [
+            executor.submit(run, tenant, start_date, end_date)
+            for tenant in (tenants or [None])
+            for start_date, end_date in ranges
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process calendar date ranges into Google Sheets without the GUI.")
+    parser.add_argument("--range", dest="ranges", action="append", type=parse_range, default=[],
+                        metavar="START[:END]", help="Date range; END defaults to end of month. Repeatable.")
+    parser.add_argument("--months", nargs=2, metavar=("FIRST", "LAST"),
+                        help="Every month from FIRST to LAST (YYYY-MM), inclusive")
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS, help="Ranges processed concurrently")
+    parser.add_argument("--rate", type=float, default=API_RATE_LIMIT, help="Shared API requests per second (0 = unlimited)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--overlapped", action="store_true",
+                      help="Overlap fetching, formatting and writing within each range")
+    mode.add_argument("--batched", action="store_true",
+                      help="Fetch all ranges and create all sheets up front with batched API requests")
+    mode.add_argument("--export-only", action="store_true",
+                      help="Only export each range to --export-dir, sorting on a memory budget (SORT_SPILL_EVENTS)")
+    parser.add_argument("--export-dir", help="Also export each range's rows as CSV into this directory")
+    parser.add_argument("--tenants", nargs="?", const=TENANTS_FILE, metavar="FILE",
+                        help=f"Run every range for every tenant in FILE (default {TENANTS_FILE})")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="CASSETTE",
+                          help="Record every API exchange, secrets scrubbed, to this .jsonl.gz file")
+    cassette.add_argument("--replay", metavar="CASSETTE",
+                          help="Answer every API request from a recorded cassette, without the network")
+    parser.add_argument("--replay-timing", type=float, default=0.0, metavar="FRACTION",
+                        help="With --replay, wait this fraction of each recorded response time (1 = original)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write per-stage CPU profiles and allocation reports (also STUDIO_PROFILE=1)")
+    args = parser.parse_args(argv)
+
+    ranges = list(args.ranges)
+    if args.months:
+        try:
+            ranges.extend(month_ranges(*args.months))
+        except ValueError as e:
+            parser.error(str(e))
+    if not ranges:
+        parser.error("give at least one --range or --months")
+    if args.export_only and (not args.export_dir or args.profile):
+        parser.error("--export-only needs --export-dir and doesn't support --profile")
+    if args.profile and args.workers > 1:
+        # cProfile can't profile concurrent ranges (one profiler per process on 3.12+)
+        print("--profile runs one range at a time", file=sys.stderr)
+        args.workers = 1
+
+    # stdout is kept for the JSON lines; the pipeline's own prints go to stderr
+    out = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        return run_command(args, ranges, parser, out)
+
+def run_command(args, ranges, parser, out):
+    """
+    Runs `ranges` for a parsed command line, writing one JSON line per range
+    and a summary line to `out`.
+
+    Returns:
+        int: Exit code, 1 if any range failed
+    """
+    def emit(record):
+        print(json.dumps(record), file=out, flush=True)
+
+    tenants = None
+    if args.tenants:
+        from src.TenantNode import load_tenants
+        try:
+            tenants = load_tenants(args.tenants)
+        except (OSError, ValueError) as e:
+            parser.error(f"could not load tenants from {args.tenants}: {e}")
+
+    from src.ServiceNode import RateLimiter, ServicePool
+    from src.TransportNode import default_transport
+    transport, rate = None, args.rate
+    if args.record:
+        transport = default_transport('record', args.record, meta={'ranges': ranges})
+    elif args.replay:
+        # Replayed responses cost no quota; the cassette sets the pace
+        transport, rate = default_transport('replay', args.replay, args.replay_timing), 0
+    services = ServicePool(RateLimiter(rate, API_RATE_BURST), transport=transport).authenticate()
+    if args.export_dir:
+        import os
+        os.makedirs(args.export_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    prefetched, ready, batch_stats = None, set(), None
+    if args.batched:
+        prefetched, ready, batch_stats = prefetch_batched(ranges, tenants, services)
+        emit({'prefetch': True, **batch_stats, 'seconds': round(time.perf_counter() - started, 3)})
+
+    results = []
+    pipeline = None
+    if args.export_only:
+        from src.Controller import export_range as pipeline
+    for result in run_ranges(ranges, args.workers, services, args.export_dir, pipeline=pipeline,
+                             overlapped=args.overlapped, profile=args.profile, tenants=tenants,
+                             prefetched=prefetched, sheets_ready=ready):
+        results.append(result)
+        emit(result)
+
+    failed = sum(1 for r in results if r['status'] != 'ok')
+    by_tenant = {}
+    for r in results:
+        if 'tenant' in r:
+            counts = by_tenant.setdefault(r['tenant'], {'succeeded': 0, 'failed': 0})
+            counts['succeeded' if r['status'] == 'ok' else 'failed'] += 1
+    emit({
+        'summary': True,
+        'ranges': len(results),
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'events': sum(r.get('events', 0) for r in results),
+        'rows': sum(r.get('rows', 0) for r in results),
+        'seconds': round(time.perf_counter() - started, 3),
+        **({'tenants': by_tenant} if by_tenant else {}),
+        **({'batch': batch_stats} if batch_stats else {}),
+    })
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
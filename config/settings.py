@@ -32,6 +32,9 @@ SECOND_CALENDAR_ID = os.getenv('SECOND_CALENDAR_ID', '')
 # Spreadsheet ID
 SPREADSHEET_ID = os.getenv('SPREADSHEET_ID', '')
 
+# Multi-location setup: one entry per tenant (calendars, studio names, spreadsheet)
+TENANTS_FILE = os.getenv('TENANTS_FILE', str(BASE_DIR / 'tenants.json'))
+
 # Studio mapping
 STUDIO_MAP = {
     "primary": os.getenv('STUDIO_A_NAME', 'Studio A'),
@@ -41,6 +44,100 @@ STUDIO_MAP = {
 # Engineer names for recognition
 ENGINEER_NAMES = ['john', 'jaylun', 'aaron', 'chris']
 
+# Offline exports
+EXPORT_DIR = BASE_DIR / "exports"
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '500'))
+
+# Local session warehouse
+WAREHOUSE_FILE = os.getenv('WAREHOUSE_FILE', str(BASE_DIR / 'sessions.db'))
+
+# Hours each studio is bookable per day, used for utilization summaries
+STUDIO_HOURS_PER_DAY = float(os.getenv('STUDIO_HOURS_PER_DAY', '12'))
+
+# Studio opening hours (24h clock), used for free-slot searches
+STUDIO_OPEN_HOUR = int(os.getenv('STUDIO_OPEN_HOUR', '10'))
+STUDIO_CLOSE_HOUR = int(os.getenv('STUDIO_CLOSE_HOUR', '22'))
+# Seconds a fetched free-slot window is reused before the GUI fetches it again
+AVAILABILITY_MAX_AGE_SECONDS = int(os.getenv('AVAILABILITY_MAX_AGE_SECONDS', '300'))
+
+# IANA time zone of the studio (e.g. America/New_York); event times are
+# converted into it before sorting and formatting. Empty keeps each event's
+# own wall clock
+STUDIO_TIMEZONE = os.getenv('STUDIO_TIMEZONE', '')
+
+# Target time from process start to the first GUI window, in seconds
+STARTUP_TARGET_SECONDS = float(os.getenv('STARTUP_TARGET_SECONDS', '1.0'))
+
+# Shared Google API request budget (requests per second, burst size) and
+# number of date ranges processed concurrently by the headless CLI
+API_RATE_LIMIT = float(os.getenv('API_RATE_LIMIT', '1.0'))
+API_RATE_BURST = int(os.getenv('API_RATE_BURST', '10'))
+BACKFILL_WORKERS = int(os.getenv('BACKFILL_WORKERS', '4'))
+
+# Shared keep-alive HTTP transport: hosts pooled, idle sockets kept per host, timeout (seconds)
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '16'))
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '60'))
+
+# Overlapped pipeline: batches buffered between stages, and rows per sheet write
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '8'))
+SHEET_CHUNK_SIZE = int(os.getenv('SHEET_CHUNK_SIZE', '500'))
+
+# Sheet columns staff edit by hand; with SHEET_RECONCILE on, a re-run keeps
+# their values instead of overwriting the tab, and only writes the cells that
+# changed. Off by default: it adds an "Event ID" column to every tab
+SHEET_RECONCILE = os.getenv('SHEET_RECONCILE', '').lower() in ('1', 'true', 'yes')
+MANUAL_COLUMNS = [c.strip() for c in os.getenv('MANUAL_COLUMNS', 'Paid?,Price').split(',') if c.strip()]
+
+# Sync daemon: webhook endpoint, scheduled sync interval and debounce (seconds)
+DAEMON_HOST = os.getenv('DAEMON_HOST', '127.0.0.1')
+DAEMON_PORT = int(os.getenv('DAEMON_PORT', '8765'))
+DAEMON_SYNC_INTERVAL = float(os.getenv('DAEMON_SYNC_INTERVAL', '900'))
+DAEMON_DEBOUNCE_SECONDS = float(os.getenv('DAEMON_DEBOUNCE_SECONDS', '10'))
+DAEMON_CHANNEL_TOKEN = os.getenv('DAEMON_CHANNEL_TOKEN', '')
+# Changed events further ahead than this many months don't trigger a tab sync
+DAEMON_MONTHS_AHEAD = int(os.getenv('DAEMON_MONTHS_AHEAD', '12'))
+
+# Per-run metrics reports (JSON), and retries for throttled or failed API calls
+RUN_REPORT_DIR = os.getenv('RUN_REPORT_DIR', str(BASE_DIR / 'run_reports'))
+API_NUM_RETRIES = int(os.getenv('API_NUM_RETRIES', '3'))
+
+# Record every Google API exchange to a cassette (API_CASSETTE_MODE=record) or
+# answer from one without the network (replay); API_REPLAY_TIMING is the
+# fraction of the recorded response times to wait on replay (0 = full speed)
+API_CASSETTE = os.getenv('API_CASSETTE', '')
+API_CASSETTE_MODE = os.getenv('API_CASSETTE_MODE', '').lower()
+API_REPLAY_TIMING = float(os.getenv('API_REPLAY_TIMING', '0'))
+
+# Request only the event fields the pipeline uses (partial responses)
+LEAN_FETCH = os.getenv('LEAN_FETCH', '1').lower() in ('1', 'true', 'yes')
+
+# Decode event pages one item at a time as they're formatted, instead of
+# parsing each whole page into nested dicts first
+STREAM_PARSE = os.getenv('STREAM_PARSE', '1').lower() in ('1', 'true', 'yes')
+
+# Fetch recurring events as masters plus exceptions and expand their instances
+# locally instead of downloading every instance (singleEvents); expanded
+# series kept in memory across runs
+LOCAL_RECURRENCE = os.getenv('LOCAL_RECURRENCE', '').lower() in ('1', 'true', 'yes')
+RECURRENCE_CACHE_SIZE = int(os.getenv('RECURRENCE_CACHE_SIZE', '1024'))
+# Seconds a series' looked-up exceptions are reused while its master is unchanged;
+# editing a single instance doesn't always touch the master, so they also age out
+RECURRENCE_EXCEPTIONS_TTL = float(os.getenv('RECURRENCE_EXCEPTIONS_TTL', '300'))
+
+# Memory budget for sorting large exports: past SORT_SPILL_EVENTS buffered
+# events, sorted runs spill to temporary files (in SORT_SPILL_DIR, default the
+# system temp directory) and are merged back in order; 0 never spills
+SORT_SPILL_EVENTS = int(os.getenv('SORT_SPILL_EVENTS', '50000'))
+SORT_SPILL_DIR = os.getenv('SORT_SPILL_DIR') or None
+
+# Requests per Google batch request (the Calendar API accepts at most 50)
+API_BATCH_LIMIT = int(os.getenv('API_BATCH_LIMIT', '50'))
+
+# Opt-in CPU and memory profiling of every pipeline stage (STUDIO_PROFILE=1)
+PROFILE_ENABLED = os.getenv('STUDIO_PROFILE', '').lower() in ('1', 'true', 'yes')
+PROFILE_DIR = os.getenv('PROFILE_DIR', str(BASE_DIR / 'profiles'))
+
 # Validation
 def validate_config():
     """Validate that required configuration is present."""
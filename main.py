@@ -1,53 +1,65 @@
+import time
+_PROCESS_START = time.perf_counter()
+
+import sys
 import tkinter as tk
 from tkinter import messagebox
-from datetime import datetime
-from src.FormatterNode import FormatterNode
-from src.CalendarNode import get_calendar_data
-from src.SheetNode import write_data_to_sheet, get_sheets_service, create_sheet_if_not_exists
+from datetime import datetime, timedelta
+from src.StartupNode import BackgroundImporter, check_first_window, print_import_report, report_launch_to_ready
+from src.PreviewNode import PreviewTable
+
+# The Google client modules are only imported once the window is up
+background_imports = BackgroundImporter()
+
+# Busy blocks of every range fetched in this session, for free-slot searches
+availability_index = None
+
+def __getattr__(name):
+    """Keeps `from main import process_pipeline` working without importing it at startup."""
+    if name == 'process_pipeline':
+        from src.Controller import process_pipeline
+        return process_pipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def process_pipeline(start_date, end_date):
+def get_availability_index():
+    """Returns the session's availability index, creating it on first use."""
+    global availability_index
+    if availability_index is None:
+        background_imports.wait()
+        from src.AvailabilityNode import StudioAvailability
+        availability_index = StudioAvailability()
+    return availability_index
+
+# Artist and keyword index over the stored and newly fetched sessions
+search_index = None
+
+def get_search_index():
     """
-    Executes the pipeline: fetch, format, and write data.
-    
-    Args:
-        start_date (str): Start date in YYYY-MM-DD format
-        end_date (str or None): End date in YYYY-MM-DD format
+    Returns the session's search index, creating it empty on first use; the
+    GUI seeds it from the local warehouse on the pipeline worker
+    (Controller.seed_search_index), never on the Tk main thread.
     """
-    try:
-        # Fetch calendar data (now using both hard-coded calendars)
-        raw_data = get_calendar_data(start_date, end_date)
-        
-        # Format data
-        formatter = FormatterNode()
-        formatted_data = formatter.format_data(raw_data)
-        
-        # Write data to Google Sheets
-        service = get_sheets_service()
-        spreadsheet_id = "19GpFb5B8SaVqjgqkBGrytiCzwU6D1PIiqnRrw_Qrmcg"  # Replace with your actual spreadsheet ID
-        
-        # Create sheet name with date range - handle None values properly
-        if end_date:
-            sheet_name = f"{start_date}_{end_date}_combined"
-        else:
-            sheet_name = f"{start_date}_EOM_combined"
-        
-        # Create sheet and write data
-        if create_sheet_if_not_exists(service, spreadsheet_id, sheet_name):
-            # Debug print statement
-            print(f"Formatted data (first 2 entries):\n{formatted_data[:2]}")
-            write_data_to_sheet(service, spreadsheet_id, sheet_name, formatted_data)
-        
-        print("Pipeline executed successfully.")
-        messagebox.showinfo("Success", "Data from both calendars processed and written to sheet!")
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        messagebox.showerror("Error", f"An error occurred: {e}")
+    global search_index
+    if search_index is None:
+        background_imports.wait()
+        from src.SearchNode import EventSearchIndex
+        search_index = EventSearchIndex()
+    return search_index
+
+# Status text per pipeline stage
+STAGE_LABELS = {
+    'fetched': "events fetched",
+    'formatted': "rows formatted",
+    'written': "cells written",
+    'indexed': "stored sessions indexed",
+}
 
 def run_gui():
     """
     Launches the GUI for date input.
     """
-    def on_submit():
+    def read_dates():
+        """Returns the entered (start_date, end_date), or None after showing an error."""
         start_date = start_date_entry.get().strip()
         end_date = end_date_entry.get().strip()
         
@@ -58,19 +70,167 @@ def run_gui():
                 datetime.strptime(end_date, "%Y-%m-%d")
         except ValueError:
             messagebox.showerror("Invalid Date", "Please enter dates in YYYY-MM-DD format.")
-            return
+            return None
         
         # Set end_date to None if it's empty
-        if not end_date:
-            end_date = None
+        return start_date, end_date or None
+    
+    def on_submit():
+        dates = read_dates()
+        if dates is None:
+            return
+        start_date, end_date = dates
+        
+        # Queue the pipeline on the background worker
+        if profile_var.get():
+            get_worker().submit(start_date, end_date, profile=True)
+        else:
+            get_worker().submit(start_date, end_date)
+    
+    def on_preview():
+        dates = read_dates()
+        if dates is None:
+            return
+        worker = get_worker()
+        from src.Controller import preview_range
+        worker.submit(*dates, pipeline=preview_range)
+    
+    def get_worker():
+        if not workers:
+            background_imports.wait()
+            from src.Controller import PipelineWorker
+            workers.append(PipelineWorker(availability=get_availability_index(),
+                                          search_index=get_search_index()))
+        if search_seed['job'] is None:
+            # Index the stored sessions on the worker, ahead of any queued run
+            from src.Controller import seed_search_index
+            search_seed['job'] = workers[0].submit(None, None, pipeline=seed_search_index)
+            job_ranges[search_seed['job']] = "search index"
+        return workers[0]
+    
+    def on_cancel():
+        if workers:
+            workers[0].cancel_all()
+    
+    def poll_worker():
+        """Applies worker messages to the UI; runs on the Tk main thread."""
+        if not workers:
+            root.after(100, poll_worker)
+            return
+        worker = workers[0]
+        for kind, job_id, payload in worker.poll():
+            if kind == 'queued':
+                job_ranges.setdefault(job_id, f"{payload[0]} to {payload[1] or 'EOM'}")
+            elif job_id == search_seed['job'] and kind in ('done', 'failed', 'cancelled'):
+                if kind == 'done':
+                    search_seed['ready'] = True
+                    status_var.set(f"Search index ready: {payload['sessions']} sessions")
+                else:
+                    # Retried on the next search or submit
+                    search_seed['job'] = None
+                    status_var.set(f"Search index not loaded ({kind})")
+            elif kind == 'started':
+                status_var.set(f"Running {job_ranges[job_id]}...")
+            elif kind == 'progress':
+                stage, count = payload
+                status_var.set(f"{job_ranges[job_id]}: {count} {STAGE_LABELS.get(stage, stage)}")
+            elif job_id in slot_queries and kind in ('done', 'failed', 'cancelled'):
+                query = slot_queries.pop(job_id)
+                if kind == 'done':
+                    fetched_slot_windows[query[2].date()] = time.monotonic()
+                    status_var.set(f"Fetched {payload['events']} events for {job_ranges[job_id]}")
+                    show_free_slots(*query)
+                elif kind == 'failed':
+                    status_var.set(f"Failed {job_ranges[job_id]}")
+                    messagebox.showerror("Error", f"An error occurred: {payload}")
+                else:
+                    status_var.set(f"Cancelled {job_ranges[job_id]}")
+            elif kind == 'done' and 'preview' in payload:
+                # Fetched and formatted only; nothing was written
+                preview_table.set_rows(payload['preview'][0], payload['preview'][1:])
+                status_var.set(f"Previewing {payload['rows']} rows for {job_ranges[job_id]} (not written)")
+            elif kind == 'done':
+                status = f"Finished {job_ranges[job_id]}: {payload['rows']} rows written to {payload['sheet']}"
+                if payload.get('profile'):
+                    status += f"\nProfiles saved to {payload['profile']}"
+                status_var.set(status)
+                messagebox.showinfo("Success", f"{job_ranges[job_id]} processed and written to sheet!")
+            elif kind == 'failed':
+                status_var.set(f"Failed {job_ranges[job_id]}")
+                messagebox.showerror("Error", f"An error occurred: {payload}")
+            elif kind == 'cancelled':
+                status_var.set(f"Cancelled {job_ranges[job_id]}")
         
-        # Execute the pipeline
-        process_pipeline(start_date, end_date)
+        queued = worker.pending()
+        queue_var.set(f"{queued} range(s) queued" if queued else "")
+        cancel_button.config(state=tk.NORMAL if worker.busy() or queued else tk.DISABLED)
+        root.after(100, poll_worker)
+    
+    # Window start date -> when it was last fetched, and queries waiting on a fetch job
+    fetched_slot_windows = {}
+    slot_queries = {}
+    
+    def on_find_slots():
+        studio = studio_entry.get().strip()
+        try:
+            duration = timedelta(hours=float(hours_entry.get().strip()))
+        except ValueError:
+            messagebox.showerror("Invalid Hours", "Please enter the number of hours needed.")
+            return
+        
+        window_start = datetime.now().replace(minute=0, second=0, microsecond=0)
+        window_end = window_start + timedelta(days=7)
+        query = (studio, duration, window_start, window_end)
+        
+        # Reuse a recent fetch of the window; otherwise refetch it on the worker,
+        # which also drops bookings that moved or were cancelled since
+        from config.settings import AVAILABILITY_MAX_AGE_SECONDS
+        fetched = fetched_slot_windows.get(window_start.date())
+        if fetched is not None and time.monotonic() - fetched < AVAILABILITY_MAX_AGE_SECONDS:
+            show_free_slots(*query)
+            return
+        worker = get_worker()
+        from src.Controller import fetch_availability
+        job_id = worker.submit(window_start.strftime("%Y-%m-%d"), window_end.strftime("%Y-%m-%d"),
+                               pipeline=fetch_availability)
+        job_ranges[job_id] = f"free slots from {window_start:%Y-%m-%d}"
+        slot_queries[job_id] = query
+    
+    def show_free_slots(studio, duration, window_start, window_end):
+        slots = get_availability_index().free_slots(studio, duration, window_start, window_end, limit=10)
+        if not slots:
+            messagebox.showinfo("Free Slots", f"No free slot of that length in {studio} in the next 7 days.")
+            return
+        lines = [f"{start:%a %Y-%m-%d %H:%M} - {end:%H:%M}" for start, end in slots]
+        messagebox.showinfo("Free Slots", f"{studio} is free:\n" + "\n".join(lines))
+    
+    def on_search(artist):
+        query = search_entry.get().strip()
+        if not query:
+            messagebox.showerror("Search", "Please enter an artist name or keywords.")
+            return
+        get_worker()
+        index = get_search_index()
+        loading = "" if search_seed['ready'] else "\n(stored sessions are still being indexed)"
+        events = index.search_artist(query, limit=20) if artist else index.search(query, limit=20)
+        if not events:
+            messagebox.showinfo("Search", f"No sessions match '{query}'.{loading}")
+            return
+        total = index.count(query, artist=artist)
+        lines = [f"{event['start'][:16].replace('T', ' ')}  {event['summary']}" for event in events]
+        if total > len(lines):
+            lines.append(f"... and {total - len(lines)} more")
+        messagebox.showinfo("Search", f"{total} session(s) for '{query}':\n" + "\n".join(lines) + loading)
     
     # Create the main window
     root = tk.Tk()
     root.title("Calendar Processing Tool")
     
+    workers = []
+    job_ranges = {}
+    # Worker job that seeds the search index from the warehouse, once it is queued
+    search_seed = {'job': None, 'ready': False}
+    
     # Input fields for dates
     tk.Label(root, text="Start Date (YYYY-MM-DD):").grid(row=0, column=0, padx=10, pady=10)
     start_date_entry = tk.Entry(root)
@@ -86,9 +246,63 @@ def run_gui():
     
     # Submit button
     submit_button = tk.Button(root, text="Process Calendars", command=on_submit, bg="#4CAF50", fg="white")
-    submit_button.grid(row=3, column=0, columnspan=2, pady=20)
+    submit_button.grid(row=3, column=0, pady=20)
+    
+    cancel_button = tk.Button(root, text="Cancel", command=on_cancel, state=tk.DISABLED)
+    cancel_button.grid(row=3, column=1, pady=20)
+    
+    # Progress reporting
+    status_var = tk.StringVar(value="Idle")
+    tk.Label(root, textvariable=status_var).grid(row=7, column=0, columnspan=2, padx=10, pady=5)
+    queue_var = tk.StringVar(value="")
+    tk.Label(root, textvariable=queue_var).grid(row=8, column=0, columnspan=2, padx=10, pady=(0, 10))
+    
+    # Free slot search
+    tk.Label(root, text="Studio:").grid(row=4, column=0, padx=10, pady=5)
+    studio_entry = tk.Entry(root)
+    studio_entry.insert(0, "Studio B")
+    studio_entry.grid(row=4, column=1, padx=10, pady=5)
+    
+    tk.Label(root, text="Hours needed:").grid(row=5, column=0, padx=10, pady=5)
+    hours_entry = tk.Entry(root)
+    hours_entry.insert(0, "4")
+    hours_entry.grid(row=5, column=1, padx=10, pady=5)
+    
+    slot_button = tk.Button(root, text="Find Free Slots (next 7 days)", command=on_find_slots)
+    slot_button.grid(row=6, column=0, columnspan=2, pady=10)
+    
+    # Opt-in per-stage profiling of the next runs
+    profile_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(root, text="Profile runs (CPU and memory per stage)", variable=profile_var).grid(
+        row=9, column=0, columnspan=2, padx=10, pady=(0, 10))
+    
+    # Artist / keyword search over stored and fetched sessions
+    tk.Label(root, text="Search:").grid(row=10, column=0, padx=10, pady=5)
+    search_entry = tk.Entry(root)
+    search_entry.grid(row=10, column=1, padx=10, pady=5)
+    tk.Button(root, text="Find Artist", command=lambda: on_search(True)).grid(row=11, column=0, pady=(0, 10))
+    tk.Button(root, text="Search Keywords", command=lambda: on_search(False)).grid(row=11, column=1, pady=(0, 10))
+    
+    # Preview of the formatted rows of a range, before they are written
+    tk.Button(root, text="Preview Rows", command=on_preview).grid(row=12, column=0, columnspan=2, pady=(0, 5))
+    preview_table = PreviewTable(root)
+    preview_table.grid(row=13, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="nsew")
+    root.grid_rowconfigure(13, weight=1)
+    root.grid_columnconfigure(1, weight=1)
+    
+    # Show the window, then load the Google clients while the user types
+    root.update_idletasks()
+    check_first_window(time.perf_counter() - _PROCESS_START)
+    report_launch_to_ready()
+    background_imports.start()
     
+    root.after(100, poll_worker)
     root.mainloop()
+    if workers:
+        workers[0].stop()
 
 if __name__ == "__main__":
-    run_gui()
\ No newline at end of file
+    if "--import-report" in sys.argv:
+        print_import_report()
+    else:
+        run_gui()
\ No newline at end of file
@@ -1,17 +1,37 @@
-import os
-import subprocess
+"""
+Launches the Calendar Processing Tool in a persistent environment (.venv).
+
+The environment and the saved Google tokens are kept between runs:
+requirements are only reinstalled when requirements.txt changes, and the
+app asks for consent again only if a token can't be used. The GUI prints
+the launch-to-ready time once its window is up.
+
+    python3 run_data_dumper.py                  # normal launch
+    python3 run_data_dumper.py --reinstall      # force pip install
+    python3 run_data_dumper.py --reset-tokens   # sign in again
+"""
+import argparse
 import sys
 
-# Delete token files
-if os.path.exists("token.json"):
-    os.remove("token.json")
-if os.path.exists("sheet_token.json"):
-    os.remove("sheet_token.json")
+from src.LauncherNode import launch, remove_tokens, project_root
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Launch the Calendar Processing Tool.")
+    parser.add_argument("--reinstall", action="store_true",
+                        help="Reinstall the requirements even if requirements.txt is unchanged")
+    parser.add_argument("--reset-tokens", action="store_true",
+                        help="Delete the saved Google tokens before launching")
+    args, app_args = parser.parse_known_args(argv)
 
-print("Installing required libraries...")
-subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+    if args.reset_tokens:
+        remove_tokens([project_root / 'token.json', project_root / 'sheet_token.json'])
 
-print("Running main program...")
-subprocess.run(["python3", "main.py"])
+    try:
+        return launch(app_args, reinstall=args.reinstall)
+    except RuntimeError as e:
+        print(f"Launch failed: {e}")
+        return 1
 
-print("Execution completed.")
+if __name__ == "__main__":
+    sys.exit(main())
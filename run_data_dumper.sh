@@ -1,26 +1,7 @@
 #!/bin/bash
+# Launches the tool in the persistent .venv (see run_data_dumper.py).
+# Requirements are only reinstalled when requirements.txt changes and the
+# saved tokens are kept; pass --reinstall or --reset-tokens to override.
 
-echo "Running Bash script..."
-
-rm token.json
-rm sheet_token.json
-
-echo "Executing Python script..."
-
-python3 -m venv venv
-
-
-
-echo "Entering venv..."
-source venv/bin/activate
-echo "installing required libraries..."
-
-
-pip install -r requirements.txt
-
-echo "running program..."
-python3 main.py
-
-echo "program finished running, removing venv..."
-
-rm -rf venv
\ No newline at end of file
+cd "$(dirname "$0")" || exit 1
+exec python3 run_data_dumper.py "$@"
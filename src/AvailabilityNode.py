@@ -0,0 +1,295 @@
+import argparse
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from config.settings import STUDIO_OPEN_HOUR, STUDIO_CLOSE_HOUR
+from src.FormatterNode import FormatterNode
+
+
+def parse_event_time(value):
+    """
+    Parses an event start/end string into a naive datetime, dropping timezone
+    info the same way FormatterNode does. Date-only values (all-day events)
+    map to midnight.
+    """
+    if not value:
+        return None
+    if 'T' not in value:
+        return datetime.fromisoformat(value)
+    parsed = datetime.fromisoformat(value.replace('Z', ''))
+    return parsed.replace(tzinfo=None)
+
+
+class StudioAvailability:
+    """
+    Per-studio index of busy blocks for free-slot queries.
+    Each studio keeps two parallel sorted lists (block starts and block ends)
+    of non-overlapping blocks; overlapping or touching events are merged on
+    insert, so lookups are a binary search over the blocks. Every event's
+    own interval is kept by (calendar, event ID) as well, so an event that
+    moves or disappears from a refetched window has its old busy time taken
+    out: its studio's blocks are rebuilt from the remaining intervals. The
+    index is safe to update from a pipeline worker while the UI thread
+    queries it.
+    """
+
+    def __init__(self, formatter=None):
+        self.formatter = formatter or FormatterNode()
+        self._starts = {}
+        self._ends = {}
+        # (calendar, event ID) -> (studio, start, end)
+        self._events = {}
+        # Blocks added with add_busy rather than from events, per studio
+        self._extra = {}
+        self._lock = threading.RLock()
+
+    def studios(self):
+        """Returns the studios that have at least one busy block."""
+        return sorted(studio for studio, starts in self._starts.items() if starts)
+
+    def busy_blocks(self, studio):
+        """Returns the merged busy blocks of a studio as (start, end) tuples."""
+        with self._lock:
+            return list(zip(self._starts.get(studio, []), self._ends.get(studio, [])))
+
+    @staticmethod
+    def event_key(event):
+        """Returns the (calendar, event ID) key an event is indexed under."""
+        return event.get('calendar') or 'primary', event.get('id') or f"{event.get('start')}|{event.get('end')}"
+
+    def update(self, events):
+        """
+        Adds newly fetched events to the index, replacing the busy time of
+        events already indexed whose times changed. Unchanged events are
+        skipped, so the same range can be fetched repeatedly.
+
+        Args:
+            events (list): Event dictionaries from CalendarNode.get_calendar_data
+
+        Returns:
+            int: Number of events added or moved
+        """
+        changed = 0
+        dirty = set()
+        with self._lock:
+            for event in events:
+                changed += self._add_event(event, dirty)
+            for studio in dirty:
+                self._rebuild(studio)
+        return changed
+
+    def replace_window(self, events, window_start, window_end, calendars=None):
+        """
+        Updates the index with a fresh fetch of a time window: the events are
+        added or moved as in `update`, and indexed events of the fetched
+        calendars that overlap the window but are no longer in it (cancelled,
+        or moved out of the window) are removed.
+
+        Args:
+            events (list): Every event of the window, from the calendars fetched
+            window_start (datetime): Start of the fetched window
+            window_end (datetime): End of the fetched window
+            calendars (iterable, optional): Calendars fetched; all if omitted
+
+        Returns:
+            int: Number of events added, moved or removed
+        """
+        with self._lock:
+            changed = self.update(events)
+            return changed + self.forget_missing({self.event_key(e) for e in events},
+                                                 window_start, window_end, calendars)
+
+    def forget_missing(self, keys, window_start, window_end, calendars=None):
+        """
+        Removes indexed events of `calendars` overlapping the window whose
+        keys are not in `keys`, the events a refetch of the window returned.
+
+        Returns:
+            int: Number of events removed
+        """
+        calendars = set(calendars) if calendars is not None else None
+        removed = 0
+        dirty = set()
+        with self._lock:
+            for key, (studio, start, end) in list(self._events.items()):
+                if key in keys or (calendars is not None and key[0] not in calendars):
+                    continue
+                # Same overlap test as the API's timeMin/timeMax; zero-length events at the start count
+                if start < window_end and (end > window_start or start == window_start):
+                    del self._events[key]
+                    dirty.add(studio)
+                    removed += 1
+            for studio in dirty:
+                self._rebuild(studio)
+        return removed
+
+    def _add_event(self, event, dirty):
+        key = self.event_key(event)
+        start = parse_event_time(event.get('start'))
+        end = parse_event_time(event.get('end')) or start
+        previous = self._events.get(key)
+        if start is None:
+            if previous is not None:
+                del self._events[key]
+                dirty.add(previous[0])
+                return 1
+            return 0
+        studio = self.formatter.determine_studio(event.get('calendar', 'primary'))
+        interval = (studio, start, end)
+        if previous == interval:
+            return 0
+        self._events[key] = interval
+        if previous is None and studio not in dirty:
+            # New event: merge into the blocks in place
+            self._merge(studio, start, end)
+        else:
+            dirty.add(studio)
+            if previous is not None:
+                dirty.add(previous[0])
+        return 1
+
+    def _rebuild(self, studio):
+        """Recomputes a studio's merged blocks from its events and extra blocks."""
+        intervals = sorted(
+            [(start, end) for s, start, end in self._events.values() if s == studio and end > start]
+            + self._extra.get(studio, [])
+        )
+        starts, ends = [], []
+        for start, end in intervals:
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._starts[studio] = starts
+        self._ends[studio] = ends
+
+    def add_busy(self, studio, start, end):
+        """Marks [start, end) as busy in a studio, merging with any overlapping blocks."""
+        if end <= start:
+            return
+        with self._lock:
+            self._extra.setdefault(studio, []).append((start, end))
+            self._merge(studio, start, end)
+
+    def _merge(self, studio, start, end):
+        if end <= start:
+            return
+        starts = self._starts.setdefault(studio, [])
+        ends = self._ends.setdefault(studio, [])
+
+        # Blocks i..j-1 overlap or touch the new block
+        i = bisect_left(ends, start)
+        j = bisect_right(starts, end)
+        if i < j:
+            start = min(start, starts[i])
+            end = max(end, ends[j - 1])
+        starts[i:j] = [start]
+        ends[i:j] = [end]
+
+    def is_free(self, studio, start, end):
+        """Returns True if a studio has no busy block overlapping [start, end)."""
+        with self._lock:
+            starts = self._starts.get(studio, [])
+            ends = self._ends.get(studio, [])
+            i = bisect_right(ends, start)
+            return i == len(starts) or starts[i] >= end
+
+    def free_slots(self, studio, duration, window_start, window_end,
+                   open_hour=STUDIO_OPEN_HOUR, close_hour=STUDIO_CLOSE_HOUR, limit=None):
+        """
+        Finds free gaps of at least `duration` in a studio between window_start
+        and window_end, restricted to opening hours. The first busy block of
+        each day is located by binary search; only blocks inside the window
+        are visited after that.
+
+        Args:
+            studio (str): Studio name, as produced by FormatterNode.determine_studio
+            duration (timedelta): Minimum free time needed
+            window_start (datetime): Earliest start of a slot
+            window_end (datetime): Latest end of a slot
+            open_hour (int, optional): Opening hour; None searches around the clock
+            close_hour (int, optional): Closing hour; None searches around the clock
+            limit (int, optional): Stop after this many slots
+
+        Returns:
+            list: (start, end) tuples of free gaps, each at least `duration` long
+        """
+        slots = []
+        with self._lock:
+            for day_start, day_end in self._daily_windows(window_start, window_end, open_hour, close_hour):
+                for slot in self._gaps(studio, duration, day_start, day_end):
+                    slots.append(slot)
+                    if limit and len(slots) >= limit:
+                        return slots
+        return slots
+
+    def first_free_slot(self, studio, duration, window_start, window_end, **kwargs):
+        """Returns the earliest free (start, end) slot, or None if there is none."""
+        slots = self.free_slots(studio, duration, window_start, window_end, limit=1, **kwargs)
+        return slots[0] if slots else None
+
+    def _gaps(self, studio, duration, window_start, window_end):
+        starts = self._starts.get(studio, [])
+        ends = self._ends.get(studio, [])
+        cursor = window_start
+        i = bisect_right(ends, window_start)
+        while i < len(starts) and starts[i] < window_end:
+            if starts[i] - cursor >= duration:
+                yield cursor, starts[i]
+            cursor = max(cursor, ends[i])
+            i += 1
+        if window_end - cursor >= duration:
+            yield cursor, window_end
+
+    @staticmethod
+    def _daily_windows(window_start, window_end, open_hour, close_hour):
+        if open_hour is None or close_hour is None:
+            yield window_start, window_end
+            return
+        day = window_start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < window_end:
+            day_start = max(window_start, day + timedelta(hours=open_hour))
+            day_end = min(window_end, day + timedelta(hours=close_hour))
+            if day_start < day_end:
+                yield day_start, day_end
+            day += timedelta(days=1)
+
+def main(argv=None):
+    from src.CalendarNode import get_calendar_data
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    parser = argparse.ArgumentParser(description="Find free studio slots.")
+    parser.add_argument("--studio", required=True, help="Studio name, e.g. 'Studio B'")
+    parser.add_argument("--hours", type=float, required=True, help="Length of the slot in hours")
+    parser.add_argument("--start", default=today, help="Start date (YYYY-MM-DD), default today")
+    parser.add_argument("--end", help="End date (YYYY-MM-DD), default 7 days after start")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--all-day", action="store_true", help="Ignore studio opening hours")
+    args = parser.parse_args(argv)
+
+    window_start = datetime.strptime(args.start, '%Y-%m-%d')
+    end_date = args.end or (window_start + timedelta(days=7)).strftime('%Y-%m-%d')
+    window_end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+
+    index = StudioAvailability()
+    index.update(get_calendar_data(args.start, end_date))
+
+    hours = {} if not args.all_day else {'open_hour': None, 'close_hour': None}
+    slots = index.free_slots(args.studio, timedelta(hours=args.hours), window_start, window_end,
+                             limit=args.limit, **hours)
+    if not slots:
+        print(f"No free {args.hours:g}-hour slot in {args.studio} between {args.start} and {end_date}.")
+    for start, end in slots:
+        print(f"{args.studio}: {start:%a %Y-%m-%d %H:%M} - {end:%H:%M}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+import json
+import sys
+import time
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from googleapiclient.errors import HttpError
+
+from config.settings import API_BATCH_LIMIT, API_NUM_RETRIES, LOCAL_RECURRENCE
+from src.MetricsNode import current_metrics
+from src.ServiceNode import RETRY_STATUSES
+
+
+# 403 reasons that mean "slow down" rather than "forbidden"
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+
+class BatchFetchError(RuntimeError):
+    """
+    Raised by fetch_event_lists when queries still fail after their retries.
+    `errors` maps each failed key to its last error; `items` holds the
+    events of the queries that completed, keyed like the queries, and
+    `stats` the requests made.
+    """
+
+    def __init__(self, errors, items, stats):
+        self.errors = errors
+        self.items = items
+        self.stats = stats
+        super().__init__(f"{len(errors)} batched quer{'y' if len(errors) == 1 else 'ies'} failed: "
+                         + "; ".join(str(error) for error in errors.values()))
+
+
+def is_retryable(error):
+    """True for batch part errors worth retrying: 429, 5xx and 403 rate limits."""
+    if not isinstance(error, HttpError):
+        return False
+    if error.resp.status in RETRY_STATUSES:
+        return True
+    if error.resp.status != 403:
+        return False
+    try:
+        details = json.loads(error.content.decode('utf-8'))['error'].get('errors', [])
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return False
+    return any(detail.get('reason') in RATE_LIMIT_REASONS for detail in details)
+
+
+def run_batch(service, requests, limit=API_BATCH_LIMIT, limiter=None):
+    """
+    Executes API requests as Google batch requests, up to `limit` per HTTP
+    round trip.
+
+    Args:
+        service: Calendar or Sheets service the requests were built from
+        requests (dict): key -> HttpRequest
+        limit (int): Requests per batch (the Calendar API allows 50)
+        limiter (RateLimiter, optional): Acquired once per request, since
+            every request in a batch counts against the API quota
+
+    Returns:
+        tuple: (responses, errors, round_trips) with responses and errors
+            keyed like `requests`
+    """
+    keys = list(requests)
+    responses = {}
+    errors = {}
+    round_trips = 0
+    metrics = current_metrics()
+
+    for offset in range(0, len(keys), limit):
+        chunk = keys[offset:offset + limit]
+
+        def callback(request_id, response, exception, chunk=chunk):
+            key = chunk[int(request_id)]
+            if exception is not None:
+                errors[key] = exception
+            else:
+                responses[key] = response
+
+        batch = service.new_batch_http_request(callback=callback)
+        for index, key in enumerate(chunk):
+            if limiter is not None:
+                limiter.acquire()
+            batch.add(requests[key], request_id=str(index))
+        started = time.perf_counter()
+        batch.execute()
+        round_trips += 1
+        if metrics is not None:
+            metrics.observe_api('batch', time.perf_counter() - started)
+            metrics.count('batch_round_trips')
+            metrics.count('batched_requests', len(chunk))
+    return responses, errors, round_trips
+
+def _fetch_pages(service, build_request, pending, label, limit, limiter, max_retries, sleep, stats):
+    """
+    Runs paged list requests through run_batch, one round per page, until
+    every key in `pending` (key -> first page token) is exhausted. A failed
+    page that is worth retrying is batched again in the next round, after
+    an exponential backoff.
+
+    Returns:
+        tuple: (items, failed) with items key -> the items of every page,
+            and failed key -> the last error of keys that failed for good
+    """
+    items = {key: [] for key in pending}
+    attempts = {}
+    failed = {}
+    while pending:
+        backoff = max((attempts.get(key, 0) for key in pending), default=0)
+        if backoff:
+            sleep(min(2 ** (backoff - 1), 32))
+        requests = {key: build_request(key, page_token) for key, page_token in pending.items()}
+        responses, errors, round_trips = run_batch(service, requests, limit, limiter)
+        stats['rounds'] += 1
+        stats['round_trips'] += round_trips
+        stats['requests'] += len(requests)
+
+        page_tokens, pending = pending, {}
+        for key, error in errors.items():
+            if is_retryable(error) and attempts.get(key, 0) < max_retries:
+                attempts[key] = attempts.get(key, 0) + 1
+                stats['retries'] += 1
+                pending[key] = page_tokens[key]
+            else:
+                print(f"An error occurred while fetching {label(key)}: {error}")
+                failed[key] = error
+        for key, response in responses.items():
+            attempts.pop(key, None)
+            items[key].extend(response.get('items', []))
+            if response.get('nextPageToken'):
+                pending[key] = response['nextPageToken']
+    for key in failed:
+        del items[key]
+    return items, failed
+
+def fetch_exception_lists(service, masters, limit=API_BATCH_LIMIT, limiter=None, max_retries=API_NUM_RETRIES,
+                          sleep=time.sleep, stats=None):
+    """
+    Looks up the exceptions of many recurring series, wherever they now
+    fall (see CalendarNode.fetch_series_exceptions), with batched
+    events().list(iCalUID=...) calls.
+
+    Args:
+        service: Calendar service
+        masters (dict): key -> (calendar_id, recurring master event)
+        limit, limiter, max_retries, sleep: As for fetch_event_lists
+        stats (dict, optional): fetch_event_lists stats to add the requests to
+
+    Returns:
+        tuple: (exceptions, failed) with exceptions key -> the series'
+            exception events, and failed key -> error for lookups that failed
+    """
+    from src.CalendarNode import SERIES_EXCEPTION_FIELDS
+    if stats is None:
+        stats = {'rounds': 0, 'round_trips': 0, 'requests': 0, 'retries': 0}
+
+    def build_request(key, page_token):
+        calendar_id, master = masters[key]
+        return service.events().list(
+            calendarId=calendar_id,
+            iCalUID=master['iCalUID'],
+            singleEvents=False,
+            showDeleted=True,
+            pageToken=page_token,
+            fields=SERIES_EXCEPTION_FIELDS
+        )
+
+    items, failed = _fetch_pages(service, build_request, {key: None for key in masters},
+                                 lambda key: f"the exceptions of {masters[key][1].get('id')}",
+                                 limit, limiter, max_retries, sleep, stats)
+    exceptions = {key: [event for event in events if event.get('recurringEventId')] for key, events in items.items()}
+    return exceptions, failed
+
+def fetch_event_lists(service, queries, limit=API_BATCH_LIMIT, limiter=None, fields=None,
+                      local_recurrence=LOCAL_RECURRENCE, max_retries=API_NUM_RETRIES, sleep=time.sleep):
+    """
+    Fetches events for many (calendar, time window) queries with batched
+    events().list calls. Each round batches the next page of every query
+    that still has one, so paging continues across rounds until every
+    query is exhausted.
+
+    With local_recurrence, the exceptions of every listed series that
+    aren't in RecurrenceNode's cache are then looked up in batched rounds
+    too (fetch_exception_lists), so series moved out of their window are
+    handled without one request per series.
+
+    Args:
+        service: Calendar service
+        queries (dict): key -> (calendar_id, time_min, time_max)
+        limit (int): Requests per batch
+        limiter (RateLimiter, optional): Shared request budget
+        fields (str, optional): Partial-response mask; defaults to
+            CalendarNode.LEAN_EVENT_FIELDS (RECURRING_EVENT_FIELDS with
+            local_recurrence)
+        local_recurrence (bool): List recurring series once and expand
+            them locally (CalendarNode.fetch_recurring_events)
+        max_retries (int): Retries per query for rate limits, 429 and 5xx;
+            a failed page is batched again in the next round, after an
+            exponential backoff
+        sleep (callable): Used for the backoff; replaced in tests
+
+    Returns:
+        tuple: (items, stats) with items a dict of key -> raw events in start
+            time order, and stats the 'rounds', 'round_trips', 'requests'
+            and 'retries' made, plus the 'series_lookups' batched with
+            local_recurrence.
+
+    Raises:
+        BatchFetchError: If any query, or an exception lookup for one of its
+            series, failed for good, after the other queries completed, so
+            no caller writes a partial range
+    """
+    from src.CalendarNode import LEAN_EVENT_FIELDS, RECURRING_EVENT_FIELDS, fetch_instances, fetch_series_exceptions
+    from src.RecurrenceNode import expand_events, lookup_masters
+    if fields is None:
+        fields = RECURRING_EVENT_FIELDS if local_recurrence else LEAN_EVENT_FIELDS
+    extra = {'fields': fields} if fields else {}
+    if not local_recurrence:
+        extra['orderBy'] = 'startTime'
+    stats = {'rounds': 0, 'round_trips': 0, 'requests': 0, 'retries': 0}
+
+    def build_request(key, page_token):
+        return service.events().list(
+            calendarId=queries[key][0],
+            timeMin=queries[key][1],
+            timeMax=queries[key][2],
+            singleEvents=not local_recurrence,
+            pageToken=page_token,
+            **extra
+        )
+
+    items, failed = _fetch_pages(service, build_request, {key: None for key in queries},
+                                 lambda key: f"events from {queries[key][0]}",
+                                 limit, limiter, max_retries, sleep, stats)
+
+    if local_recurrence:
+        # A series shared by several windows of a calendar is looked up once
+        masters, owners = {}, {}
+        for key, events in items.items():
+            calendar_id = queries[key][0]
+            for master in lookup_masters(events):
+                masters[(calendar_id, master['id'])] = (calendar_id, master)
+                owners.setdefault((calendar_id, master['id']), []).append(key)
+        stats['series_lookups'] = len(masters)
+        exceptions, lookup_failed = fetch_exception_lists(service, masters, limit, limiter, max_retries, sleep, stats)
+        for lookup, error in lookup_failed.items():
+            for key in owners[lookup]:
+                failed[key] = error
+                items.pop(key, None)
+
+    if failed:
+        raise BatchFetchError(failed, items, stats)
+
+    if local_recurrence:
+        for key, events in items.items():
+            calendar_id, time_min, time_max = queries[key]
+            items[key] = expand_events(
+                events, time_min, time_max,
+                fetch_instances=lambda event_id, c=calendar_id, lo=time_min, hi=time_max:
+                    fetch_instances(service, c, event_id, lo, hi),
+                # Only called on a cache miss; a series that expired since lookup_masters is fetched alone
+                fetch_exceptions=lambda master, c=calendar_id: exceptions[(c, master['id'])]
+                    if (c, master['id']) in exceptions else fetch_series_exceptions(service, c, master)
+            )
+    return items, stats
+
+def ensure_sheets(service, targets, limit=API_BATCH_LIMIT, limiter=None):
+    """
+    Makes sure every named sheet exists, batching the metadata lookups and
+    the addSheet updates across spreadsheets: two round trips at most for
+    up to `limit` spreadsheets, instead of one or two per sheet.
+
+    Args:
+        service: Sheets service
+        targets (dict): spreadsheet_id -> iterable of sheet names
+        limit (int): Requests per batch
+        limiter (RateLimiter, optional): Shared request budget
+
+    Returns:
+        tuple: (ready, round_trips) with ready the set of
+            (spreadsheet_id, sheet_name) pairs known to exist
+    """
+    lookups = {
+        spreadsheet_id: service.spreadsheets().get(spreadsheetId=spreadsheet_id, fields='sheets.properties.title')
+        for spreadsheet_id in targets
+    }
+    responses, errors, round_trips = run_batch(service, lookups, limit, limiter)
+    for spreadsheet_id, error in errors.items():
+        print(f"Could not read sheets of {spreadsheet_id}: {error}")
+
+    ready = set()
+    updates = {}
+    missing_by_spreadsheet = {}
+    for spreadsheet_id, metadata in responses.items():
+        existing = {sheet['properties']['title'] for sheet in metadata.get('sheets', [])}
+        missing = []
+        for name in dict.fromkeys(targets[spreadsheet_id]):
+            if name in existing:
+                ready.add((spreadsheet_id, name))
+            else:
+                missing.append(name)
+        if missing:
+            missing_by_spreadsheet[spreadsheet_id] = missing
+            updates[spreadsheet_id] = service.spreadsheets().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={'requests': [{'addSheet': {'properties': {'title': name}}} for name in missing]}
+            )
+
+    if updates:
+        responses, errors, more_round_trips = run_batch(service, updates, limit, limiter)
+        round_trips += more_round_trips
+        for spreadsheet_id, error in errors.items():
+            print(f"Could not create sheets in {spreadsheet_id}: {error}")
+        for spreadsheet_id in responses:
+            for name in missing_by_spreadsheet[spreadsheet_id]:
+                print(f"Sheet '{name}' created.")
+                ready.add((spreadsheet_id, name))
+    return ready, round_trips
@@ -12,6 +12,7 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 
+from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -22,9 +23,38 @@ from config.settings import (
     CALENDAR_SCOPES,
     CALENDAR_TOKEN_FILE,
     CREDENTIALS_FILE,
+    LEAN_FETCH,
+    LOCAL_RECURRENCE,
     PRIMARY_CALENDAR_ID,
-    SECOND_CALENDAR_ID
+    SECOND_CALENDAR_ID,
+    STREAM_PARSE,
+    STUDIO_TIMEZONE
 )
+from src.FormatterNode import FormatterNode
+from src.JsonStreamNode import stream_items
+from src.RecurrenceNode import RECURRENCE_FIELDS, expand_events, lookup_masters
+from src.TimezoneNode import normalize_events
+
+
+def event_fields_mask(fields=FormatterNode.EVENT_FIELDS):
+    """
+    Returns the partial-response mask for events().list: the event ID (the
+    warehouse key), the given event fields and the paging token.
+    """
+    return f"nextPageToken,items({','.join(('id',) + tuple(fields))})"
+
+# Mask sent with every events().list call when LEAN_FETCH is on
+LEAN_EVENT_FIELDS = event_fields_mask() if LEAN_FETCH else None
+# Mask for singleEvents=False listings, which also need the recurrence fields
+RECURRING_EVENT_FIELDS = event_fields_mask(FormatterNode.EVENT_FIELDS + RECURRENCE_FIELDS) if LEAN_FETCH else None
+# Mask for the per-series exception lookup, which only needs to know which instances were overridden
+SERIES_EXCEPTION_FIELDS = "nextPageToken,items(recurringEventId,originalStartTime)"
+# Mask for incremental sync listings, which only need to know when the changed events fall
+EVENT_CHANGE_FIELDS = "nextPageToken,nextSyncToken,items(id,status,start,originalStartTime)"
+
+
+class SyncTokenExpired(RuntimeError):
+    """The server no longer accepts a sync token (410 Gone); list the calendar in full again."""
 
 
 # # Constants
@@ -33,19 +63,30 @@ from config.settings import (
 # PRIMARY_CALENDAR_ID = os.getenv(PRIMARY_CALENDAR_ID, '') #'primary'
 # SECOND_CALENDAR_ID = os.getenv(SECOND_CALENDAR_ID, '') #'fe8846449c91e6dbd1177a8d1d29cd4e57ad901e44d4262f5fc865cc1720c95e@group.calendar.google.com'  # Replace with actual second calendar ID
 
-def get_service():
-    """Authenticate and return a Google Calendar API service instance."""
+def get_credentials():
+    """
+    Load, refresh or obtain the Google Calendar credentials.
+    The saved token is kept between runs; only one that can't be read or
+    whose refresh is rejected (revoked, scopes changed) goes through consent again.
+    """
     creds = None
 
     # Check if token.json exists
     if os.path.exists(CALENDAR_TOKEN_FILE):#'token.json'):
-        creds = Credentials.from_authorized_user_file(CALENDAR_TOKEN_FILE, CALENDAR_SCOPES)
+        try:
+            creds = Credentials.from_authorized_user_file(CALENDAR_TOKEN_FILE, CALENDAR_SCOPES)
+        except ValueError as error:
+            print(f"Ignoring unreadable calendar token ({error}); authorizing again")
 
     # If token.json is missing or invalid, prompt the user for authorization
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
+            try:
+                creds.refresh(Request())
+            except RefreshError as error:
+                print(f"Saved calendar token was rejected ({error}); authorizing again")
+                creds = None
+        if not creds or not creds.valid:
             flow = InstalledAppFlow.from_client_secrets_file(
                 CREDENTIALS_FILE, CALENDAR_SCOPES
             )
@@ -55,6 +96,12 @@ def get_service():
         with open(CALENDAR_TOKEN_FILE, 'w') as token:
             token.write(creds.to_json())
 
+    return creds
+
+def get_service():
+    """Authenticate and return a Google Calendar API service instance."""
+    creds = get_credentials()
+
     # Build the Google Calendar API service
     service = build('calendar', 'v3', credentials=creds)
     return service
@@ -79,50 +126,220 @@ def format_dates_for_api(start_date, end_date):
     """Formats the start and end dates as ISO 8601 strings for the API."""
     return start_date.isoformat() + 'Z', end_date.isoformat() + 'Z'
 
-def fetch_events_from_service(service, calendar_id, time_min, time_max):
+def iter_event_pages(service, calendar_id, time_min, time_max, fields=LEAN_EVENT_FIELDS, single_events=True,
+                     stream=STREAM_PARSE):
     """
-    Fetches events from the calendar service for the specified time range.
-    Handles API errors gracefully.
+    Yields the events of the specified time range one API page at a time,
+    following nextPageToken, in start time order.
+    Only the `fields` mask is downloaded (None for full event resources).
+    With single_events=False recurring events come back as their master
+    event plus exceptions, unordered (see fetch_recurring_events).
+    With stream, each page is an iterator that decodes its events one at a
+    time (JsonStreamNode.StreamedPage); consume it before the next page.
+    Raises HttpError on API errors.
     """
-    try:
-        events_result = service.events().list(
+    page_token = None
+    extra = {'fields': fields} if fields else {}
+    if single_events:
+        extra['orderBy'] = 'startTime'
+    while True:
+        request = service.events().list(
+            calendarId=calendar_id,
+            timeMin=time_min,
+            timeMax=time_max,
+            singleEvents=single_events,
+            pageToken=page_token,
+            **extra
+        )
+        events_result = (stream_items(request) if stream else request).execute()
+        yield events_result.get('items', [])
+        page_token = events_result.get('nextPageToken')
+        if not page_token:
+            return
+
+def fetch_instances(service, calendar_id, event_id, time_min, time_max, fields=LEAN_EVENT_FIELDS):
+    """Fetches the server-expanded instances of one recurring event in the time range."""
+    instances = []
+    page_token = None
+    extra = {'fields': fields} if fields else {}
+    while True:
+        result = service.events().instances(
             calendarId=calendar_id,
+            eventId=event_id,
             timeMin=time_min,
             timeMax=time_max,
-            singleEvents=True,
-            orderBy='startTime'
+            pageToken=page_token,
+            **extra
+        ).execute()
+        instances.extend(result.get('items', []))
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            return instances
+
+def fetch_series_exceptions(service, calendar_id, master, fields=SERIES_EXCEPTION_FIELDS):
+    """
+    Fetches every exception of a recurring series wherever it now falls:
+    events().list by the series' iCalUID, with singleEvents=False and no
+    time bounds, returns the master and all its modified or cancelled
+    instances. Returns [] for a master without an iCalUID.
+    Raises HttpError on API errors.
+    """
+    ical_uid = master.get('iCalUID')
+    if not ical_uid:
+        return []
+    exceptions = []
+    page_token = None
+    while True:
+        result = service.events().list(
+            calendarId=calendar_id,
+            iCalUID=ical_uid,
+            singleEvents=False,
+            showDeleted=True,
+            pageToken=page_token,
+            fields=fields
         ).execute()
-        return events_result.get('items', [])
+        exceptions.extend(event for event in result.get('items', []) if event.get('recurringEventId'))
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            return exceptions
+
+def list_event_changes(service, calendar_id, sync_token=None, time_min=None, fields=EVENT_CHANGE_FIELDS):
+    """
+    Lists the events changed since `sync_token`, cancelled ones included,
+    following nextPageToken. With singleEvents a changed series comes back
+    as its instances. Without a token, lists the events from `time_min` on
+    to get the first token.
+
+    Returns:
+        tuple: (events, the nextSyncToken for the next call)
+
+    Raises:
+        SyncTokenExpired: If the server rejects the token with 410 Gone
+        HttpError: On other API errors
+    """
+    query = {'syncToken': sync_token} if sync_token else {'timeMin': time_min} if time_min else {}
+    events = []
+    page_token = None
+    while True:
+        try:
+            result = service.events().list(
+                calendarId=calendar_id,
+                singleEvents=True,
+                pageToken=page_token,
+                fields=fields,
+                **query
+            ).execute()
+        except HttpError as error:
+            if sync_token and error.resp.status == 410:
+                raise SyncTokenExpired(f"Sync token for {calendar_id} expired") from error
+            raise
+        events.extend(result.get('items', []))
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            return events, result.get('nextSyncToken')
+
+def fetch_recurring_events(service, calendar_id, time_min, time_max, fields=RECURRING_EVENT_FIELDS):
+    """
+    Fetches the events of the specified time range with singleEvents=False
+    (each recurring series once, plus its exceptions) and expands the series
+    locally with RecurrenceNode, in start time order. Rules RecurrenceNode
+    can't expand are fetched with events().instances instead, and the
+    exceptions of each series not in RecurrenceNode's cache are looked up
+    (several at once with a batch request), so instances moved out of the
+    range are dropped.
+    Raises HttpError on API errors.
+    """
+    events = []
+    for page in iter_event_pages(service, calendar_id, time_min, time_max, fields, single_events=False):
+        events.extend(page)
+    fetched = {}
+    masters = lookup_masters(events)
+    if len(masters) > 1:
+        from src.BatchNode import fetch_exception_lists
+        fetched, _ = fetch_exception_lists(service, {master['id']: (calendar_id, master) for master in masters})
+    return expand_events(
+        events, time_min, time_max,
+        fetch_instances=lambda event_id: fetch_instances(service, calendar_id, event_id, time_min, time_max),
+        # Lookups that failed in the batch, or a single one, are made on their own
+        fetch_exceptions=lambda master: fetched[master['id']] if master['id'] in fetched
+            else fetch_series_exceptions(service, calendar_id, master)
+    )
+
+def fetch_events_from_service(service, calendar_id, time_min, time_max, local_recurrence=LOCAL_RECURRENCE):
+    """
+    Fetches events from the calendar service for the specified time range.
+    With local_recurrence, recurring events are expanded locally instead of
+    being downloaded instance by instance.
+    Handles API errors gracefully.
+    """
+    try:
+        if local_recurrence:
+            return fetch_recurring_events(service, calendar_id, time_min, time_max)
+        events = []
+        for page in iter_event_pages(service, calendar_id, time_min, time_max):
+            events.extend(page)
+        return events
     except HttpError as error:
         print(f"An error occurred while fetching events from {calendar_id}: {error}")
         return []
 
+def format_event(event, calendar_id=None):
+    """Formats one raw event into the simplified structure."""
+    # Extract start and end times
+    start = event['start'].get('dateTime', event['start'].get('date'))
+    end = event['end'].get('dateTime', event['end'].get('date'))
+
+    return {
+        'id': event.get('id', ''),
+        'start': start,
+        'end': end,
+        'summary': event.get('summary', ''),  # Default to empty string
+        'description': event.get('description', ''),  # Default to empty string
+        'calendar': calendar_id if calendar_id else 'primary'  # Ensure calendar ID is never None
+    }
+
 def format_events(events, calendar_id=None):
-    """Formats the raw event data into a simplified structure."""
+    """Formats the raw event data (a list or an iterator) into a simplified structure."""
     if not events:
         print(f'No events found in calendar: {calendar_id if calendar_id else "primary"}')
         return []
-    
+
+    return [format_event(event, calendar_id) for event in events]
+
+def fetch_formatted_events(service, calendar_id, time_min, time_max):
+    """
+    Fetches and formats the events of the specified time range page by page.
+    With STREAM_PARSE each raw event is decoded, formatted and dropped in
+    turn, so only one raw event is held at a time rather than every page.
+    Handles API errors gracefully.
+    """
     formatted_events = []
-    
-    for event in events:
-        # Extract start and end times
-        start = event['start'].get('dateTime', event['start'].get('date'))
-        end = event['end'].get('dateTime', event['end'].get('date'))
-        
-        formatted_event = {
-            'start': start,
-            'end': end,
-            'summary': event.get('summary', ''),  # Default to empty string
-            'description': event.get('description', ''),  # Default to empty string
-            'calendar': calendar_id if calendar_id else 'primary'  # Ensure calendar ID is never None
-        }
-        
-        formatted_events.append(formatted_event)
-    
+    try:
+        for page in iter_event_pages(service, calendar_id, time_min, time_max):
+            formatted_events.extend(format_event(event, calendar_id) for event in page)
+    except HttpError as error:
+        print(f"An error occurred while fetching events from {calendar_id}: {error}")
+        return []
+    if not formatted_events:
+        print(f'No events found in calendar: {calendar_id}')
     return formatted_events
 
-def get_calendar_data(start_date, end_date=None):
+def iter_calendar_events(service, calendar_ids, time_min, time_max):
+    """
+    Yields the formatted events of every calendar in turn, page by page,
+    without collecting them, for consumers with a memory budget (e.g.
+    FormatterNode with a spill_threshold). Each calendar is in start time
+    order; the calendars are not merged.
+    Raises HttpError on API errors.
+    """
+    for calendar_id in calendar_ids:
+        print(f"Fetching events from calendar: {calendar_id}")
+        for page in iter_event_pages(service, calendar_id, time_min, time_max):
+            for event in page:
+                yield format_event(event, calendar_id)
+
+def get_calendar_data(start_date, end_date=None, service=None, calendar_ids=None, batched=False,
+                      local_recurrence=LOCAL_RECURRENCE, timezone=STUDIO_TIMEZONE):
     """
     Retrieves calendar events within the specified date range from both primary and second calendar.
     If end_date is None, fetches all events for the month of start_date.
@@ -130,12 +347,23 @@ def get_calendar_data(start_date, end_date=None):
     Args:
         start_date (str): Start date in YYYY-MM-DD format.
         end_date (str, optional): End date in YYYY-MM-DD format.
+        service (optional): Calendar service to reuse; one is created if omitted.
+        calendar_ids (list, optional): Calendars to fetch instead of the configured two.
+        batched (bool): Fetch every calendar's pages in shared batch requests
+            (one round trip per page round) instead of one request per page;
+            a calendar that still fails after retries raises
+            BatchNode.BatchFetchError rather than returning partial events.
+        local_recurrence (bool): Expand recurring events locally (see
+            fetch_recurring_events) instead of fetching every instance.
+        timezone (str, optional): Studio zone the event times are converted
+            to (see TimezoneNode); empty leaves them as fetched.
     
     Returns:
         list: Combined and formatted events from both calendars.
     """
-    # Hard-coded calendar IDs
-    calendar_ids = [PRIMARY_CALENDAR_ID, SECOND_CALENDAR_ID]
+    # Hard-coded calendar IDs unless the caller (e.g. a tenant) supplies its own
+    if calendar_ids is None:
+        calendar_ids = [PRIMARY_CALENDAR_ID, SECOND_CALENDAR_ID]
     
     # Parse and calculate dates
     start_date_obj = parse_date(start_date)
@@ -145,16 +373,33 @@ def get_calendar_data(start_date, end_date=None):
     time_min, time_max = format_dates_for_api(start_date_obj, end_date_obj)
 
     # Get calendar service
-    service = get_service()
+    if service is None:
+        service = get_service()
 
     # Fetch and combine events from both calendars
     all_events = []
+    if batched:
+        from src.BatchNode import fetch_event_lists
+        items, stats = fetch_event_lists(
+            service, {calendar_id: (calendar_id, time_min, time_max) for calendar_id in calendar_ids},
+            local_recurrence=local_recurrence
+        )
+        for calendar_id in calendar_ids:
+            all_events.extend(format_events(items[calendar_id], calendar_id))
+        normalize_events(all_events, timezone)
+        print(f"Total events fetched: {len(all_events)} in {stats['round_trips']} batch round trip(s)")
+        return all_events
+
     for calendar_id in calendar_ids:
         print(f"Fetching events from calendar: {calendar_id}")
-        events = fetch_events_from_service(service, calendar_id, time_min, time_max)
-        formatted_events = format_events(events, calendar_id)
+        if local_recurrence:
+            events = fetch_events_from_service(service, calendar_id, time_min, time_max, local_recurrence)
+            formatted_events = format_events(events, calendar_id)
+        else:
+            formatted_events = fetch_formatted_events(service, calendar_id, time_min, time_max)
         all_events.extend(formatted_events)
 
+    normalize_events(all_events, timezone)
     print(f"Total events fetched: {len(all_events)}")
     return all_events
 
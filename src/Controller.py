@@ -0,0 +1,596 @@
+import itertools
+import os
+import queue
+import sys
+import threading
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from googleapiclient.errors import HttpError
+
+from config.settings import (
+    SPREADSHEET_ID,
+    SHEET_CHUNK_SIZE,
+    RUN_REPORT_DIR,
+    PROFILE_ENABLED,
+    PROFILE_DIR,
+    SHEET_RECONCILE,
+    SORT_SPILL_DIR,
+    SORT_SPILL_EVENTS
+)
+from src.FormatterNode import FormatterNode
+from src.CalendarNode import (
+    get_calendar_data,
+    iter_calendar_events,
+    parse_date,
+    calculate_end_date,
+    format_dates_for_api
+)
+from src.SheetNode import write_data_to_sheet, create_sheet_if_not_exists
+from src.ReconcileNode import SheetReconciler, reconcile_sheet
+from src.ExportNode import export_rows, get_sink
+from src.PipelineNode import StreamingPipeline
+from src.SortNode import ExternalSorter
+from src.TimezoneNode import get_normalizer, normalize_events
+from src.WarehouseNode import SessionWarehouse
+from src.SummaryNode import SummaryAggregator
+from src.MetricsNode import RunMetrics, bind_metrics
+from src.ServiceNode import RateLimiter, ServicePool
+from src.TenantNode import default_tenant
+
+# Target spreadsheet; set SPREADSHEET_ID in .env to use your own
+DEFAULT_SPREADSHEET_ID = SPREADSHEET_ID or "19GpFb5B8SaVqjgqkBGrytiCzwU6D1PIiqnRrw_Qrmcg"
+
+
+class PipelineCancelled(Exception):
+    """Raised inside process_pipeline when a run is cancelled between stages."""
+
+
+def sheet_name_for(start_date, end_date):
+    """Returns the sheet name for a date range - handles None end dates properly."""
+    if end_date:
+        return f"{start_date}_{end_date}_combined"
+    return f"{start_date}_EOM_combined"
+
+def process_pipeline(start_date, end_date, export_path=None, availability=None, search_index=None,
+                     progress=None, cancel_event=None, services=None, overlapped=False,
+                     metrics=None, report_dir=RUN_REPORT_DIR, profile=None, tenant=None,
+                     batched=False, prefetched=None, sheets_ready=False):
+    """
+    Executes the pipeline: fetch, format, and write data.
+
+    Args:
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str or None): End date in YYYY-MM-DD format
+        export_path (str, optional): Also export the formatted rows to this
+            file (.csv, .db, .parquet or .arrow)
+        availability (StudioAvailability, optional): Index to refresh with the
+            fetched window; moved and cancelled bookings lose their old busy time
+        search_index (EventSearchIndex, optional): Artist/keyword index to
+            update with the fetched events
+        progress (callable, optional): Called as progress(stage, count) after
+            each stage: 'fetched' (events), 'formatted' (rows), 'written' (cells)
+        cancel_event (threading.Event, optional): When set, the run stops at the
+            next stage boundary with PipelineCancelled
+        services (ServicePool, optional): Shared credentials, per-thread
+            services and request budget; an unlimited pool is built per run if omitted
+        overlapped (bool): Run fetch, format and write as concurrent stages
+            connected by bounded queues (see PipelineNode.StreamingPipeline)
+        metrics (RunMetrics, optional): Collects stage timings, API calls and
+            counts for this run; a new one is created if omitted
+        report_dir (str, optional): Directory for the JSON run report; None
+            skips writing it
+        profile (bool, optional): Write per-stage CPU profiles and allocation
+            reports under PROFILE_DIR; defaults to the STUDIO_PROFILE setting
+        tenant (Tenant, optional): Location whose calendars, studio names and
+            spreadsheet to use; defaults to the single location in .env
+        batched (bool): Fetch the calendars with batched list requests
+        prefetched (list, optional): Already fetched events (e.g. from a
+            multi-range BatchNode.fetch_event_lists); skips the fetch
+        sheets_ready (bool): The target and summary sheets are known to
+            exist (e.g. from BatchNode.ensure_sheets); skips the checks
+
+    Returns:
+        dict: Run summary with the sheet name, event, row and cell counts, the
+            path of the run report and, when profiling, the profile directory
+    """
+    tenant = tenant or default_tenant(DEFAULT_SPREADSHEET_ID)
+    if overlapped and (batched or prefetched is not None or sheets_ready):
+        raise ValueError("Batched fetching and pre-created sheets apply to staged runs, not overlapped ones")
+    metrics = metrics or RunMetrics(labels={
+        'tenant': tenant.name, 'start_date': start_date, 'end_date': end_date or 'EOM'
+    })
+    services = services or ServicePool(RateLimiter(rate=0))
+    if profile is None:
+        profile = PROFILE_ENABLED
+    if profile:
+        from src.ProfileNode import StageProfiler
+        metrics.profiler = StageProfiler(os.path.join(PROFILE_DIR, metrics.run_id))
+    kwargs = {} if overlapped else {'batched': batched, 'prefetched': prefetched, 'sheets_ready': sheets_ready}
+    run = process_pipeline_overlapped if overlapped else _process_pipeline_staged
+    try:
+        with bind_metrics(metrics), metrics.stage('total', profile=False):
+            summary = run(
+                start_date, end_date, export_path=export_path, availability=availability,
+                search_index=search_index, progress=progress, cancel_event=cancel_event, services=services, metrics=metrics,
+                tenant=tenant, **kwargs
+            )
+    finally:
+        report_path = metrics.write_report(report_dir) if report_dir else None
+        profile_dir = metrics.profiler.close() if profile else None
+    summary['tenant'] = tenant.name
+    summary['report'] = report_path
+    if profile_dir:
+        summary['profile'] = profile_dir
+        print(f"Stage profiles written to {profile_dir}")
+    return summary
+
+def _process_pipeline_staged(start_date, end_date, export_path, availability, search_index, progress,
+                             cancel_event, services, metrics, tenant, batched=False, prefetched=None,
+                             sheets_ready=False):
+    """Runs each stage to completion before the next; see process_pipeline."""
+    def checkpoint():
+        if cancel_event is not None and cancel_event.is_set():
+            raise PipelineCancelled(f"Run {start_date} to {end_date or 'EOM'} cancelled")
+
+    def report(stage, count):
+        metrics.count(stage, count)
+        if progress is not None:
+            progress(stage, count)
+
+    # Fetch calendar data (now using both hard-coded calendars)
+    checkpoint()
+    if prefetched is not None:
+        raw_data = prefetched
+        with metrics.stage('normalize'):
+            normalize_events(raw_data, tenant.timezone)
+    else:
+        with metrics.stage('fetch'):
+            raw_data = get_calendar_data(start_date, end_date, service=services.calendar(),
+                                         calendar_ids=tenant.calendar_ids, batched=batched,
+                                         timezone=tenant.timezone)
+    start_date_obj = parse_date(start_date)
+    end_date_obj = calculate_end_date(start_date_obj, end_date)
+    if availability is not None:
+        availability.replace_window(raw_data, start_date_obj, end_date_obj, calendars=tenant.calendar_ids)
+    if search_index is not None:
+        search_index.update(raw_data)
+    report('fetched', len(raw_data))
+
+    # Format data
+    checkpoint()
+    with metrics.stage('format'):
+        formatter = FormatterNode(studio_map=tenant.studio_map, event_ids=SHEET_RECONCILE)
+        event_rows = list(formatter.iter_event_rows(raw_data))
+        formatted_data = [formatter.template] + [row for _, row in event_rows]
+    report('formatted', len(event_rows))
+
+    # Write data to Google Sheets
+    checkpoint()
+    service = services.sheets()
+    spreadsheet_id = tenant.spreadsheet_id
+
+    # Create sheet name with date range
+    sheet_name = sheet_name_for(start_date, end_date)
+
+    # Create sheet and write data
+    cells = 0
+    with metrics.stage('write'):
+        if sheets_ready or create_sheet_if_not_exists(service, spreadsheet_id, sheet_name):
+            # Debug print statement
+            print(f"Formatted data (first 2 entries):\n{formatted_data[:2]}")
+            if SHEET_RECONCILE:
+                # Keep staff edits to the manual columns; later stages see the merged rows
+                merged, stats = reconcile_sheet(service, spreadsheet_id, sheet_name, formatted_data)
+                if merged is not None:
+                    formatted_data = merged
+                    event_rows = [(event, row) for (event, _), row in zip(event_rows, merged[1:])]
+                    cells = stats['changed_cells']
+                    metrics.count('manual_edits_kept', stats['kept_manual'])
+            elif write_data_to_sheet(service, spreadsheet_id, sheet_name, formatted_data):
+                cells = sum(len(row) for row in formatted_data)
+    report('written', cells)
+
+    # Keep the local warehouse up to date for offline queries
+    with metrics.stage('warehouse'), SessionWarehouse() as warehouse:
+        warehouse.upsert_formatted(event_rows, start_date_obj, end_date_obj, calendars=tenant.calendar_ids)
+
+    # Write payroll and utilization totals to a summary tab
+    with metrics.stage('summary'):
+        window_end = end_date_obj.strftime("%Y-%m-%d")
+        summary_data = SummaryAggregator(start_date, window_end, studios=formatter.studio_names()).aggregate(formatted_data)
+        summary_sheet_name = f"{sheet_name}_summary"
+        if sheets_ready or create_sheet_if_not_exists(service, spreadsheet_id, summary_sheet_name):
+            write_data_to_sheet(service, spreadsheet_id, summary_sheet_name, summary_data)
+
+    # Optionally archive the rows locally
+    if export_path:
+        with metrics.stage('export'):
+            export_rows(formatted_data, export_path)
+
+    print("Pipeline executed successfully.")
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'sheet': sheet_name,
+        'events': len(raw_data),
+        'rows': len(event_rows),
+        'cells': cells,
+    }
+
+def process_pipeline_overlapped(start_date, end_date, export_path=None, availability=None,
+                                search_index=None, progress=None, cancel_event=None, services=None, metrics=None,
+                                tenant=None):
+    """
+    Executes the pipeline with fetch, format and write overlapping: calendar
+    pages are formatted as they arrive and rows are written to the sheet in
+    chunks while later pages are still downloading. Reached through
+    process_pipeline(overlapped=True), which supplies the services and
+    metrics; progress counts are reported as running totals.
+    """
+    metrics = metrics or RunMetrics()
+    services = services or ServicePool(RateLimiter(rate=0))
+    tenant = tenant or default_tenant(DEFAULT_SPREADSHEET_ID)
+    formatter = FormatterNode(studio_map=tenant.studio_map, event_ids=SHEET_RECONCILE)
+    start_date_obj = parse_date(start_date)
+    end_date_obj = calculate_end_date(start_date_obj, end_date)
+    time_min, time_max = format_dates_for_api(start_date_obj, end_date_obj)
+    sheet_name = sheet_name_for(start_date, end_date)
+
+    # The streamed writer rewrites the whole tab; carry staff edits into the rows first
+    reconciler = None
+    if SHEET_RECONCILE:
+        reconciler = SheetReconciler(formatter.template)
+        try:
+            reconciler.load(services.sheets(), tenant.spreadsheet_id, sheet_name)
+        except HttpError:
+            # The tab doesn't exist yet
+            reconciler = None
+
+    # Taps on the row stream, run on the format thread
+    aggregator = SummaryAggregator(start_date, end_date_obj.strftime("%Y-%m-%d"),
+                                   studios=formatter.studio_names())
+    pending = []
+    fetched_keys = set()
+    warehouse_keys = set()
+
+    def flush_warehouse():
+        if pending:
+            with metrics.stage('warehouse'), SessionWarehouse() as warehouse:
+                warehouse.upsert_formatted(pending)
+            pending.clear()
+
+    def on_formatted(event, row):
+        if reconciler is not None:
+            reconciler.carry_manual(row)
+        aggregator.add(row)
+        if availability is not None:
+            availability.update([event])
+            fetched_keys.add(availability.event_key(event))
+        if search_index is not None:
+            search_index.update([event])
+        pending.append((event, row))
+        warehouse_keys.add(SessionWarehouse.event_key(event))
+        if len(pending) >= SHEET_CHUNK_SIZE:
+            flush_warehouse()
+
+    sinks = [get_sink(export_path)] if export_path else []
+    pipeline = StreamingPipeline(formatter, progress=progress, cancel_event=cancel_event, metrics=metrics,
+                                 normalizer=get_normalizer(tenant.timezone))
+    counts = pipeline.run(
+        tenant.calendar_ids, time_min, time_max,
+        calendar_service_factory=services.calendar,
+        sheets_service_factory=services.sheets,
+        spreadsheet_id=tenant.spreadsheet_id, sheet_name=sheet_name,
+        on_formatted=on_formatted, sinks=sinks,
+    )
+    if cancel_event is not None and cancel_event.is_set():
+        raise PipelineCancelled(f"Run {start_date} to {end_date or 'EOM'} cancelled")
+    if availability is not None:
+        # The whole window streamed through; drop bookings that are gone from it
+        availability.forget_missing(fetched_keys, start_date_obj, end_date_obj, calendars=tenant.calendar_ids)
+    flush_warehouse()
+    with metrics.stage('warehouse'), SessionWarehouse() as warehouse:
+        warehouse.forget_missing(warehouse_keys, start_date_obj, end_date_obj, calendars=tenant.calendar_ids)
+    for stage, count in counts.items():
+        metrics.count(stage, count)
+    if reconciler is not None:
+        metrics.count('manual_edits_kept', reconciler.stats['kept_manual'])
+
+    # Write payroll and utilization totals to a summary tab
+    with metrics.stage('summary'):
+        service = services.sheets()
+        summary_sheet_name = f"{sheet_name}_summary"
+        if create_sheet_if_not_exists(service, tenant.spreadsheet_id, summary_sheet_name):
+            write_data_to_sheet(service, tenant.spreadsheet_id, summary_sheet_name, aggregator.summary_rows())
+
+    print("Pipeline executed successfully.")
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'sheet': sheet_name,
+        'events': counts['fetched'],
+        'rows': counts['formatted'],
+        'cells': counts['written'],
+    }
+
+def preview_range(start_date, end_date, services=None, tenant=None, availability=None, search_index=None,
+                  progress=None, cancel_event=None):
+    """
+    Fetches and formats a date range without writing anything, so the rows
+    can be reviewed (e.g. in the GUI's PreviewNode.PreviewTable) before a run
+    writes them. Takes the same keyword arguments PipelineWorker passes to
+    process_pipeline, so it can be submitted to the same worker.
+
+    Returns:
+        dict: Run summary with the sheet the rows would go to, the event and
+            row counts, and 'preview': the formatted rows, header first
+    """
+    tenant = tenant or default_tenant(DEFAULT_SPREADSHEET_ID)
+    services = services or ServicePool(RateLimiter(rate=0))
+    raw_data = get_calendar_data(start_date, end_date, service=services.calendar(),
+                                 calendar_ids=tenant.calendar_ids, timezone=tenant.timezone)
+    if availability is not None:
+        start_date_obj = parse_date(start_date)
+        availability.replace_window(raw_data, start_date_obj, calculate_end_date(start_date_obj, end_date),
+                                    calendars=tenant.calendar_ids)
+    if search_index is not None:
+        search_index.update(raw_data)
+    if progress is not None:
+        progress('fetched', len(raw_data))
+    if cancel_event is not None and cancel_event.is_set():
+        raise PipelineCancelled(f"Preview {start_date} to {end_date or 'EOM'} cancelled")
+
+    formatted_data = FormatterNode(studio_map=tenant.studio_map).format_data(raw_data)
+    if progress is not None:
+        progress('formatted', len(formatted_data) - 1)
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'sheet': sheet_name_for(start_date, end_date),
+        'events': len(raw_data),
+        'rows': len(formatted_data) - 1,
+        'preview': formatted_data,
+    }
+
+def fetch_availability(start_date, end_date, services=None, tenant=None, availability=None, search_index=None,
+                       progress=None, cancel_event=None):
+    """
+    Fetches a date range into the availability index only, for free-slot
+    searches; takes the keyword arguments PipelineWorker passes, so the GUI
+    fetches on the worker thread (where the OAuth flow may also run).
+
+    Returns:
+        dict: 'start_date', 'end_date', the 'events' fetched and the
+            'availability' changes (events added, moved or removed)
+    """
+    tenant = tenant or default_tenant(DEFAULT_SPREADSHEET_ID)
+    services = services or ServicePool(RateLimiter(rate=0))
+    raw_data = get_calendar_data(start_date, end_date, service=services.calendar(),
+                                 calendar_ids=tenant.calendar_ids, timezone=tenant.timezone)
+    if progress is not None:
+        progress('fetched', len(raw_data))
+    changed = 0
+    if availability is not None:
+        start_date_obj = parse_date(start_date)
+        changed = availability.replace_window(raw_data, start_date_obj, calculate_end_date(start_date_obj, end_date),
+                                              calendars=tenant.calendar_ids)
+    if search_index is not None:
+        search_index.update(raw_data)
+    return {'start_date': start_date, 'end_date': end_date, 'events': len(raw_data), 'availability': changed}
+
+def seed_search_index(start_date=None, end_date=None, services=None, tenant=None, availability=None,
+                      search_index=None, progress=None, cancel_event=None):
+    """
+    Loads the sessions stored in the local warehouse into a search index.
+    Takes the keyword arguments PipelineWorker passes, so the GUI can run it
+    on the worker thread instead of freezing the window while a large
+    warehouse is indexed; the dates are ignored.
+
+    Returns:
+        dict: 'seeded', the stored sessions added, and 'sessions', the
+            index size afterwards
+    """
+    if search_index is None:
+        return {'seeded': 0, 'sessions': 0}
+    with SessionWarehouse() as warehouse:
+        seeded = search_index.update(warehouse.iter_events())
+    if progress is not None:
+        progress('indexed', seeded)
+    return {'seeded': seeded, 'sessions': len(search_index)}
+
+def export_range(start_date, end_date, export_path, services=None, tenant=None, metrics=None,
+                 spill_threshold=SORT_SPILL_EVENTS, spill_dir=SORT_SPILL_DIR, progress=None,
+                 cancel_event=None):
+    """
+    Exports a date range straight to a file without writing sheets, on a
+    memory budget: events stream from the calendars into an external sort
+    that spills sorted runs to temporary files past `spill_threshold`
+    events, and the merged stream is formatted and written to the sink row
+    by row. Neither the events nor the rows are ever all held at once, so
+    multi-year ranges fit on small machines. Accepts the keyword arguments
+    run_ranges passes, so it can stand in for process_pipeline there.
+
+    Args:
+        start_date (str): Start date in YYYY-MM-DD format
+        end_date (str or None): End date in YYYY-MM-DD format
+        export_path (str): Destination file (.csv, .db, .parquet or .arrow)
+        services (ServicePool, optional): Shared services and request budget
+        tenant (Tenant, optional): Location whose calendars and studio names to use
+        metrics (RunMetrics, optional): Receives the 'export' stage timing and counts
+        spill_threshold (int): Events held in memory before a run spills
+        spill_dir (str, optional): Directory for spilled runs
+        progress (callable, optional): Called as progress(stage, count) at the end
+        cancel_event (threading.Event, optional): Checked before the export starts
+
+    Returns:
+        dict: Run summary with the export path, event and row counts and the
+            number of runs spilled
+    """
+    if not export_path:
+        raise ValueError("export_range needs an export_path")
+    if cancel_event is not None and cancel_event.is_set():
+        raise PipelineCancelled(f"Export {start_date} to {end_date or 'EOM'} cancelled")
+    tenant = tenant or default_tenant(DEFAULT_SPREADSHEET_ID)
+    metrics = metrics or RunMetrics()
+    services = services or ServicePool(RateLimiter(rate=0))
+    start_date_obj = parse_date(start_date)
+    time_min, time_max = format_dates_for_api(start_date_obj, calculate_end_date(start_date_obj, end_date))
+
+    formatter = FormatterNode(studio_map=tenant.studio_map)
+    sorter = ExternalSorter(formatter.event_sort_key, spill_threshold, spill_dir)
+
+    def rows():
+        yield formatter.template
+        for event in sorter.merged():
+            yield formatter.format_event(event)
+
+    events = iter_calendar_events(services.calendar(), tenant.calendar_ids, time_min, time_max)
+    normalizer = get_normalizer(tenant.timezone)
+    if normalizer is not None:
+        events = map(normalizer.normalize_event, events)
+
+    with bind_metrics(metrics), metrics.stage('export'):
+        sorter.extend(events)
+        events, spilled = sorter.count, sorter.spilled_runs
+        written = export_rows(rows(), export_path)
+    metrics.count('spilled_runs', spilled)
+    if progress is not None:
+        progress('fetched', events)
+        progress('formatted', written)
+
+    print(f"Exported {events} events ({spilled} run(s) spilled to disk)")
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'export': export_path,
+        'events': events,
+        'rows': written,
+        'spilled_runs': spilled,
+    }
+
+
+class PipelineWorker:
+    """
+    Runs process_pipeline jobs one at a time on a background thread.
+    Jobs are queued with `submit`; status messages are put on the thread-safe
+    `messages` queue for the UI thread to drain with `poll`:
+
+        ('queued', job_id, (start_date, end_date))
+        ('started', job_id, (start_date, end_date))
+        ('progress', job_id, (stage, count))
+        ('done', job_id, summary)
+        ('failed', job_id, error)
+        ('cancelled', job_id, None)
+    """
+
+    def __init__(self, pipeline=process_pipeline, **pipeline_kwargs):
+        self.pipeline = pipeline
+        self.pipeline_kwargs = pipeline_kwargs
+        self.jobs = queue.Queue()
+        self.messages = queue.Queue()
+        self._ids = itertools.count(1)
+        self._cancel_event = threading.Event()
+        self._cancelled_ids = set()
+        self._lock = threading.Lock()
+        self._current = None
+        self._thread = threading.Thread(target=self._run, name="PipelineWorker", daemon=True)
+        self._thread.start()
+
+    def submit(self, start_date, end_date=None, **kwargs):
+        """
+        Queues a date range and returns its job id. Keyword arguments go to
+        the pipeline, except `pipeline`, which runs another callable with the
+        same signature for this job (e.g. preview_range).
+        """
+        job_id = next(self._ids)
+        self.jobs.put((job_id, start_date, end_date, kwargs))
+        self.messages.put(('queued', job_id, (start_date, end_date)))
+        return job_id
+
+    def cancel(self, job_id=None):
+        """
+        Cancels a job. With no job_id, cancels the running job. A running job
+        stops at its next stage boundary; a queued job is skipped.
+        """
+        with self._lock:
+            if job_id is None or job_id == self._current:
+                if self._current is not None:
+                    self._cancel_event.set()
+            else:
+                self._cancelled_ids.add(job_id)
+
+    def cancel_all(self):
+        """Cancels the running job and every queued job."""
+        while True:
+            try:
+                job_id, _, _, _ = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            self.messages.put(('cancelled', job_id, None))
+            self.jobs.task_done()
+        self.cancel()
+
+    def pending(self):
+        """Returns the number of queued jobs, not counting the running one."""
+        return self.jobs.qsize()
+
+    def busy(self):
+        """Returns True while a job is running."""
+        return self._current is not None
+
+    def poll(self):
+        """Returns every message posted since the last poll, without blocking."""
+        drained = []
+        while True:
+            try:
+                drained.append(self.messages.get_nowait())
+            except queue.Empty:
+                return drained
+
+    def stop(self):
+        """Cancels outstanding work and stops the worker thread."""
+        self.cancel_all()
+        self.jobs.put(None)
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            job_id, start_date, end_date, kwargs = job
+            with self._lock:
+                if job_id in self._cancelled_ids:
+                    self._cancelled_ids.discard(job_id)
+                    self.messages.put(('cancelled', job_id, None))
+                    self.jobs.task_done()
+                    continue
+                self._current = job_id
+                self._cancel_event.clear()
+
+            self.messages.put(('started', job_id, (start_date, end_date)))
+
+            def progress(stage, count, job_id=job_id):
+                self.messages.put(('progress', job_id, (stage, count)))
+
+            pipeline = kwargs.pop('pipeline', self.pipeline)
+            try:
+                summary = pipeline(
+                    start_date, end_date,
+                    progress=progress, cancel_event=self._cancel_event,
+                    **dict(self.pipeline_kwargs, **kwargs)
+                )
+                self.messages.put(('done', job_id, summary))
+            except PipelineCancelled:
+                self.messages.put(('cancelled', job_id, None))
+            except Exception as e:
+                print(f"An error occurred: {e}")
+                self.messages.put(('failed', job_id, e))
+            finally:
+                with self._lock:
+                    self._current = None
+                self.jobs.task_done()
@@ -0,0 +1,394 @@
+import argparse
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from config.settings import (
+    DAEMON_HOST,
+    DAEMON_PORT,
+    DAEMON_SYNC_INTERVAL,
+    DAEMON_DEBOUNCE_SECONDS,
+    DAEMON_CHANNEL_TOKEN,
+    DAEMON_MONTHS_AHEAD,
+    PRIMARY_CALENDAR_ID,
+    SECOND_CALENDAR_ID
+)
+from src.MetricsNode import RunMetrics
+
+
+# Push notification states that mean the calendar changed ('sync' is the
+# handshake Google sends when a channel is opened)
+CHANGE_STATES = {'exists', 'not_exists'}
+
+def current_month_range():
+    """Returns (first day of the current month, None), i.e. the current month to its end."""
+    return datetime.now().strftime('%Y-%m-01'), None
+
+def event_month(event):
+    """
+    Returns the first day ('YYYY-MM-01') of the month an event starts in,
+    from its start or, for a cancelled instance, its original start; None
+    for a deleted event that carries neither.
+    """
+    for field in ('start', 'originalStartTime'):
+        value = event.get(field) or {}
+        day = value.get('dateTime') or value.get('date')
+        if day:
+            return f"{day[:7]}-01"
+    return None
+
+def _month_number(year, month):
+    return year * 12 + month - 1
+
+
+class SyncDaemon:
+    """
+    Long-running sync process.
+    Keeps credentials and services warm in a ServicePool, runs a sync every
+    `interval` seconds, and listens for Calendar events.watch push
+    notifications on a local HTTP endpoint. Notifications arriving within
+    `debounce` seconds of each other are coalesced into one sync, and
+    notifications that arrive during a sync trigger a single follow-up sync.
+    Metrics from every sync are accumulated and served at /metrics in the
+    Prometheus text format.
+
+    Syncs are incremental: each calendar is listed with its last
+    nextSyncToken, and only the month tabs the changed events fall in (both
+    months for a moved event) are re-synced, through the reconciling write
+    path. The first sync, and any sync after a token expired, lists the
+    calendar from the sync range's start and syncs that range in full.
+    Tokens only advance once the months they cover synced, so a failed sync
+    is retried with the same changes.
+    """
+
+    def __init__(self, sync=None, interval=DAEMON_SYNC_INTERVAL, debounce=DAEMON_DEBOUNCE_SECONDS,
+                 host=DAEMON_HOST, port=DAEMON_PORT, channel_token=DAEMON_CHANNEL_TOKEN,
+                 sync_range=current_month_range, changes=None, calendar_ids=None, months_ahead=DAEMON_MONTHS_AHEAD):
+        """
+        Args:
+            sync (callable, optional): Called as sync(start_date, end_date) per
+                month to update; defaults to a process_pipeline run on the
+                daemon's warm services
+            interval (float): Seconds between scheduled syncs
+            debounce (float): Quiet period after a notification before syncing
+            host, port: Address of the notification endpoint (port 0 picks a free port)
+            channel_token (str): If set, notifications must carry this X-Goog-Channel-Token
+            sync_range (callable): Returns the (start_date, end_date) to sync
+                when a calendar has no sync token, and every time without `changes`
+            changes (callable, optional): Called as changes(calendar_id, sync_token)
+                and returns (changed events, next sync token), raising
+                CalendarNode.SyncTokenExpired; defaults to
+                CalendarNode.list_event_changes with the default sync, and to
+                no incremental sync with a custom one
+            calendar_ids (list, optional): Calendars to watch and list
+            months_ahead (int): Changes further ahead than this many months are ignored
+        """
+        self.interval = interval
+        self.debounce = debounce
+        self.channel_token = channel_token
+        self.sync_range = sync_range
+        self.calendar_ids = calendar_ids or [PRIMARY_CALENDAR_ID, SECOND_CALENDAR_ID]
+        self.months_ahead = months_ahead
+        self.services = None
+        self._sync = sync or self._pipeline_sync
+        self._changes = changes or (self._list_changes if sync is None else None)
+        # calendar -> nextSyncToken, and (calendar, event ID) -> month it was last synced in
+        self.sync_tokens = {}
+        self.event_months = {}
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.metrics = RunMetrics(run_id='daemon')
+        self.status = {
+            'syncs': 0,
+            'failures': 0,
+            'notifications': 0,
+            'last_sync': None,
+            'last_result': None,
+            'last_error': None,
+        }
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._threads = []
+
+    @property
+    def address(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Starts the notification endpoint and the sync loop in background threads."""
+        if self._sync == self._pipeline_sync:
+            from src.ServiceNode import ServicePool
+            self.services = ServicePool().authenticate()
+        self._threads = [
+            threading.Thread(target=self.server.serve_forever, name="DaemonHTTP", daemon=True),
+            threading.Thread(target=self._loop, name="DaemonSync", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        print(f"Sync daemon listening on {self.address}/notifications, syncing every {self.interval:g}s")
+        return self
+
+    def stop(self):
+        """Stops the endpoint and waits for any running sync to finish."""
+        self._stopping.set()
+        self._wake.set()
+        self.server.shutdown()
+        self.server.server_close()
+        for thread in self._threads:
+            thread.join()
+
+    def notify(self, state='exists'):
+        """Records a change notification; the sync runs after the debounce period."""
+        with self._lock:
+            self.status['notifications'] += 1
+        if state in CHANGE_STATES:
+            self._wake.set()
+
+    def register_watch(self, address, calendar_ids=None, ttl_seconds=None):
+        """
+        Opens an events.watch channel per calendar, pointing at `address`.
+        Google only delivers to public HTTPS URLs, so `address` is normally a
+        reverse proxy or tunnel in front of this daemon's endpoint.
+
+        Returns:
+            list: The channel resources returned by the API
+        """
+        from src.ServiceNode import ServicePool
+        self.services = self.services or ServicePool().authenticate()
+        service = self.services.calendar()
+        channels = []
+        for calendar_id in calendar_ids or self.calendar_ids:
+            body = {'id': str(uuid.uuid4()), 'type': 'web_hook', 'address': address}
+            if self.channel_token:
+                body['token'] = self.channel_token
+            if ttl_seconds:
+                body['params'] = {'ttl': str(int(ttl_seconds))}
+            channel = service.events().watch(calendarId=calendar_id, body=body).execute()
+            print(f"Watching {calendar_id}: channel {channel.get('id')} until {channel.get('expiration')}")
+            channels.append(channel)
+        return channels
+
+    def _pipeline_sync(self, start_date, end_date):
+        from src.Controller import process_pipeline
+        run_metrics = RunMetrics()
+        try:
+            # Staged, so the tab is reconciled and only changed cells are written
+            return process_pipeline(start_date, end_date, services=self.services, metrics=run_metrics)
+        finally:
+            self.metrics.merge(run_metrics)
+
+    def _list_changes(self, calendar_id, sync_token):
+        from src.CalendarNode import list_event_changes
+        time_min = None if sync_token else f"{self.sync_range()[0]}T00:00:00Z"
+        return list_event_changes(self.services.calendar(), calendar_id, sync_token, time_min)
+
+    def changed_ranges(self):
+        """
+        Lists every calendar's changes since its sync token and works out the
+        month tabs they touch: the month each changed event falls in and the
+        month it was last seen in, if it moved or was deleted.
+
+        Returns:
+            tuple: (ranges, commit) with ranges the (start_date, end_date) to
+                sync, in order, and commit a callable that stores the new
+                tokens and event months once those ranges synced
+        """
+        from src.CalendarNode import SyncTokenExpired
+        full_range = self.sync_range()
+        now = datetime.now()
+        last_month = _month_number(now.year, now.month) + self.months_ahead
+        ranges, tokens, months = set(), {}, {}
+        for calendar_id in self.calendar_ids:
+            token = self.sync_tokens.get(calendar_id)
+            try:
+                events, tokens[calendar_id] = self._changes(calendar_id, token)
+            except SyncTokenExpired as e:
+                print(f"{e}; listing the calendar in full")
+                token = None
+                events, tokens[calendar_id] = self._changes(calendar_id, None)
+            if token is None:
+                ranges.add(full_range)
+            for event in events:
+                key = (calendar_id, event.get('id'))
+                month = event_month(event)
+                if token is not None:
+                    touched = {m for m in (self.event_months.get(key), month) if m}
+                    if not touched:
+                        print(f"Skipping change to {key[1]}: its month is unknown")
+                    ranges.update((m, None) for m in touched
+                                  if _month_number(int(m[:4]), int(m[5:7])) <= last_month)
+                months[key] = None if event.get('status') == 'cancelled' else month
+
+        def commit():
+            self.sync_tokens.update(tokens)
+            for key, month in months.items():
+                if month is None:
+                    self.event_months.pop(key, None)
+                else:
+                    self.event_months[key] = month
+
+        return sorted(ranges, key=lambda r: r[0]), commit
+
+    def prometheus_metrics(self):
+        """Returns accumulated sync metrics plus daemon status in the Prometheus text format."""
+        with self._lock:
+            status = dict(self.status)
+        lines = [self.metrics.to_prometheus().rstrip('\n')]
+        for name in ('syncs', 'failures', 'notifications'):
+            lines.append(f"# TYPE studio_calendar_daemon_{name}_total counter")
+            lines.append(f"studio_calendar_daemon_{name}_total {status[name]}")
+        return "\n".join(lines) + "\n"
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            notified = self._wake.wait(timeout=self.interval)
+            if self._stopping.is_set():
+                return
+            reason = 'schedule'
+            if notified:
+                reason = 'notification'
+                # Debounce: wait for a quiet period before syncing
+                while True:
+                    self._wake.clear()
+                    if not self._wake.wait(timeout=self.debounce) or self._stopping.is_set():
+                        break
+                if self._stopping.is_set():
+                    return
+            self._run_sync(reason)
+
+    def _run_sync(self, reason):
+        started = time.perf_counter()
+        try:
+            if self._changes is None:
+                ranges, commit = [self.sync_range()], None
+            else:
+                ranges, commit = self.changed_ranges()
+            if not ranges:
+                print(f"Sync ({reason}): no changes")
+            results = []
+            for start_date, end_date in ranges:
+                print(f"Sync ({reason}): {start_date} to {end_date or 'EOM'}")
+                results.append(self._sync(start_date, end_date))
+            if commit is not None:
+                commit()
+            with self._lock:
+                self.status['syncs'] += 1
+                self.status['last_result'] = {'ranges': ranges, 'results': results}
+                self.status['last_error'] = None
+        except Exception as e:
+            print(f"An error occurred during sync: {e}")
+            with self._lock:
+                self.status['failures'] += 1
+                self.status['last_error'] = str(e)
+        with self._lock:
+            self.status['last_sync'] = {
+                'reason': reason,
+                'at': datetime.now().isoformat(timespec='seconds'),
+                'seconds': round(time.perf_counter() - started, 3),
+            }
+
+    def _make_handler(self):
+        daemon = self
+
+        class NotificationHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.rstrip('/') != '/notifications':
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                if daemon.channel_token and self.headers.get('X-Goog-Channel-Token') != daemon.channel_token:
+                    self.send_error(403)
+                    return
+                daemon.notify(self.headers.get('X-Goog-Resource-State', 'exists'))
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                path = self.path.rstrip('/')
+                if path == '/healthz':
+                    with daemon._lock:
+                        body = json.dumps(daemon.status, default=str).encode()
+                    content_type = 'application/json'
+                elif path == '/metrics':
+                    body = daemon.prometheus_metrics().encode()
+                    content_type = 'text/plain; version=0.0.4'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return NotificationHandler
+
+def send_test_notification(url, state='exists', channel_id='local-test', token=DAEMON_CHANNEL_TOKEN):
+    """
+    Local stand-in for Google's push sender: POSTs a notification with the
+    same headers events.watch deliveries carry.
+
+    Returns:
+        int: HTTP status of the response
+    """
+    headers = {
+        'X-Goog-Channel-ID': channel_id,
+        'X-Goog-Resource-ID': 'local-resource',
+        'X-Goog-Resource-State': state,
+        'X-Goog-Message-Number': str(int(time.time())),
+    }
+    if token:
+        headers['X-Goog-Channel-Token'] = token
+    request = urllib.request.Request(url, data=b'', headers=headers, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the calendar sync daemon.")
+    parser.add_argument("--host", default=DAEMON_HOST)
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    parser.add_argument("--interval", type=float, default=DAEMON_SYNC_INTERVAL, help="Seconds between scheduled syncs")
+    parser.add_argument("--debounce", type=float, default=DAEMON_DEBOUNCE_SECONDS, help="Quiet seconds before a push-triggered sync")
+    parser.add_argument("--watch-address", help="Public HTTPS URL to register with events.watch")
+    parser.add_argument("--send-test", metavar="URL", help="Send a test notification to URL and exit")
+    args = parser.parse_args(argv)
+
+    if args.send_test:
+        print(f"Response: {send_test_notification(args.send_test)}")
+        return
+
+    daemon = SyncDaemon(interval=args.interval, debounce=args.debounce, host=args.host, port=args.port)
+    daemon.start()
+    if args.watch_address:
+        daemon.register_watch(args.watch_address)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("Stopping sync daemon...")
+        daemon.stop()
+
+if __name__ == '__main__':
+    main()
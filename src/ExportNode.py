@@ -0,0 +1,263 @@
+import csv
+import os
+import re
+import sqlite3
+import sys
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from config.settings import EXPORT_BATCH_SIZE, EXPORT_DIR
+
+
+# Template columns that hold numbers; exported as numbers where the format allows it
+NUMERIC_COLUMNS = {"Hours", "Price", "Engineer Payment", "Referral Payment"}
+
+def column_name(header):
+    """Converts a template header such as 'Paid?' or 'Artist Name' into a column name."""
+    return re.sub(r'[^a-z0-9]+', '_', header.lower()).strip('_')
+
+def to_number(value):
+    """Converts a formatted cell into a float, or None when it is blank or not numeric."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RowSink:
+    """
+    Base class for offline output sinks.
+    Consumes the FormatterNode row stream (header row first) and writes it in
+    batches of `batch_size` rows, so memory use stays bounded regardless of
+    how many sessions are exported.
+    """
+
+    def __init__(self, path, batch_size=EXPORT_BATCH_SIZE):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.header = None
+
+    def open(self, header):
+        """Prepares the destination for rows with the given header."""
+        raise NotImplementedError
+
+    def write_batch(self, rows):
+        """Writes one batch of rows."""
+        raise NotImplementedError
+
+    def close(self):
+        """Flushes and releases the destination."""
+
+    def write_rows(self, rows):
+        """
+        Writes a row stream to the sink.
+
+        Args:
+            rows (iterable): Header row followed by data rows, as produced by
+                FormatterNode.iter_rows or FormatterNode.format_data
+
+        Returns:
+            int: Number of data rows written
+        """
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            return 0
+
+        self.header = list(header)
+        self.open(self.header)
+        written = 0
+        batch = []
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self.write_batch(batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                self.write_batch(batch)
+                written += len(batch)
+        finally:
+            self.close()
+
+        print(f"Exported {written} rows to {self.path}")
+        return written
+
+
+class CsvSink(RowSink):
+    """Writes rows to a CSV file."""
+
+    def open(self, header):
+        self._file = open(self.path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(header)
+
+    def write_batch(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        if getattr(self, '_file', None):
+            self._file.close()
+            self._file = None
+
+
+class SqliteSink(RowSink):
+    """
+    Writes rows to a SQLite table using bulk inserts, one transaction per batch.
+    Like the file sinks, each export replaces the table's contents: it is
+    dropped and recreated for the header on open, so exporting a range
+    again doesn't duplicate its rows. Indexes on date, studio and engineer
+    are created on open.
+    """
+
+    def __init__(self, path, table="sessions", batch_size=EXPORT_BATCH_SIZE):
+        super().__init__(path, batch_size)
+        self.table = table
+
+    def open(self, header):
+        self._columns = [column_name(h) for h in header]
+        self._numeric = [h in NUMERIC_COLUMNS for h in header]
+        column_defs = ", ".join(
+            f"{name} {'REAL' if numeric else 'TEXT'}"
+            for name, numeric in zip(self._columns, self._numeric)
+        )
+
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(f"DROP TABLE IF EXISTS {self.table}")
+        self._conn.execute(f"CREATE TABLE {self.table} ({column_defs})")
+        for name in ("date", "studio", "engineer_name"):
+            if name in self._columns:
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{self.table}_{name} ON {self.table} ({name})"
+                )
+        self._conn.commit()
+
+        placeholders = ", ".join("?" for _ in self._columns)
+        self._insert = (
+            f"INSERT INTO {self.table} ({', '.join(self._columns)}) VALUES ({placeholders})"
+        )
+
+    def write_batch(self, rows):
+        values = [
+            [to_number(v) if numeric else v for v, numeric in zip(row, self._numeric)]
+            for row in rows
+        ]
+        with self._conn:
+            self._conn.executemany(self._insert, values)
+
+    def close(self):
+        if getattr(self, '_conn', None):
+            self._conn.close()
+            self._conn = None
+
+
+class ParquetSink(RowSink):
+    """
+    Writes rows to a columnar Parquet file (or an Arrow IPC file when the path
+    ends in .arrow). Each batch becomes one row group / record batch.
+    Requires pyarrow.
+    """
+
+    def __init__(self, path, batch_size=EXPORT_BATCH_SIZE):
+        super().__init__(path, batch_size)
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("pyarrow is required for Parquet/Arrow export: pip install pyarrow")
+        self._pa = pyarrow
+
+    def open(self, header):
+        pa = self._pa
+        self._numeric = [h in NUMERIC_COLUMNS for h in header]
+        self._schema = pa.schema([
+            (column_name(h), pa.float64() if numeric else pa.string())
+            for h, numeric in zip(header, self._numeric)
+        ])
+
+        if self.path.endswith('.arrow'):
+            import pyarrow.ipc
+            self._writer = pyarrow.ipc.new_file(self.path, self._schema)
+        else:
+            import pyarrow.parquet
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, self._schema)
+
+    def write_batch(self, rows):
+        columns = []
+        for index, numeric in enumerate(self._numeric):
+            values = [row[index] if index < len(row) else None for row in rows]
+            if numeric:
+                values = [to_number(v) for v in values]
+            else:
+                values = [None if v is None else str(v) for v in values]
+            columns.append(values)
+        batch = self._pa.record_batch(columns, schema=self._schema)
+        self._writer.write_batch(batch)
+
+    def close(self):
+        if getattr(self, '_writer', None):
+            self._writer.close()
+            self._writer = None
+
+
+SINKS_BY_EXTENSION = {
+    '.csv': CsvSink,
+    '.db': SqliteSink,
+    '.sqlite': SqliteSink,
+    '.sqlite3': SqliteSink,
+    '.parquet': ParquetSink,
+    '.arrow': ParquetSink,
+}
+
+def get_sink(path, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Returns the sink matching the file extension of `path`.
+
+    Raises:
+        ValueError: If the extension is not supported
+    """
+    extension = os.path.splitext(str(path))[1].lower()
+    sink_class = SINKS_BY_EXTENSION.get(extension)
+    if sink_class is None:
+        supported = ", ".join(sorted(SINKS_BY_EXTENSION))
+        raise ValueError(f"Unsupported export format '{extension}'. Use one of: {supported}")
+    return sink_class(path, batch_size=batch_size)
+
+def export_rows(rows, path, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Writes a FormatterNode row stream to the file at `path`.
+
+    Args:
+        rows (iterable): Header row followed by data rows
+        path (str): Destination file; the extension selects the sink
+        batch_size (int): Rows buffered per write
+
+    Returns:
+        int: Number of data rows written
+    """
+    return get_sink(path, batch_size).write_rows(rows)
+
+def main():
+    from src.FormatterNode import FormatterNode
+    from src.CalendarNode import get_calendar_data
+
+    start_date = input("Enter start date (YYYY-MM-DD): ")
+    end_date = input("Enter end date (YYYY-MM-DD) [leave blank for full month]: ")
+    end_date = end_date if end_date.strip() else None
+    default_path = EXPORT_DIR / f"{start_date}_{end_date or 'EOM'}_combined.csv"
+    path = input(f"Export file (.csv, .db, .parquet, .arrow) [{default_path}]: ").strip()
+    path = path or str(default_path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    raw_data = get_calendar_data(start_date, end_date)
+    formatter = FormatterNode()
+    export_rows(formatter.iter_rows(raw_data), path)
+
+if __name__ == '__main__':
+    main()
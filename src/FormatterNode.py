@@ -8,73 +8,152 @@ class FormatterNode:
     Events are sorted chronologically before being formatted.
     """
 
-    def __init__(self):
+    # Calendar event fields format_event reads (besides the calendar ID that
+    # CalendarNode.format_events adds); the lean fetch requests only these
+    EVENT_FIELDS = ('start', 'end', 'summary', 'description')
+    # Trailing column holding calendar/event ID, so re-synced rows can be matched to their event
+    ID_COLUMN = "Event ID"
+    # Calendar ID -> studio name, used when no tenant studio_map is given
+    DEFAULT_STUDIO_MAP = {
+        "primary": "Studio A",
+        "fe8846449c91e6dbd1177a8d1d29cd4e57ad901e44d4262f5fc865cc1720c95e@group.calendar.google.com": "Studio B",
+        # Add more mappings as needed
+    }
+
+    def __init__(self, studio_map=None, spill_threshold=None, spill_dir=None, event_ids=False):
+        """
+        Args:
+            studio_map (dict, optional): Calendar ID -> studio name; defaults to
+                the built-in two-studio map
+            spill_threshold (int, optional): Sort with SortNode.ExternalSorter,
+                spilling sorted runs to disk past this many events, so row
+                streams never hold every event; None sorts in memory
+            spill_dir (str, optional): Directory for the spilled runs
+            event_ids (bool): Append the ID_COLUMN to the template and rows
+        """
+        self.studio_map = studio_map
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self.event_ids = event_ids
         self.template = [
             "Date", "Studio", "Artist Name", "Session Type", 
             "Start Time", "End Time", "Hours", "Paid?", 
             "Price", "Engineer Name", "Engineer Payment", 
             "Referral", "Referral Payment"
         ]
+        if event_ids:
+            self.template.append(self.ID_COLUMN)
 
     def format_data(self, raw_data):
-        formatted_data = [self.template]  # Start with headers
+        return list(self.iter_rows(raw_data))
+
+    def iter_rows(self, raw_data):
+        """
+        Yields the header row followed by one formatted row per event, in
+        chronological order, so sinks can consume the rows incrementally.
+
+        Args:
+            raw_data (list): List of event dictionaries from CalendarNode
+
+        Yields:
+            list: The template header, then one row per event
+        """
+        yield self.template  # Start with headers
         
+        for _, row in self.iter_event_rows(raw_data):
+            yield row
+
+    def iter_event_rows(self, raw_data):
+        """
+        Yields (event, row) pairs in chronological order, for consumers that
+        need the source event alongside its formatted row.
+
+        Args:
+            raw_data (iterable): Event dictionaries from CalendarNode; with a
+                spill_threshold, any iterable, read once
+
+        Yields:
+            tuple: (event dict, formatted row)
+        """
         # Sort raw_data chronologically by start time
-        sorted_events = self.sort_events_chronologically(raw_data)
+        if self.spill_threshold:
+            from src.SortNode import external_sort
+            sorted_events = external_sort(raw_data, self.event_sort_key, self.spill_threshold, self.spill_dir)
+        else:
+            sorted_events = self.sort_events_chronologically(raw_data)
         
         for event in sorted_events:
-            print(f"DEBUG: Event Data: {event}")
-
-            # Extract fields from event data
-            start = event.get("start")
-            end = event.get("end")
-            summary = event.get("summary")
-            description = event.get("description")
-            calendar_id = event.get("calendar", "primary")  # Fixed to match CalendarNode output
-
-            # Debugging: Set defaults for missing data
-            if not start:
-                start = "2025-01-01T00:00:00"  # Example default
-            if not end:
-                end = start  # Default to start time, or adjust as needed
+            yield event, self.format_event(event)
 
-            # Extract formatted time data
-            date, start_time, end_time, hours = self.extract_time_info(start, end)
+    def format_event(self, event):
+        """
+        Formats a single event dictionary into a row matching the template.
 
-            # Debugging: Print extracted time values
-            print(f"DEBUG: Date: {date}, Start Time: {start_time}, End Time: {end_time}, Hours: {hours}")
+        Args:
+            event (dict): Event dictionary from CalendarNode
 
-            # Other formatting logic
-            artist_name = self.format_artist(summary)
-            session_type = self.determine_session_type(description)
-            
-            # Extract engineer info and payment details
-            engineer_indicator, engineer_name, engineer_payment = self.format_engineer(description)
-            
-            # Process comprehensive payment information
-            paid, price, eng_name, eng_payment, referral, referral_payment = self.process_payment_info(description)
-            
-            # If engineer name was found in process_payment_info but not in format_engineer, use it
-            if not engineer_name and eng_name:
-                engineer_name = eng_name
-                engineer_payment = eng_payment
-            
-            # If no engineer name was found, set to empty
-            if not engineer_name:
-                engineer_name = "No Engineer"
-            
-            # Determine studio based on calendar ID
-            studio = self.determine_studio(calendar_id)
+        Returns:
+            list: The formatted row
+        """
+        print(f"DEBUG: Event Data: {event}")
+
+        # Extract fields from event data
+        start = event.get("start")
+        end = event.get("end")
+        summary = event.get("summary")
+        description = event.get("description")
+        calendar_id = event.get("calendar", "primary")  # Fixed to match CalendarNode output
+
+        # Debugging: Set defaults for missing data
+        if not start:
+            start = "2025-01-01T00:00:00"  # Example default
+        if not end:
+            end = start  # Default to start time, or adjust as needed
 
-            # Append formatted row to output
-            formatted_data.append([
-                date, studio, artist_name, session_type,
-                start_time, end_time, hours, paid,
-                price, engineer_name, engineer_payment,
-                referral, referral_payment
-            ])
+        # Extract formatted time data
+        date, start_time, end_time, hours = self.extract_time_info(start, end)
 
-        return formatted_data
+        # Debugging: Print extracted time values
+        print(f"DEBUG: Date: {date}, Start Time: {start_time}, End Time: {end_time}, Hours: {hours}")
+
+        # Other formatting logic
+        artist_name = self.format_artist(summary)
+        session_type = self.determine_session_type(description)
+        
+        # Extract engineer info and payment details
+        engineer_indicator, engineer_name, engineer_payment = self.format_engineer(description)
+        
+        # Process comprehensive payment information
+        paid, price, eng_name, eng_payment, referral, referral_payment = self.process_payment_info(description)
+        
+        # If engineer name was found in process_payment_info but not in format_engineer, use it
+        if not engineer_name and eng_name:
+            engineer_name = eng_name
+            engineer_payment = eng_payment
+        
+        # If no engineer name was found, set to empty
+        if not engineer_name:
+            engineer_name = "No Engineer"
+        
+        # Determine studio based on calendar ID
+        studio = self.determine_studio(calendar_id)
+
+        # Return formatted row
+        row = [
+            date, studio, artist_name, session_type,
+            start_time, end_time, hours, paid,
+            price, engineer_name, engineer_payment,
+            referral, referral_payment
+        ]
+        if self.event_ids:
+            row.append(self.event_row_id(event))
+        return row
+
+    @staticmethod
+    def event_row_id(event):
+        """Returns the ID_COLUMN value of an event: 'calendar/event ID', or blank without an ID."""
+        event_id = event.get("id")
+        return f"{event.get('calendar') or 'primary'}/{event_id}" if event_id else ""
 
     def sort_events_chronologically(self, events):
         """
@@ -87,44 +166,53 @@ class FormatterNode:
         Returns:
             list: Sorted list of events
         """
-        def convert_to_datetime(date_str):
-            """Convert various date string formats to datetime objects, ensuring consistent timezone handling"""
-            if not date_str:
-                return datetime.min
+        # Sort events by start time
+        return sorted(events, key=self.event_sort_key)
+
+    def event_sort_key(self, event):
+        """
+        Returns the sortable start datetime of an event, as used by
+        sort_events_chronologically. Also usable to merge already-sorted streams.
+        
+        Args:
+            event (dict): Event dictionary
+            
+        Returns:
+            datetime: Naive start datetime, or datetime.min if unparseable
+        """
+        return self.convert_to_datetime(event.get("start", ""))
+
+    @staticmethod
+    def convert_to_datetime(date_str):
+        """Convert various date string formats to datetime objects, ensuring consistent timezone handling"""
+        if not date_str:
+            return datetime.min
+        
+        # Remove 'Z' suffix if present to make all datetimes naive
+        if isinstance(date_str, str):
+            date_str = date_str.replace('Z', '')
             
-            # Remove 'Z' suffix if present to make all datetimes naive
-            if isinstance(date_str, str):
-                date_str = date_str.replace('Z', '')
-                
-                # Handle full-day events (date only)
-                if 'T' not in date_str:
-                    try:
-                        return datetime.fromisoformat(date_str)
-                    except ValueError:
-                        print(f"Warning: Could not parse date from {date_str}")
-                        return datetime.min
-                
-                # Handle datetime strings with time component
+            # Handle full-day events (date only)
+            if 'T' not in date_str:
                 try:
-                    # Parse datetime and remove timezone info to make it naive
-                    dt = datetime.fromisoformat(date_str)
-                    if dt.tzinfo is not None:
-                        # Convert to naive datetime in local time
-                        dt = dt.replace(tzinfo=None)
-                    return dt
+                    return datetime.fromisoformat(date_str)
                 except ValueError:
-                    print(f"Warning: Could not parse datetime from {date_str}")
+                    print(f"Warning: Could not parse date from {date_str}")
                     return datetime.min
             
-            return datetime.min
-        
-        def get_sort_key(event):
-            """Extract sortable datetime from event"""
-            start = event.get("start", "")
-            return convert_to_datetime(start)
+            # Handle datetime strings with time component
+            try:
+                # Parse datetime and remove timezone info to make it naive
+                dt = datetime.fromisoformat(date_str)
+                if dt.tzinfo is not None:
+                    # Convert to naive datetime in local time
+                    dt = dt.replace(tzinfo=None)
+                return dt
+            except ValueError:
+                print(f"Warning: Could not parse datetime from {date_str}")
+                return datetime.min
         
-        # Sort events by start time
-        return sorted(events, key=get_sort_key)
+        return datetime.min
 
     def determine_studio(self, calendar_id):
         """
@@ -136,15 +224,22 @@ class FormatterNode:
         Returns:
             str: The studio name or an empty string if undetermined.
         """
+        # A tenant's own calendars, when given
+        if self.studio_map is not None:
+            return self.studio_map.get(calendar_id, calendar_id)
+
         # Map calendar IDs to studio names
-        studio_map = {
-            "primary": "Studio A",
-            "fe8846449c91e6dbd1177a8d1d29cd4e57ad901e44d4262f5fc865cc1720c95e@group.calendar.google.com": "Studio B",  # Added the second calendar ID mapping
-            # Add more mappings as needed
-        }
-        
-        # Return the mapped studio name or a default value
-        return studio_map.get(calendar_id, calendar_id)
+        return self.DEFAULT_STUDIO_MAP.get(calendar_id, calendar_id)
+
+    def studio_names(self):
+        """
+        Returns the names of the studios this formatter maps calendars to.
+
+        Returns:
+            set: Studio names, including studios with no sessions
+        """
+        studio_map = self.studio_map if self.studio_map is not None else self.DEFAULT_STUDIO_MAP
+        return set(studio_map.values())
 
     def extract_time_info(self, start, end=""):
         """
@@ -168,14 +263,11 @@ class FormatterNode:
                 return date, "00:00", "23:59", "24.0"
             
             # Convert ISO datetime string to datetime object for start
-            # Remove the 'Z' suffix if present for fromisoformat compatibility
-            start = start.replace('Z', '') if start.endswith('Z') else start
-            start_dt = datetime.fromisoformat(start)
-            
-            # Remove timezone info if present to ensure consistent handling
-            if start_dt.tzinfo is not None:
-                start_dt = start_dt.replace(tzinfo=None)
-                
+            # ('Z' spelled as an offset for fromisoformat compatibility)
+            start_dt = datetime.fromisoformat(start[:-1] + '+00:00' if start.endswith('Z') else start)
+
+            # Date and times are read off the wall clock; see TimezoneNode for
+            # bringing every event into the studio's zone first
             date = start_dt.strftime("%Y-%m-%d")
             start_time = start_dt.strftime("%H:%M")  # Format HH:MM
 
@@ -184,14 +276,14 @@ class FormatterNode:
                 end_dt = start_dt + timedelta(hours=1)  # Default to 1 hour after start
             else:
                 # Otherwise, use the provided end time
-                end = end.replace('Z', '') if end.endswith('Z') else end
-                end_dt = datetime.fromisoformat(end)
-                # Remove timezone info if present
-                if end_dt.tzinfo is not None:
-                    end_dt = end_dt.replace(tzinfo=None)
-            
+                end_dt = datetime.fromisoformat(end[:-1] + '+00:00' if end.endswith('Z') else end)
+
             # Calculate end time and duration
             end_time = end_dt.strftime("%H:%M")  # Format HH:MM
+            # Offsets on both ends give the elapsed time, across a DST change too;
+            # otherwise compare wall clocks
+            if (start_dt.tzinfo is None) != (end_dt.tzinfo is None):
+                start_dt, end_dt = start_dt.replace(tzinfo=None), end_dt.replace(tzinfo=None)
             duration = (end_dt - start_dt).total_seconds() / 3600  # Calculate duration in hours
 
             # Ensure that duration is non-negative
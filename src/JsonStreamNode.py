@@ -0,0 +1,118 @@
+import json
+import re
+
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+
+class StreamedPage:
+    """
+    A JSON object response whose `array_key` array is decoded one element at
+    a time, instead of json.loads building every element up front.
+
+    Only the response text and the element being consumed are alive at any
+    point, so a consumer that maps each element into something smaller (as
+    format_events does) never holds the whole page as nested dicts. The
+    other top-level members (nextPageToken, ...) are decoded as the scan
+    passes them.
+
+    Behaves like the parsed dict for the calls the fetch code makes:
+    get(array_key) returns the element iterator, which can be consumed once;
+    get(other) scans to the end of the object first, skipping (decoding and
+    discarding) any elements the consumer didn't read.
+    """
+
+    def __init__(self, content, array_key='items'):
+        """
+        Args:
+            content (bytes or str): The response body
+            array_key (str): Top-level member to stream
+        """
+        self.array_key = array_key
+        self._text = content.decode('utf-8') if isinstance(content, bytes) else (content or '')
+        self._fields = {}
+        self._scanner = self._scan()
+
+    def get(self, key, default=None):
+        if key == self.array_key:
+            return self._scanner
+        self.finish()
+        return self._fields.get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _missing) is not _missing
+
+    def finish(self):
+        """Scans the rest of the response and releases its text."""
+        for _ in self._scanner:
+            pass
+
+    def _skip(self, pos):
+        return _whitespace.match(self._text, pos).end()
+
+    def _expect(self, pos, char):
+        pos = self._skip(pos)
+        if self._text[pos:pos + 1] != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._text, pos)
+        return pos + 1
+
+    def _scan(self):
+        text = self._text
+        if not text.strip():
+            return
+        pos = self._expect(0, '{')
+        while True:
+            pos = self._skip(pos)
+            if text[pos:pos + 1] == '}':
+                break
+            if text[pos:pos + 1] == ',':
+                pos = self._skip(pos + 1)
+            key, pos = _decoder.raw_decode(text, pos)
+            pos = self._skip(self._expect(pos, ':'))
+            if key == self.array_key and text[pos:pos + 1] == '[':
+                pos = self._skip(pos + 1)
+                while text[pos:pos + 1] != ']':
+                    if text[pos:pos + 1] == ',':
+                        pos = self._skip(pos + 1)
+                    element, pos = _decoder.raw_decode(text, pos)
+                    yield element
+                    pos = self._skip(pos)
+                pos += 1
+            else:
+                self._fields[key], pos = _decoder.raw_decode(text, pos)
+        self._text = ''
+
+
+# Marks a member the response doesn't have
+_missing = object()
+
+
+def stream_items(request, array_key='items'):
+    """
+    Makes `request.execute()` return a StreamedPage over `array_key` instead
+    of the fully parsed response. Requests built by ServiceNode keep their
+    metrics (bytes, latency); their parse time then only covers the scan
+    set-up, since the decoding happens as the items are consumed.
+
+    Args:
+        request (HttpRequest): An unexecuted API request returning JSON
+        array_key (str): Top-level array to stream
+
+    Returns:
+        The same request
+    """
+    def parse(resp, content):
+        return StreamedPage(content, array_key)
+
+    if hasattr(request, 'parse_response'):
+        request.parse_response = parse
+    else:
+        request.postproc = parse
+    return request
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import subprocess
+import sys
+import time
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Standard library only: the launcher runs before the requirements are installed
+from src.StartupNode import LAUNCH_ENV
+
+
+# Persistent environment the launcher keeps between runs
+ENV_DIR = project_root / '.venv'
+REQUIREMENTS_FILE = project_root / 'requirements.txt'
+# Written inside the environment once the requirements installed cleanly
+STAMP_NAME = 'requirements.sha256'
+
+
+def env_python(env_dir):
+    """Returns the interpreter of a virtual environment."""
+    env_dir = Path(env_dir)
+    if os.name == 'nt':
+        return env_dir / 'Scripts' / 'python.exe'
+    return env_dir / 'bin' / 'python'
+
+def requirements_hash(requirements, env_dir):
+    """
+    Hashes the requirements file together with the environment's Python
+    version (from pyvenv.cfg), so editing requirements.txt or upgrading the
+    base interpreter both trigger a reinstall, and nothing else does.
+    """
+    digest = hashlib.sha256(Path(requirements).read_bytes())
+    config = Path(env_dir) / 'pyvenv.cfg'
+    if config.exists():
+        for line in config.read_text().splitlines():
+            key, _, value = line.partition('=')
+            if key.strip() in ('version', 'version_info'):
+                digest.update(value.strip().encode())
+    return digest.hexdigest()
+
+def base_python():
+    """Returns the interpreter used to create the environment (not a frozen launcher)."""
+    if getattr(sys, 'frozen', False):
+        return 'python3' if os.name != 'nt' else 'python'
+    return sys.executable
+
+def ensure_environment(env_dir=ENV_DIR, requirements=REQUIREMENTS_FILE, reinstall=False, run=subprocess.run):
+    """
+    Creates the environment if it is missing and installs the requirements
+    only when their hash differs from the one stamped at the last install.
+
+    Args:
+        env_dir (Path): Environment directory, kept between runs
+        requirements (Path): requirements.txt
+        reinstall (bool): Install even if the hash matches
+        run (callable): subprocess.run, or a stand-in for tests
+
+    Returns:
+        tuple: (interpreter path, True if the requirements were installed)
+
+    Raises:
+        RuntimeError: If creating the environment or installing fails
+    """
+    env_dir = Path(env_dir)
+    python = env_python(env_dir)
+    if not python.exists():
+        print(f"Creating environment in {env_dir}...")
+        if run([base_python(), '-m', 'venv', str(env_dir)]).returncode != 0:
+            raise RuntimeError(f"Could not create the environment in {env_dir}")
+
+    stamp = env_dir / STAMP_NAME
+    wanted = requirements_hash(requirements, env_dir)
+    if not reinstall and stamp.exists() and stamp.read_text().strip() == wanted:
+        return python, False
+
+    print("Installing required libraries...")
+    if run([str(python), '-m', 'pip', 'install', '--disable-pip-version-check', '-r', str(requirements)]).returncode != 0:
+        raise RuntimeError("pip install failed; the environment will be retried next launch")
+    stamp.write_text(wanted + '\n')
+    return python, True
+
+def remove_tokens(paths):
+    """Deletes saved tokens, forcing the consent flow on the next run."""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"Removed {path}")
+
+def launch(args=(), env_dir=ENV_DIR, requirements=REQUIREMENTS_FILE, reinstall=False, run=subprocess.run):
+    """
+    Prepares the environment and runs main.py in it. The launch time is
+    passed on in LAUNCH_STARTED_AT so the GUI can report launch-to-ready.
+
+    Returns:
+        int: main.py's exit code
+    """
+    started = time.time()
+    python, installed = ensure_environment(env_dir, requirements, reinstall, run)
+    print(f"Environment {'installed' if installed else 'reused'} in {time.time() - started:.2f}s")
+    env = dict(os.environ, **{LAUNCH_ENV: repr(started)})
+    return run([str(python), str(project_root / 'main.py'), *args], cwd=str(project_root), env=env).returncode
@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+
+# Thread-local binding of the run whose metrics the current thread records into
+_local = threading.local()
+
+def current_metrics():
+    """Returns the RunMetrics bound to this thread, or None."""
+    return getattr(_local, 'metrics', None)
+
+@contextmanager
+def bind_metrics(metrics):
+    """Binds `metrics` to the current thread for the duration of the block."""
+    previous = current_metrics()
+    _local.metrics = metrics
+    try:
+        yield metrics
+    finally:
+        _local.metrics = previous
+
+
+class RunMetrics:
+    """
+    Structured instrumentation for one pipeline run (or, in the daemon, a
+    running total of many): per-stage wall time, per-method API call counts,
+    latencies, errors, retries and bytes, item counters and cache hit rates.
+    Safe to record into from several threads.
+    """
+
+    def __init__(self, run_id=None, labels=None, profiler=None):
+        self.run_id = run_id or f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.labels = dict(labels or {})
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.stages = {}
+        self.api = {}
+        self.counters = {}
+        self.caches = {}
+        # Optional ProfileNode.StageProfiler; None keeps stage() to a timer
+        self.profiler = profiler
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, profile=True):
+        """
+        Times a pipeline stage; repeated or concurrent entries accumulate.
+        With a profiler attached the stage is also profiled, unless `profile`
+        is False (used for the enclosing 'total' stage).
+        """
+        profiling = self.profiler.stage(name) if profile and self.profiler is not None else nullcontext()
+        started = time.perf_counter()
+        try:
+            with profiling:
+                yield self
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+                stage['seconds'] += elapsed
+                stage['calls'] += 1
+
+    def count(self, name, amount=1):
+        """Adds to a named counter such as 'events_fetched' or 'rows_formatted'."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe_api(self, method, seconds, request_bytes=0, response_bytes=0, error=False, retries=0,
+                    parse_seconds=0.0):
+        """
+        Records one API call (including its retries) for `method`, e.g.
+        'calendar.events.list'; parse_seconds is the time spent decoding the
+        response body.
+        """
+        with self._lock:
+            call = self.api.setdefault(method, {
+                'calls': 0, 'errors': 0, 'retries': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                'parse_seconds': 0.0, 'request_bytes': 0, 'response_bytes': 0,
+            })
+            call['calls'] += 1
+            call['errors'] += 1 if error else 0
+            call['retries'] += retries
+            call['seconds'] += seconds
+            call['parse_seconds'] += parse_seconds
+            call['max_seconds'] = max(call['max_seconds'], seconds)
+            call['request_bytes'] += request_bytes
+            call['response_bytes'] += response_bytes
+
+    def cache(self, name, hit):
+        """Records a hit or miss for a named cache."""
+        with self._lock:
+            cache = self.caches.setdefault(name, {'hits': 0, 'misses': 0})
+            cache['hits' if hit else 'misses'] += 1
+
+    def merge(self, other):
+        """Adds another run's measurements into this one (used for daemon totals)."""
+        with self._lock, other._lock:
+            for name, stage in other.stages.items():
+                mine = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+                mine['seconds'] += stage['seconds']
+                mine['calls'] += stage['calls']
+            for method, call in other.api.items():
+                mine = self.api.setdefault(method, dict.fromkeys(call, 0))
+                for key, value in call.items():
+                    mine[key] = max(mine[key], value) if key == 'max_seconds' else mine[key] + value
+            for name, value in other.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, cache in other.caches.items():
+                mine = self.caches.setdefault(name, {'hits': 0, 'misses': 0})
+                mine['hits'] += cache['hits']
+                mine['misses'] += cache['misses']
+
+    def to_dict(self):
+        """Returns the run report as plain data, with derived averages and hit rates."""
+        with self._lock:
+            api = {}
+            for method, call in self.api.items():
+                api[method] = dict(call, avg_seconds=call['seconds'] / call['calls'] if call['calls'] else 0.0)
+            caches = {}
+            for name, cache in self.caches.items():
+                total = cache['hits'] + cache['misses']
+                caches[name] = dict(cache, hit_rate=cache['hits'] / total if total else 0.0)
+            return {
+                'run_id': self.run_id,
+                'labels': dict(self.labels),
+                'started_at': self.started_at,
+                'stages': {name: dict(stage) for name, stage in self.stages.items()},
+                'api': api,
+                'api_totals': {
+                    'calls': sum(c['calls'] for c in self.api.values()),
+                    'errors': sum(c['errors'] for c in self.api.values()),
+                    'retries': sum(c['retries'] for c in self.api.values()),
+                    'response_bytes': sum(c['response_bytes'] for c in self.api.values()),
+                },
+                'counters': dict(self.counters),
+                'caches': caches,
+            }
+
+    def write_report(self, directory):
+        """Writes the run report as JSON into `directory` and returns its path."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"run-{self.run_id}.json")
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def to_prometheus(self, prefix='studio_calendar'):
+        """Renders the measurements in the Prometheus text exposition format."""
+        report = self.to_dict()
+        labels = report['labels']
+
+        def fmt(extra=None):
+            merged = dict(labels, **(extra or {}))
+            if not merged:
+                return ''
+            pairs = ','.join(f'{key}="{str(value)}"' for key, value in sorted(merged.items()))
+            return '{' + pairs + '}'
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for extra, value in samples:
+                lines.append(f"{prefix}_{name}{fmt(extra)} {value}")
+
+        metric('stage_seconds_total', 'counter', 'Wall time spent per pipeline stage.',
+               [({'stage': name}, stage['seconds']) for name, stage in report['stages'].items()])
+        metric('api_calls_total', 'counter', 'Google API calls per method.',
+               [({'method': m}, c['calls']) for m, c in report['api'].items()])
+        metric('api_errors_total', 'counter', 'Failed Google API calls per method.',
+               [({'method': m}, c['errors']) for m, c in report['api'].items()])
+        metric('api_retries_total', 'counter', 'Google API retries per method.',
+               [({'method': m}, c['retries']) for m, c in report['api'].items()])
+        metric('api_seconds_total', 'counter', 'Google API latency per method.',
+               [({'method': m}, c['seconds']) for m, c in report['api'].items()])
+        metric('api_response_bytes_total', 'counter', 'Response bytes per method.',
+               [({'method': m}, c['response_bytes']) for m, c in report['api'].items()])
+        metric('items_total', 'counter', 'Events, rows and cells processed.',
+               [({'counter': name}, value) for name, value in report['counters'].items()])
+        metric('cache_hits_total', 'counter', 'Cache hits per cache.',
+               [({'cache': name}, c['hits']) for name, c in report['caches'].items()])
+        metric('cache_misses_total', 'counter', 'Cache misses per cache.',
+               [({'cache': name}, c['misses']) for name, c in report['caches'].items()])
+        return "\n".join(lines) + "\n"
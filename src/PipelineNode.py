@@ -0,0 +1,236 @@
+import heapq
+import queue
+import sys
+import threading
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from config.settings import LOCAL_RECURRENCE, PIPELINE_QUEUE_SIZE, SHEET_CHUNK_SIZE
+from src.MetricsNode import bind_metrics
+from src.CalendarNode import fetch_recurring_events, format_events, iter_event_pages
+from src.SheetNode import create_sheet_if_not_exists, write_rows_in_chunks
+
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class StreamingPipeline:
+    """
+    Fetch, format and write connected as concurrent stages with bounded queues:
+
+        one fetch thread per calendar --pages--> merge + format thread --rows--> sheet writer thread
+
+    Each calendar is fetched page by page (already in start time order) and
+    the pages are merged chronologically as they arrive, so formatting starts
+    with the first page and writing starts with the first chunk. A full queue
+    blocks its producer, which keeps memory bounded by the queue sizes rather
+    than by the size of the date range.
+    """
+
+    def __init__(self, formatter, queue_size=PIPELINE_QUEUE_SIZE, chunk_size=SHEET_CHUNK_SIZE,
+                 progress=None, cancel_event=None, metrics=None, local_recurrence=LOCAL_RECURRENCE,
+                 normalizer=None):
+        """
+        Args:
+            formatter (FormatterNode): Formatter for rows and sort order
+            queue_size (int): Pages / row batches buffered between stages
+            chunk_size (int): Rows per sheet update request
+            progress (callable, optional): Called as progress(stage, count) with
+                running totals for 'fetched', 'formatted' and 'written'
+            cancel_event (threading.Event, optional): Stops every stage when set
+            metrics (RunMetrics, optional): Records per-stage wall time and
+                the API calls made on every stage thread
+            local_recurrence (bool): Expand recurring events locally; each
+                calendar then arrives as one page, once its listing is complete
+            normalizer (TimezoneNormalizer, optional): Converts each page's
+                event times to the studio zone before they are merged
+        """
+        self.formatter = formatter
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.cancel_event = cancel_event or threading.Event()
+        self.metrics = metrics
+        self.local_recurrence = local_recurrence
+        self.normalizer = normalizer
+        self.errors = []
+        self.counts = {'fetched': 0, 'formatted': 0, 'written': 0}
+        self._counts_lock = threading.Lock()
+
+    def run(self, calendar_ids, time_min, time_max, calendar_service_factory,
+            sheets_service_factory, spreadsheet_id, sheet_name, on_formatted=None, sinks=()):
+        """
+        Runs the stages to completion.
+
+        Args:
+            calendar_ids (list): Calendars to fetch
+            time_min, time_max (str): API time bounds
+            calendar_service_factory (callable): Returns a Calendar service; called
+                once per fetch thread, since services are not thread-safe
+            sheets_service_factory (callable): Returns a Sheets service for the writer
+            spreadsheet_id (str): Target spreadsheet
+            sheet_name (str): Target sheet, created if missing
+            on_formatted (callable, optional): Called as on_formatted(event, row)
+                for every row, on the format thread
+            sinks (iterable): ExportNode sinks that receive every row batch as well
+
+        Returns:
+            dict: Counts of events fetched, rows formatted and cells written
+
+        Raises:
+            Exception: The first error raised by any stage
+        """
+        page_queues = [queue.Queue(maxsize=self.queue_size) for _ in calendar_ids]
+        row_queue = queue.Queue(maxsize=self.queue_size)
+
+        threads = [
+            threading.Thread(
+                target=self._stage, name=f"fetch-{index}",
+                args=('fetch', self._fetch, page_queues[index], calendar_id, time_min, time_max, calendar_service_factory)
+            )
+            for index, calendar_id in enumerate(calendar_ids)
+        ]
+        threads.append(threading.Thread(
+            target=self._stage, name="format",
+            args=('format', self._format, row_queue, page_queues, on_formatted)
+        ))
+        threads.append(threading.Thread(
+            target=self._stage, name="write",
+            args=('write', self._write, None, row_queue, sheets_service_factory, spreadsheet_id, sheet_name, list(sinks))
+        ))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self.errors:
+            raise self.errors[0]
+        return dict(self.counts)
+
+    # Stage plumbing
+
+    def _stage(self, name, body, output, *args):
+        try:
+            if self.metrics is None:
+                body(output, *args)
+            else:
+                with bind_metrics(self.metrics), self.metrics.stage(name):
+                    body(output, *args)
+        except Exception as e:
+            self.errors.append(e)
+            self.cancel_event.set()
+        finally:
+            if output is not None:
+                self._put(output, _DONE, force=True)
+
+    def _put(self, q, item, force=False):
+        """Puts with backpressure; gives up once the pipeline is cancelled (unless forcing a sentinel)."""
+        while True:
+            if self.cancel_event.is_set() and not force:
+                return False
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if self.cancel_event.is_set():
+                    # Consumers are shutting down; make room for the sentinel
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def _drain(self, q):
+        """Yields items from a stage queue until its producer is done."""
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if self.cancel_event.is_set():
+                    return
+                continue
+            if item is _DONE:
+                return
+            yield item
+
+    def _count(self, stage, amount):
+        with self._counts_lock:
+            self.counts[stage] += amount
+            total = self.counts[stage]
+        if self.progress is not None:
+            self.progress(stage, total)
+
+    # Stages
+
+    def _fetch(self, output, calendar_id, time_min, time_max, service_factory):
+        service = service_factory()
+        print(f"Fetching events from calendar: {calendar_id}")
+        if self.local_recurrence:
+            # Exceptions can arrive on any page, so expansion needs the whole listing
+            pages = [fetch_recurring_events(service, calendar_id, time_min, time_max)]
+        else:
+            pages = iter_event_pages(service, calendar_id, time_min, time_max)
+        for page in pages:
+            events = format_events(page, calendar_id) if page else []
+            if events and self.normalizer is not None:
+                self.normalizer.normalize_events(events)
+            if events:
+                if not self._put(output, events):
+                    return
+                self._count('fetched', len(events))
+
+    def _format(self, output, page_queues, on_formatted):
+        def events(page_queue):
+            for page in self._drain(page_queue):
+                yield from page
+
+        merged = heapq.merge(*(events(q) for q in page_queues), key=self.formatter.event_sort_key)
+        if not self._put(output, [self.formatter.template]):
+            return
+        batch = []
+        for event in merged:
+            row = self.formatter.format_event(event)
+            if on_formatted is not None:
+                on_formatted(event, row)
+            batch.append(row)
+            if len(batch) >= self.chunk_size:
+                if not self._put(output, batch):
+                    return
+                self._count('formatted', len(batch))
+                batch = []
+        if batch and self._put(output, batch):
+            self._count('formatted', len(batch))
+
+    def _write(self, output, row_queue, service_factory, spreadsheet_id, sheet_name, sinks):
+        service = service_factory()
+        if not create_sheet_if_not_exists(service, spreadsheet_id, sheet_name):
+            raise RuntimeError(f"Could not create sheet '{sheet_name}'")
+
+        def rows():
+            header_written = False
+            for batch in self._drain(row_queue):
+                if not header_written:
+                    for sink in sinks:
+                        sink.open(batch[0])
+                    header_written = True
+                else:
+                    for sink in sinks:
+                        sink.write_batch(batch)
+                yield from batch
+
+        written = [0]
+        def on_chunk(cells):
+            self._count('written', cells - written[0])
+            written[0] = cells
+
+        try:
+            write_rows_in_chunks(service, spreadsheet_id, sheet_name, rows(),
+                                 chunk_size=self.chunk_size, on_chunk=on_chunk, stopped=self.cancel_event.is_set)
+        finally:
+            for sink in sinks:
+                sink.close()
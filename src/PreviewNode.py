@@ -0,0 +1,231 @@
+import sys
+import tkinter as tk
+from tkinter import ttk
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+# Filter choice that matches every row
+ALL = "All"
+
+
+def sort_value(value):
+    """Sort key for a cell: numbers by value ahead of text, blanks last."""
+    if value is None or value == "":
+        return (2, 0, "")
+    try:
+        return (0, float(value), "")
+    except (TypeError, ValueError):
+        return (1, 0, str(value).casefold())
+
+
+class RowView:
+    """
+    Sorted, filtered view over formatted rows, by row index, so sorting or
+    filtering 50k rows moves integers rather than rows. Sort keys are
+    computed once per column and kept, so switching back and forth between
+    columns re-sorts without re-reading the cells.
+    """
+
+    def __init__(self, header, rows, filter_columns=("Studio", "Engineer Name")):
+        """
+        Args:
+            header (list): Column names (FormatterNode.template)
+            rows (list): Data rows, without the header
+            filter_columns (iterable): Columns offered as filters
+        """
+        self.header = list(header)
+        self.rows = rows
+        self.filter_columns = [c for c in filter_columns if c in self.header]
+        self.sort_column = None
+        self.descending = False
+        self.filters = {}
+        self._keys = {}
+        self._order = list(range(len(rows)))
+        self.indices = self._order
+
+    def __len__(self):
+        return len(self.indices)
+
+    def choices(self, column):
+        """Returns the distinct values of a column, for a filter drop-down."""
+        position = self.header.index(column)
+        return sorted({str(row[position]) for row in self.rows if position < len(row)}, key=str.casefold)
+
+    def sort_by(self, column, descending=None):
+        """
+        Sorts by a column; without `descending`, sorting the current column
+        again reverses it. The sort is stable, so ties keep the previous order.
+        """
+        if descending is None:
+            descending = column == self.sort_column and not self.descending
+        position = self.header.index(column)
+        keys = self._keys.get(position)
+        if keys is None:
+            keys = self._keys[position] = [
+                sort_value(row[position] if position < len(row) else "") for row in self.rows
+            ]
+        self._order = sorted(self._order, key=keys.__getitem__, reverse=descending)
+        self.sort_column, self.descending = column, descending
+        self._apply_filters()
+
+    def set_filter(self, column, value):
+        """Shows only rows whose `column` equals `value`; None or ALL clears it."""
+        if value is None or value == ALL:
+            self.filters.pop(column, None)
+        else:
+            self.filters[column] = str(value)
+        self._apply_filters()
+
+    def _apply_filters(self):
+        if not self.filters:
+            self.indices = self._order
+            return
+        checks = [(self.header.index(column), value) for column, value in self.filters.items()]
+        rows = self.rows
+        self.indices = [
+            i for i in self._order
+            if all(position < len(rows[i]) and str(rows[i][position]) == value for position, value in checks)
+        ]
+
+    def page(self, start, count):
+        """Returns up to `count` rows of the view from position `start`."""
+        return [self.rows[i] for i in self.indices[start:start + count]]
+
+
+class PreviewTable(tk.Frame):
+    """
+    Results pane: a ttk.Treeview that only ever holds the rows on screen.
+    A fixed pool of `visible_rows` items is refilled from a RowView as the
+    scrollbar, mouse wheel or arrow keys move the window, so a 50k-row
+    result opens as fast as a 20-row one and adds only a screenful of
+    widgets. Clicking a heading sorts by it; the drop-downs filter by
+    studio and engineer.
+    """
+
+    def __init__(self, master, visible_rows=15, column_width=90, **kwargs):
+        super().__init__(master, **kwargs)
+        self.visible_rows = visible_rows
+        self.column_width = column_width
+        self.view = None
+        self.offset = 0
+        self._items = []
+        self._filters = {}
+
+        bar = tk.Frame(self)
+        bar.pack(fill=tk.X)
+        self.filter_frame = tk.Frame(bar)
+        self.filter_frame.pack(side=tk.LEFT)
+        self.count_var = tk.StringVar(value="No preview")
+        tk.Label(bar, textvariable=self.count_var).pack(side=tk.RIGHT, padx=5)
+
+        body = tk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(body, show="headings", height=visible_rows, selectmode="browse")
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_wheel)
+        self.tree.bind("<Up>", lambda event: self._key_scroll(-1))
+        self.tree.bind("<Down>", lambda event: self._key_scroll(1))
+        self.tree.bind("<Prior>", lambda event: self._key_scroll(-self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self._key_scroll(self.visible_rows))
+
+    def set_rows(self, header, rows):
+        """
+        Shows new rows (header excluded) and resets sorting and filters.
+
+        Args:
+            header (list): Column names
+            rows (list): Data rows; kept by reference, not copied
+        """
+        self.view = RowView(header, rows)
+        self.offset = 0
+        columns = [f"c{i}" for i in range(len(header))]
+        self.tree.delete(*self._items)
+        self.tree.configure(columns=columns)
+        for column_id, name in zip(columns, header):
+            self.tree.heading(column_id, text=name, command=lambda name=name: self.sort_by(name))
+            self.tree.column(column_id, width=self.column_width, stretch=True)
+        self._items = [self.tree.insert("", tk.END, values=()) for _ in range(self.visible_rows)]
+        self._build_filters()
+        self.refresh()
+
+    def _build_filters(self):
+        for child in self.filter_frame.winfo_children():
+            child.destroy()
+        self._filters = {}
+        for column in self.view.filter_columns:
+            tk.Label(self.filter_frame, text=f"{column}:").pack(side=tk.LEFT, padx=(5, 0))
+            box = ttk.Combobox(self.filter_frame, state="readonly", width=14,
+                               values=[ALL] + self.view.choices(column))
+            box.set(ALL)
+            box.bind("<<ComboboxSelected>>", lambda event, column=column: self._on_filter(column))
+            box.pack(side=tk.LEFT, padx=5)
+            self._filters[column] = box
+
+    def _on_filter(self, column):
+        self.view.set_filter(column, self._filters[column].get())
+        self.offset = 0
+        self.refresh()
+
+    def sort_by(self, column):
+        """Sorts by a column (again to reverse) and scrolls to the top."""
+        if self.view is None:
+            return
+        self.view.sort_by(column)
+        for column_id, name in zip(self.tree["columns"], self.view.header):
+            arrow = (" ▼" if self.view.descending else " ▲") if name == column else ""
+            self.tree.heading(column_id, text=name + arrow)
+        self.offset = 0
+        self.refresh()
+
+    def scroll_to(self, offset):
+        """Moves the window so row `offset` of the view is at the top."""
+        if self.view is None:
+            return
+        self.offset = max(0, min(int(offset), len(self.view) - self.visible_rows))
+        self.refresh()
+
+    def refresh(self):
+        """Refills the on-screen items from the view at the current offset."""
+        if self.view is None:
+            return
+        rows = self.view.page(self.offset, self.visible_rows)
+        for item, row in zip(self._items, rows):
+            self.tree.item(item, values=row)
+        for item in self._items[len(rows):]:
+            self.tree.item(item, values=())
+        total = len(self.view)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        shown = f"{self.offset + 1}-{self.offset + len(rows)}" if rows else "0"
+        self.count_var.set(f"Rows {shown} of {total}" + (f" ({len(self.view.rows)} total)"
+                                                          if total != len(self.view.rows) else ""))
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if self.view is None:
+            return
+        if action == tk.MOVETO:
+            self.scroll_to(float(amount) * len(self.view))
+        elif action == tk.SCROLL:
+            step = self.visible_rows if unit == tk.PAGES else 1
+            self.scroll_to(self.offset + int(amount) * step)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.offset - 3)
+        else:
+            self.scroll_to(self.offset + 3)
+        return "break"
+
+    def _key_scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+        return "break"
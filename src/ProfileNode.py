@@ -0,0 +1,149 @@
+import cProfile
+import io
+import itertools
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+# Frames of the profiling machinery itself, left out of allocation reports
+_ALLOCATION_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+]
+
+# tracemalloc is process-wide and several StageProfilers can be open at once
+# (concurrent ranges); it is stopped when the last one that needed it closes,
+# and only if a StageProfiler started it
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def _acquire_tracing(frames):
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _tracing_owned = True
+        _tracing_users += 1
+
+def _release_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+class StageProfiler:
+    """
+    Captures a CPU profile (cProfile) and the top allocation sites
+    (tracemalloc snapshot diff) for each pipeline stage, and writes them to
+    `run_dir`:
+
+        NN-<stage>.prof         cProfile stats, for pstats or snakeviz
+        NN-<stage>.txt          top functions by cumulative time
+        NN-<stage>-alloc.txt    top allocation sites by net size
+        stages.json             per-stage wall time and memory summary
+
+    Only created when profiling is enabled; RunMetrics.stage calls into it.
+    A stage that can't get a cProfile of its own is timed only and marked
+    with `cpu_profile_skipped` in stages.json: nested stages, and stages
+    that start while another profiler is active (from Python 3.12 only one
+    cProfile can run per process, so overlapped stages and concurrent runs
+    collide). tracemalloc is process-wide, so when stages overlap their
+    allocation reports include each other's.
+    """
+
+    def __init__(self, run_dir, frames=10, top=30):
+        """
+        Args:
+            run_dir (str): Directory for this run's profiles, created if missing
+            frames (int): Stack frames kept per allocation
+            top (int): Entries per report
+        """
+        self.run_dir = run_dir
+        self.top = top
+        self.stages = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+        os.makedirs(run_dir, exist_ok=True)
+        _acquire_tracing(frames)
+
+    @contextmanager
+    def stage(self, name):
+        """Profiles the enclosed block as stage `name`."""
+        prefix = os.path.join(self.run_dir, f"{next(self._ids):02d}-{name}")
+        profile = None
+        skipped = None
+        # A thread can only run one cProfile at a time; nested stages are timed only
+        if getattr(self._local, 'active', False):
+            skipped = "nested stage"
+        else:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                self._local.active = True
+            except ValueError as e:
+                # Another profiler (or debugger) is active
+                profile = None
+                skipped = str(e) or "another profiler is active"
+        before = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            if profile is not None:
+                profile.disable()
+                self._local.active = False
+            self._write_stage(name, prefix, seconds, profile, before, skipped)
+
+    def _write_stage(self, name, prefix, seconds, profile, before, skipped=None):
+        entry = {'stage': name, 'seconds': seconds, 'thread': threading.current_thread().name}
+        if skipped:
+            entry['cpu_profile_skipped'] = skipped
+        if profile is not None:
+            profile.dump_stats(prefix + ".prof")
+            text = io.StringIO()
+            pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(self.top)
+            with open(prefix + ".txt", 'w') as f:
+                f.write(text.getvalue())
+            entry['cpu_profile'] = os.path.basename(prefix + ".prof")
+        if before is not None and tracemalloc.is_tracing():
+            after = tracemalloc.take_snapshot()
+            diff = after.filter_traces(_ALLOCATION_FILTERS).compare_to(
+                before.filter_traces(_ALLOCATION_FILTERS), 'lineno'
+            )
+            with open(prefix + "-alloc.txt", 'w') as f:
+                f.write(f"Top {self.top} allocation sites during '{name}' (net change)\n")
+                for stat in diff[:self.top]:
+                    f.write(f"{stat}\n")
+            entry['net_allocated_bytes'] = sum(stat.size_diff for stat in diff)
+            entry['traced_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            entry['allocations'] = os.path.basename(prefix + "-alloc.txt")
+        with self._lock:
+            self.stages.append(entry)
+
+    def close(self):
+        """
+        Writes the stage summary and returns run_dir. tracemalloc stops once
+        every open profiler has closed, if a profiler started it.
+        """
+        with self._lock:
+            summary = list(self.stages)
+            closing, self._closed = not self._closed, True
+        with open(os.path.join(self.run_dir, "stages.json"), 'w') as f:
+            json.dump(summary, f, indent=2)
+        if closing:
+            _release_tracing()
+        return self.run_dir
@@ -0,0 +1,245 @@
+import sys
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from googleapiclient.errors import HttpError
+
+from config.settings import MANUAL_COLUMNS, SHEET_CHUNK_SIZE
+from src.FormatterNode import FormatterNode
+
+
+# Columns that identify a session row in tabs written before the event ID column
+KEY_COLUMNS = ("Date", "Studio", "Start Time")
+
+
+def column_letter(index):
+    """Converts a 0-based column index to its A1 letters (0 -> A, 26 -> AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+def _blank(value):
+    return value is None or value == ""
+
+def cells_equal(a, b):
+    """Compares a sheet cell with a formatted value: blanks alike, numbers by value, the rest as text."""
+    if _blank(a) or _blank(b):
+        return _blank(a) and _blank(b)
+    try:
+        return float(a) == float(b)
+    except (TypeError, ValueError):
+        return str(a) == str(b)
+
+
+class SheetReconciler:
+    """
+    Merges freshly formatted rows into a sheet tab that staff may have edited.
+
+    The existing tab is read in one values.batchGet and indexed in dicts, so
+    matching is linear in the number of rows. Rows are keyed on their event
+    ID column (FormatterNode.ID_COLUMN, calendar/event ID), so a moved
+    session keeps its manual values and a booking that takes a cancelled
+    session's slot does not inherit them. Rows without an ID, written before
+    the column existed, fall back to the slot key (Date|Studio|Start Time,
+    with a #n suffix for repeats) until the next write fills their ID in.
+
+    For every new row that matches a tab row, the manual columns
+    (MANUAL_COLUMNS, by default "Paid?" and "Price") keep the sheet's value
+    unless that cell is blank; every other column is machine-owned and takes
+    the formatted value. Only cells that end up different from the tab are
+    written.
+
+    Streamed writers that rewrite the whole tab can still keep manual edits
+    by calling carry_manual on each row, in order, before it is written.
+    """
+
+    def __init__(self, template, manual_columns=MANUAL_COLUMNS, key_columns=KEY_COLUMNS,
+                 id_column=FormatterNode.ID_COLUMN):
+        """
+        Args:
+            template (list): Header row (FormatterNode.template)
+            manual_columns (iterable): Headers of the columns staff own
+            key_columns (iterable): Headers that identify a row without an ID
+            id_column (str): Header of the event ID column, if the template has one
+        """
+        self.template = list(template)
+        self.manual = [self.template.index(c) for c in manual_columns if c in self.template]
+        self.key_positions = [self.template.index(c) for c in key_columns]
+        self.id_position = self.template.index(id_column) if id_column in self.template else None
+        self.existing = []
+        self.ids = {}
+        self.index = {}
+        self._seen = {}
+        self.stats = {'matched': 0, 'kept_manual': 0, 'changed_cells': 0, 'removed_rows': 0}
+
+    def row_key(self, row, seen):
+        """Returns the key of a data row; `seen` counts earlier keys, to number repeats."""
+        key = "|".join(str(row[i]) if i < len(row) and not _blank(row[i]) else "" for i in self.key_positions)
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        return f"{key}#{count}" if count else key
+
+    def row_id(self, row):
+        """Returns the event ID cell of a row, or None if it is blank or the template has none."""
+        if self.id_position is None or self.id_position >= len(row) or _blank(row[self.id_position]):
+            return None
+        return str(row[self.id_position])
+
+    def header_matches(self, header):
+        """True if `header` is the template, or the template before the ID column was added."""
+        return all(cells_equal(a, b) or (i == self.id_position and _blank(a))
+                   for i, (a, b) in enumerate(zip(header, self.template)))
+
+    def load(self, service, spreadsheet_id, sheet_name):
+        """
+        Reads the tab and builds the ID and slot key indexes.
+
+        Returns:
+            bool: True if the tab holds rows under the same header, so they
+                can be reconciled; False if it is empty or laid out differently
+        """
+        result = service.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=[sheet_name],
+            valueRenderOption='UNFORMATTED_VALUE',
+            dateTimeRenderOption='FORMATTED_STRING',
+        ).execute()
+        value_ranges = result.get('valueRanges', [])
+        values = value_ranges[0].get('values', []) if value_ranges else []
+        width = len(self.template)
+        self.existing = [list(row) + [""] * (width - len(row)) for row in values]
+        self.ids, self.index = {}, {}
+        if not self.existing or not self.header_matches(self.existing[0]):
+            return False
+        seen = {}
+        for number, row in enumerate(self.existing[1:], start=1):
+            row_id = self.row_id(row)
+            if row_id is not None:
+                self.ids.setdefault(row_id, number)
+            else:
+                self.index[self.row_key(row, seen)] = number
+        return True
+
+    def carry_manual(self, row):
+        """
+        Copies the non-blank manual cells of the matching sheet row into
+        `row`, in place. Rows must be passed in sheet order.
+
+        Returns:
+            bool: True if the row matched a sheet row
+        """
+        row_id = self.row_id(row)
+        number = self.ids.get(row_id) if row_id is not None else None
+        if number is None:
+            # Not in the tab under its ID: it may be a row written before the ID column
+            number = self.index.get(self.row_key(row, self._seen))
+        if number is None:
+            return False
+        self.stats['matched'] += 1
+        current = self.existing[number]
+        for i in self.manual:
+            if not _blank(current[i]):
+                if not cells_equal(current[i], row[i]):
+                    self.stats['kept_manual'] += 1
+                row[i] = current[i]
+        return True
+
+    def merge(self, rows):
+        """
+        Returns the data rows with manual values carried over from matching
+        sheet rows. The input rows are not modified.
+        """
+        self._seen = {}
+        merged = []
+        for row in rows:
+            row = ["" if value is None else value for value in row]
+            self.carry_manual(row)
+            merged.append(row)
+        return merged
+
+    def updates(self, data, sheet_name):
+        """
+        Returns the value ranges that turn the loaded tab into `data`
+        (header first): per row, the span from its first to its last changed
+        cell, with consecutive rows that share a span combined into one range.
+        """
+        ranges = []
+        run = None
+        for number, row in enumerate(data):
+            current = self.existing[number] if number < len(self.existing) else None
+            changed = [i for i, value in enumerate(row)
+                       if current is None or i >= len(current) or not cells_equal(current[i], value)]
+            if not changed:
+                run = None
+                continue
+            self.stats['changed_cells'] += len(changed)
+            first, last = changed[0], changed[-1]
+            if run is not None and run['span'] == (first, last) and run['end'] == number - 1:
+                run['values'].append(row[first:last + 1])
+                run['end'] = number
+            else:
+                run = {'span': (first, last), 'start': number, 'end': number, 'values': [row[first:last + 1]]}
+                ranges.append(run)
+        return [
+            {
+                'range': f"{sheet_name}!{column_letter(r['span'][0])}{r['start'] + 1}:"
+                         f"{column_letter(r['span'][1])}{r['end'] + 1}",
+                'values': r['values'],
+            }
+            for r in ranges
+        ]
+
+    def write(self, service, spreadsheet_id, sheet_name, data, chunk_size=SHEET_CHUNK_SIZE):
+        """
+        Writes the changed cells of `data` (header first) and clears rows
+        the tab has beyond it.
+
+        Returns:
+            int: Number of cells written
+        """
+        data_ranges = self.updates(data, sheet_name)
+        for offset in range(0, len(data_ranges), chunk_size):
+            service.spreadsheets().values().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={'valueInputOption': 'RAW', 'data': data_ranges[offset:offset + chunk_size]}
+            ).execute()
+        if len(self.existing) > len(data):
+            self.stats['removed_rows'] = len(self.existing) - len(data)
+            service.spreadsheets().values().clear(
+                spreadsheetId=spreadsheet_id,
+                range=f"{sheet_name}!A{len(data) + 1}:{column_letter(len(self.template) - 1)}{len(self.existing)}",
+                body={}
+            ).execute()
+        return self.stats['changed_cells']
+
+def reconcile_sheet(service, spreadsheet_id, sheet_name, data, manual_columns=MANUAL_COLUMNS):
+    """
+    Writes formatted data (header first) to a tab without losing manual
+    edits: on a tab already holding this layout, manual columns keep their
+    sheet values and only changed cells are written (see SheetReconciler).
+    An empty or differently laid out tab is written in full.
+
+    Returns:
+        tuple: (data, stats) with data the rows as they now stand in the tab,
+            manual values included, and stats the 'matched', 'kept_manual',
+            'changed_cells' and 'removed_rows' counts; (None, None) on an API error
+    """
+    reconciler = SheetReconciler(data[0], manual_columns)
+    try:
+        reconciler.load(service, spreadsheet_id, sheet_name)
+        merged = [data[0]] + reconciler.merge(data[1:])
+        reconciler.write(service, spreadsheet_id, sheet_name, merged)
+    except HttpError as error:
+        print(f"An error occurred: {error}")
+        return None, None
+    stats = reconciler.stats
+    print(f"Reconciled sheet '{sheet_name}': {stats['matched']} rows matched, "
+          f"{stats['kept_manual']} manual edits kept, {stats['changed_cells']} cells written")
+    return merged, stats
@@ -0,0 +1,506 @@
+import bisect
+import calendar
+import sys
+import threading
+import time as clock
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from config.settings import RECURRENCE_CACHE_SIZE, RECURRENCE_EXCEPTIONS_TTL
+from src.MetricsNode import current_metrics
+
+
+# Event fields, besides the formatter's, needed to expand recurring events locally
+RECURRENCE_FIELDS = ('status', 'recurrence', 'recurringEventId', 'originalStartTime', 'iCalUID', 'updated')
+
+_WEEKDAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+_FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+_RULE_PARTS = {'FREQ', 'INTERVAL', 'COUNT', 'UNTIL', 'BYDAY', 'BYMONTHDAY', 'BYMONTH', 'WKST'}
+# Periods walked without an occurrence before a rule is treated as exhausted
+_MAX_EMPTY_PERIODS = 1000
+
+
+class UnsupportedRule(ValueError):
+    """Raised for recurrence rules this module does not expand (e.g. BYSETPOS, EXRULE)."""
+
+
+# Parsing
+
+def parse_rrule(line):
+    """
+    Parses an 'RRULE:FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=...' line into a dict.
+
+    Raises:
+        UnsupportedRule: For parts or frequencies expand_events can't handle
+    """
+    body = line.split(':', 1)[1] if ':' in line else line
+    rule = {}
+    for part in body.split(';'):
+        if not part:
+            continue
+        key, _, value = part.partition('=')
+        key = key.upper()
+        if key not in _RULE_PARTS:
+            raise UnsupportedRule(f"Unsupported recurrence part {key} in {line!r}")
+        rule[key] = value.upper() if key != 'UNTIL' else value
+    if rule.get('FREQ') not in _FREQUENCIES:
+        raise UnsupportedRule(f"Unsupported recurrence frequency in {line!r}")
+    if rule['FREQ'] == 'YEARLY' and 'BYDAY' in rule and 'BYMONTH' not in rule:
+        raise UnsupportedRule(f"Yearly BYDAY without BYMONTH in {line!r}")
+    return rule
+
+def _parse_ical_value(value, zone):
+    """
+    Parses an iCalendar DATE or DATE-TIME into a date, or a naive wall-clock
+    datetime in `zone` (UTC values are converted).
+    """
+    if len(value) == 8:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    parsed = datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S')
+    if value.endswith('Z'):
+        parsed = parsed.replace(tzinfo=timezone.utc).astimezone(zone).replace(tzinfo=None)
+    return parsed
+
+def _parse_date_list(line, zone):
+    """Parses an EXDATE/RDATE line into wall-clock datetimes (or dates) in `zone`."""
+    head, _, values = line.partition(':')
+    for param in head.split(';')[1:]:
+        name, _, value = param.partition('=')
+        if name.upper() == 'TZID':
+            source = _zone(value)
+            return [
+                _parse_ical_value(v, source).replace(tzinfo=source).astimezone(zone).replace(tzinfo=None)
+                if len(v) > 8 else _parse_ical_value(v, zone)
+                for v in values.split(',') if v
+            ]
+    return [_parse_ical_value(v, zone) for v in values.split(',') if v]
+
+def _zone(name):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise UnsupportedRule(f"Unknown time zone {name!r}")
+
+def _event_time(value):
+    """
+    Splits an event start/end/originalStartTime into (wall-clock value, zone).
+    All-day values are dates with a None zone.
+    """
+    if 'date' in value and 'dateTime' not in value:
+        return date.fromisoformat(value['date']), None
+    moment = datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00'))
+    zone = _zone(value['timeZone']) if value.get('timeZone') else moment.tzinfo
+    return moment.astimezone(zone).replace(tzinfo=None), zone
+
+def _instant(value):
+    """Returns an event time as an aware UTC datetime (all-day dates at UTC midnight)."""
+    if 'date' in value and 'dateTime' not in value:
+        return datetime.combine(date.fromisoformat(value['date']), time(), timezone.utc)
+    return datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00')).astimezone(timezone.utc)
+
+def _instance_suffix(value):
+    """Instance ID suffix the Calendar API uses: YYYYMMDD or YYYYMMDDTHHMMSSZ (UTC)."""
+    if 'date' in value and 'dateTime' not in value:
+        return value['date'].replace('-', '')
+    return _instant(value).strftime('%Y%m%dT%H%M%SZ')
+
+
+# Rule expansion
+
+def _month_days(year, month, rule, default_day):
+    """Days of a month selected by BYDAY / BYMONTHDAY (or the start's day of month)."""
+    last = calendar.monthrange(year, month)[1]
+    days = None
+    if 'BYMONTHDAY' in rule:
+        days = set()
+        for token in rule['BYMONTHDAY'].split(','):
+            day = int(token)
+            day = day if day > 0 else last + day + 1
+            if 1 <= day <= last:
+                days.add(day)
+    if 'BYDAY' in rule:
+        by_weekday = set()
+        for token in rule['BYDAY'].split(','):
+            weekday = _WEEKDAYS[token[-2:]]
+            matches = [d for d in range(1, last + 1) if date(year, month, d).weekday() == weekday]
+            ordinal = int(token[:-2]) if token[:-2] else 0
+            if ordinal == 0:
+                by_weekday.update(matches)
+            elif -len(matches) <= ordinal <= len(matches) and ordinal != 0:
+                by_weekday.add(matches[ordinal - 1 if ordinal > 0 else ordinal])
+        days = by_weekday if days is None else days & by_weekday
+    if days is None:
+        days = {default_day} if default_day <= last else set()
+    return sorted(days)
+
+def _periods(rule, start):
+    """Yields the candidate dates of each period of the rule, one list per period."""
+    interval = int(rule.get('INTERVAL', 1))
+    months = [int(m) for m in rule['BYMONTH'].split(',')] if 'BYMONTH' in rule else None
+    weekdays = {_WEEKDAYS[token[-2:]] for token in rule['BYDAY'].split(',')} if 'BYDAY' in rule else None
+    freq = rule['FREQ']
+    day = start
+
+    if freq == 'DAILY':
+        while True:
+            keep = (weekdays is None or day.weekday() in weekdays) and (months is None or day.month in months)
+            yield [day] if keep else []
+            day += timedelta(days=interval)
+    elif freq == 'WEEKLY':
+        week_start = _WEEKDAYS[rule.get('WKST', 'MO')]
+        day -= timedelta(days=(day.weekday() - week_start) % 7)
+        selected = weekdays if weekdays is not None else {start.weekday()}
+        while True:
+            week = [day + timedelta(days=offset) for offset in range(7)]
+            yield [d for d in week if d.weekday() in selected and (months is None or d.month in months)]
+            day += timedelta(weeks=interval)
+    elif freq == 'MONTHLY':
+        index = day.year * 12 + day.month - 1
+        while True:
+            year, month = divmod(index, 12)
+            month += 1
+            if months is None or month in months:
+                yield [date(year, month, d) for d in _month_days(year, month, rule, start.day)]
+            else:
+                yield []
+            index += interval
+    else:
+        year = day.year
+        while True:
+            yield [
+                date(year, month, d)
+                for month in (months or [start.month])
+                for d in _month_days(year, month, rule, start.day)
+            ]
+            year += interval
+
+def iter_occurrences(rule, dtstart, zone=None):
+    """
+    Yields the occurrences of a parsed RRULE in order, starting at dtstart.
+
+    Args:
+        rule (dict): From parse_rrule
+        dtstart: First occurrence, a date (all-day) or naive wall-clock datetime
+        zone (tzinfo, optional): Zone of dtstart, used to compare a UTC UNTIL
+
+    Yields:
+        Dates or naive wall-clock datetimes, like dtstart
+    """
+    all_day = not isinstance(dtstart, datetime)
+    start_day = dtstart if all_day else dtstart.date()
+    clock = None if all_day else dtstart.time()
+    count = int(rule['COUNT']) if 'COUNT' in rule else None
+    until = None
+    if 'UNTIL' in rule:
+        until = _parse_ical_value(rule['UNTIL'], zone or timezone.utc)
+        if all_day and isinstance(until, datetime):
+            until = until.date()
+        elif not all_day and not isinstance(until, datetime):
+            until = datetime.combine(until, time.max)
+
+    produced = 0
+    empty = 0
+    for candidates in _periods(rule, start_day):
+        empty = 0 if candidates else empty + 1
+        if empty > _MAX_EMPTY_PERIODS:
+            return
+        for day in candidates:
+            occurrence = day if all_day else datetime.combine(day, clock)
+            if occurrence < dtstart:
+                continue
+            if until is not None and occurrence > until:
+                return
+            yield occurrence
+            produced += 1
+            if count is not None and produced >= count:
+                return
+
+
+class _Series:
+    """The expanded starts of one recurrence, extended lazily as later windows are asked for."""
+
+    def __init__(self, recurrence, dtstart, zone):
+        rules = []
+        self.excluded = set()
+        extra = []
+        for line in recurrence:
+            name = line.split(':', 1)[0].split(';', 1)[0].upper()
+            if name == 'RRULE':
+                rules.append(parse_rrule(line))
+            elif name == 'EXDATE':
+                self.excluded.update(self._normalize(v, dtstart) for v in _parse_date_list(line, zone or timezone.utc))
+            elif name == 'RDATE':
+                extra.extend(self._normalize(v, dtstart) for v in _parse_date_list(line, zone or timezone.utc))
+            else:
+                raise UnsupportedRule(f"Unsupported recurrence line {line!r}")
+        if len(rules) > 1:
+            raise UnsupportedRule("More than one RRULE")
+        self._occurrences = iter_occurrences(rules[0], dtstart, zone) if rules else iter([dtstart])
+        self.starts = sorted(v for v in set(extra) if v not in self.excluded)
+        self.horizon = None
+        self.done = False
+
+    @staticmethod
+    def _normalize(value, dtstart):
+        if isinstance(dtstart, datetime):
+            return value if isinstance(value, datetime) else datetime.combine(value, dtstart.time())
+        return value.date() if isinstance(value, datetime) else value
+
+    def between(self, low, high):
+        """Returns the starts in [low, high), expanding the rule as far as `high`."""
+        while not self.done and (self.horizon is None or self.horizon < high):
+            occurrence = next(self._occurrences, None)
+            if occurrence is None:
+                self.done = True
+                break
+            self.horizon = occurrence
+            if occurrence not in self.excluded:
+                bisect.insort(self.starts, occurrence)
+        return self.starts[bisect.bisect_left(self.starts, low):bisect.bisect_left(self.starts, high)]
+
+
+class ExpansionCache:
+    """
+    LRU of expanded series keyed by the recurrence lines and start, so a
+    series is expanded once and shared by every window and calendar that
+    asks for it, until its master event changes.
+
+    It also keeps each series' looked-up exceptions (see expand_events'
+    fetch_exceptions), keyed by master ID and `updated` time, so an
+    unchanged series isn't looked up again; those entries expire after
+    `exceptions_ttl` seconds as well.
+    """
+
+    def __init__(self, maxsize=RECURRENCE_CACHE_SIZE, exceptions_ttl=RECURRENCE_EXCEPTIONS_TTL):
+        self.maxsize = maxsize
+        self.exceptions_ttl = exceptions_ttl
+        self._series = OrderedDict()
+        self._exceptions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def starts(self, master, low, high):
+        """Returns the instance starts of `master` in [low, high) (wall-clock values)."""
+        dtstart, zone = _event_time(master['start'])
+        key = (tuple(master['recurrence']), dtstart, str(zone))
+        with self._lock:
+            series = self._series.get(key)
+            hit = series is not None
+            if hit:
+                self._series.move_to_end(key)
+            else:
+                series = _Series(master['recurrence'], dtstart, zone)
+                self._series[key] = series
+                if len(self._series) > self.maxsize:
+                    self._series.popitem(last=False)
+            starts = series.between(low, high)
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.cache('recurrence', hit=hit)
+        return starts
+
+    @staticmethod
+    def _exceptions_key(master):
+        version = master.get('updated') or master.get('etag')
+        return (master['id'], version) if version else None
+
+    def _cached_exceptions(self, key):
+        with self._lock:
+            entry = self._exceptions.get(key) if key else None
+            if entry is not None and clock.monotonic() - entry[0] > self.exceptions_ttl:
+                del self._exceptions[key]
+                entry = None
+            if entry is not None:
+                self._exceptions.move_to_end(key)
+        return entry[1] if entry is not None else None
+
+    def has_exceptions(self, master):
+        """True if the exceptions of `master`'s series are cached."""
+        return self._cached_exceptions(self._exceptions_key(master)) is not None
+
+    def exceptions(self, master):
+        """Returns the cached exceptions of `master`'s series, or None if they must be looked up."""
+        key = self._exceptions_key(master)
+        exceptions = self._cached_exceptions(key)
+        metrics = current_metrics()
+        if metrics is not None and key:
+            metrics.cache('recurrence_exceptions', hit=exceptions is not None)
+        return exceptions
+
+    def store_exceptions(self, master, exceptions):
+        """Caches the looked-up exceptions of `master`'s series; masters without `updated` aren't cached."""
+        key = self._exceptions_key(master)
+        if not key:
+            return
+        with self._lock:
+            self._exceptions[key] = (clock.monotonic(), list(exceptions))
+            self._exceptions.move_to_end(key)
+            if len(self._exceptions) > self.maxsize:
+                self._exceptions.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+            self._exceptions.clear()
+
+_cache = ExpansionCache()
+
+
+# Instances
+
+def _wall_clock(moment, zone, all_day):
+    """Converts an aware instant to the series' wall-clock domain."""
+    if all_day:
+        return moment.date()
+    return moment.astimezone(zone).replace(tzinfo=None)
+
+def _event_value(value, zone, template):
+    """Builds an event start/end dict like `template` for a wall-clock value."""
+    if not isinstance(value, datetime):
+        return {'date': value.isoformat()}
+    result = {'dateTime': value.replace(tzinfo=zone).isoformat()}
+    if template.get('timeZone'):
+        result['timeZone'] = template['timeZone']
+    return result
+
+def expand_master(master, time_min, time_max, cache=_cache):
+    """
+    Returns the instances of a recurring master event that overlap
+    [time_min, time_max), shaped like the API's singleEvents instances:
+    IDs '<master id>_<original start>', recurringEventId and originalStartTime.
+
+    Args:
+        master (dict): Event with a 'recurrence' list
+        time_min, time_max (datetime): Aware window bounds
+        cache (ExpansionCache): Where the expanded series is kept
+
+    Raises:
+        UnsupportedRule: If the recurrence can't be expanded locally
+    """
+    dtstart, zone = _event_time(master['start'])
+    end, _ = _event_time(master['end'])
+    duration = end - dtstart
+    all_day = not isinstance(dtstart, datetime)
+    # Widen the window so instances that started earlier but are still running are included
+    low = _wall_clock(time_min, zone, all_day) - duration - timedelta(days=1)
+    high = _wall_clock(time_max, zone, all_day) + timedelta(days=1)
+
+    base = {key: value for key, value in master.items() if key not in ('recurrence', 'id')}
+    instances = []
+    for start in cache.starts(master, low, high):
+        start_value = _event_value(start, zone, master['start'])
+        end_value = _event_value(start + duration, zone, master['end'])
+        if not (_instant(start_value) < time_max and _instant(end_value) > time_min):
+            continue
+        instance = dict(base, start=start_value, end=end_value,
+                        recurringEventId=master['id'], originalStartTime=start_value)
+        instance['id'] = f"{master['id']}_{_instance_suffix(start_value)}"
+        instances.append(instance)
+    return instances
+
+def _parse_bound(value):
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def lookup_masters(events, cache=_cache):
+    """
+    Returns the recurring masters in a singleEvents=False listing whose
+    exceptions expand_events would look up: live series with an iCalUID
+    whose exceptions aren't cached, each once.
+    """
+    masters = {}
+    for event in events:
+        if (event.get('recurrence') and event.get('status') != 'cancelled' and event.get('iCalUID')
+                and event['id'] not in masters and not cache.has_exceptions(event)):
+            masters[event['id']] = event
+    return list(masters.values())
+
+def expand_events(events, time_min, time_max, fetch_instances=None, fetch_exceptions=None, cache=_cache):
+    """
+    Turns an events().list(singleEvents=False) result into the events a
+    singleEvents=True listing would return: recurring masters are expanded
+    locally (honouring EXDATE), modified exceptions replace the instance they
+    override and cancelled exceptions remove it.
+
+    The listing only holds exceptions that now fall in the window, so an
+    instance moved out of it (e.g. Dec 30 moved to Jan 2) would still be
+    generated at its original slot; fetch_exceptions looks up the rest.
+
+    Args:
+        events (list): Raw events: single events, recurring masters and exceptions
+        time_min, time_max (str or datetime): The listing's window (RFC 3339)
+        fetch_instances (callable, optional): master ID -> server-expanded
+            instances, used for rules this module can't expand; without it
+            UnsupportedRule propagates
+        fetch_exceptions (callable, optional): master event -> every
+            exception of its series wherever it now falls; called for series
+            with instances in the window whose exceptions aren't in `cache`
+            (see lookup_masters to prefetch them in a batch). Without it
+            only the listed exceptions override instances
+        cache (ExpansionCache): Expanded series shared between calls
+
+    Returns:
+        list: Events in start time order
+    """
+    time_min, time_max = _parse_bound(time_min), _parse_bound(time_max)
+    masters, exceptions, result = [], [], []
+    for event in events:
+        if event.get('recurrence'):
+            masters.append(event)
+        elif event.get('recurringEventId'):
+            exceptions.append(event)
+        elif event.get('status') != 'cancelled':
+            result.append(event)
+
+    overridden = {
+        (event['recurringEventId'], _instance_suffix(event['originalStartTime']))
+        for event in exceptions if event.get('originalStartTime')
+    }
+    from_server = set()
+    expanded = 0
+    for master in masters:
+        if master.get('status') == 'cancelled':
+            continue
+        try:
+            instances = expand_master(master, time_min, time_max, cache)
+        except UnsupportedRule as e:
+            if fetch_instances is None:
+                raise
+            print(f"Expanding {master.get('id')} on the server: {e}")
+            from_server.add(master['id'])
+            result.extend(fetch_instances(master['id']))
+            continue
+        if instances and fetch_exceptions is not None:
+            series_exceptions = cache.exceptions(master)
+            if series_exceptions is None:
+                series_exceptions = fetch_exceptions(master)
+                cache.store_exceptions(master, series_exceptions)
+            overridden.update(
+                (master['id'], _instance_suffix(event['originalStartTime']))
+                for event in series_exceptions
+                if event.get('recurringEventId') == master['id'] and event.get('originalStartTime')
+            )
+        for instance in instances:
+            if (master['id'], _instance_suffix(instance['originalStartTime'])) not in overridden:
+                result.append(instance)
+                expanded += 1
+
+    for event in exceptions:
+        if event.get('status') == 'cancelled' or event['recurringEventId'] in from_server:
+            continue
+        if _instant(event['start']) < time_max and _instant(event['end']) > time_min:
+            result.append(event)
+
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.count('recurring_masters', len(masters))
+        metrics.count('instances_expanded_locally', expanded)
+    result.sort(key=lambda event: _instant(event['start']))
+    return result
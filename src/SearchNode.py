@@ -0,0 +1,319 @@
+import argparse
+import re
+import sys
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from itertools import combinations
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from config.settings import WAREHOUSE_FILE
+from src.FormatterNode import FormatterNode
+
+
+_TOKEN = re.compile(r"[^\W_]+")
+# Longest term filed under its deletion variants. Longer tokens (Drive and
+# Meet IDs, URLs) would add thousands of variants each; they still match
+# exactly and by prefix, just not fuzzily.
+FUZZY_TERM_LENGTH = 12
+
+
+def normalize_text(text):
+    """Case-folds text and strips accents, so 'Beyoncé' and 'beyonce' index alike."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+def tokenize(text):
+    """Splits text into normalized word tokens."""
+    return _TOKEN.findall(normalize_text(text))
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions) between a and b, or limit + 1 once it exceeds `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class _TermIndex:
+    """
+    Term -> posting set, with a sorted vocabulary for prefix ranges and a
+    deletion-variant map for fuzzy lookup: every term of at most
+    `fuzzy_length` characters is filed under each string obtained by
+    deleting up to `max_edits` characters, so terms within the edit distance
+    of a query share a variant with it and are found by a few dict lookups
+    instead of a scan of the vocabulary.
+    """
+
+    def __init__(self, max_edits, fuzzy_length=FUZZY_TERM_LENGTH):
+        self.max_edits = max_edits
+        self.fuzzy_length = fuzzy_length
+        self.postings = {}
+        self.terms = []
+        self.deletes = {}
+
+    def _variants(self, term):
+        if len(term) > self.fuzzy_length:
+            return ()
+        variants = {term}
+        for removed in range(1, min(self.max_edits, len(term) - 1) + 1):
+            for positions in combinations(range(len(term)), removed):
+                variants.add(''.join(c for i, c in enumerate(term) if i not in positions))
+        return variants
+
+    def add(self, term, key):
+        keys = self.postings.get(term)
+        if keys is None:
+            keys = self.postings[term] = set()
+            insort(self.terms, term)
+            for variant in self._variants(term):
+                self.deletes.setdefault(variant, set()).add(term)
+        keys.add(key)
+
+    def remove(self, term, key):
+        keys = self.postings.get(term)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self.postings[term]
+            del self.terms[bisect_left(self.terms, term)]
+            for variant in self._variants(term):
+                holders = self.deletes[variant]
+                holders.discard(term)
+                if not holders:
+                    del self.deletes[variant]
+
+    def prefixed(self, prefix):
+        """Returns the terms starting with `prefix`."""
+        start = bisect_left(self.terms, prefix)
+        end = bisect_left(self.terms, prefix + '\U0010ffff')
+        return self.terms[start:end]
+
+    def similar(self, term):
+        """Returns the terms within the edit budget for `term`'s length."""
+        # Short words get fewer edits, or every short term would match
+        limit = 0 if len(term) <= 3 else 1 if len(term) <= 6 else self.max_edits
+        limit = min(limit, self.max_edits)
+        if not limit:
+            return [term] if term in self.postings else []
+        candidates = set()
+        for variant in self._variants(term):
+            candidates.update(self.deletes.get(variant, ()))
+        return [c for c in candidates if edit_distance(term, c, limit) <= limit]
+
+
+class EventSearchIndex:
+    """
+    In-memory inverted index over fetched events for artist and keyword search.
+    Keyword search covers the summary and description tokens; artist search
+    covers the artist names FormatterNode.format_artist extracts, normalized
+    (case, accents), so "Session w/ Nova", "Recording session for NOVA" and
+    "Nova: vocals" are one artist. Both support prefix and typo-tolerant
+    (fuzzy) matching.
+
+    Updated incrementally with `update` as events arrive; an event seen again
+    is re-indexed only if its text changed. Events are also kept on a
+    start-ordered timeline, so a limited search over a common word walks the
+    timeline until it has enough matches instead of sorting every match.
+    Safe to update from a pipeline worker while the UI thread queries it.
+    """
+
+    def __init__(self, formatter=None, max_edits=2, keyword_edits=1, fuzzy_length=FUZZY_TERM_LENGTH):
+        """
+        Args:
+            formatter (FormatterNode, optional): Used for artist extraction
+            max_edits (int): Largest edit distance fuzzy artist lookups accept
+            keyword_edits (int): Largest edit distance fuzzy keyword lookups
+                accept; descriptions have far more distinct terms than
+                artist names, and each extra edit multiplies their variants
+            fuzzy_length (int): Longest term that can be matched fuzzily
+        """
+        self.formatter = formatter or FormatterNode()
+        self.keywords = _TermIndex(keyword_edits, fuzzy_length)
+        self.artists = _TermIndex(max_edits, fuzzy_length)
+        self._events = {}
+        self._entries = {}
+        self._timeline = []
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._events)
+
+    @staticmethod
+    def event_key(event):
+        """Returns the (calendar, event ID) key; events without an ID fall back to start and summary."""
+        calendar_id = event.get('calendar') or 'primary'
+        event_id = event.get('id') or f"{event.get('start', '')}|{event.get('summary', '')}"
+        return calendar_id, event_id
+
+    def update(self, events):
+        """
+        Adds newly fetched events to the index, replacing the entries of
+        events whose summary or description changed.
+
+        Args:
+            events (iterable): Event dictionaries from CalendarNode.get_calendar_data
+
+        Returns:
+            int: Number of events added or re-indexed
+        """
+        changed = 0
+        with self._lock:
+            for event in events:
+                changed += self._add_event(event)
+        return changed
+
+    def _add_event(self, event):
+        key = self.event_key(event)
+        summary = event.get('summary', '') or ''
+        description = event.get('description', '') or ''
+        previous = self._events.get(key)
+        if previous is not None:
+            self._move(key, previous, event)
+        else:
+            insort(self._timeline, (self._start(event), key))
+        self._events[key] = event
+        if previous is not None and previous.get('summary') == event.get('summary') \
+                and previous.get('description') == event.get('description'):
+            return 0
+
+        self._remove(key)
+        artist = self.formatter.format_artist(summary)
+        keyword_terms = set(tokenize(summary)) | set(tokenize(description))
+        artist_terms = set(tokenize(artist))
+        for term in keyword_terms:
+            self.keywords.add(term, key)
+        for term in artist_terms:
+            self.artists.add(term, key)
+        self._entries[key] = (keyword_terms, artist_terms, artist)
+        return 1
+
+    @staticmethod
+    def _start(event):
+        return event.get('start') or ''
+
+    def _move(self, key, previous, event):
+        """Keeps the timeline entry of a re-fetched event at its current start."""
+        old, new = self._start(previous), self._start(event)
+        if old != new:
+            del self._timeline[bisect_left(self._timeline, (old, key))]
+            insort(self._timeline, (new, key))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keyword_terms, artist_terms, _ = entry
+        for term in keyword_terms:
+            self.keywords.remove(term, key)
+        for term in artist_terms:
+            self.artists.remove(term, key)
+
+    def search(self, query, prefix=True, fuzzy=True, limit=None):
+        """
+        Returns the events whose summary or description match every word of
+        `query`, in start order.
+
+        Args:
+            query (str): Words to look for
+            prefix (bool): A word also matches terms it starts ("voc" -> "vocals")
+            fuzzy (bool): A word with no exact or prefix match matches terms
+                a small edit distance away ("vocls" -> "vocals")
+            limit (int, optional): Return at most this many events
+        """
+        with self._lock:
+            return self._results(self._lookup(self.keywords, query, prefix, fuzzy), limit)
+
+    def search_artist(self, name, prefix=True, fuzzy=True, limit=None):
+        """Returns the sessions of artists matching `name` (see search), in start order."""
+        with self._lock:
+            return self._results(self._lookup(self.artists, name, prefix, fuzzy), limit)
+
+    def count(self, query, artist=False, prefix=True, fuzzy=True):
+        """Returns the number of events `search` (or `search_artist`) would match."""
+        with self._lock:
+            return len(self._lookup(self.artists if artist else self.keywords, query, prefix, fuzzy))
+
+    def artist_names(self, name, prefix=True, fuzzy=True):
+        """Returns the distinct artist names matching `name`, for suggestions."""
+        with self._lock:
+            keys = self._lookup(self.artists, name, prefix, fuzzy)
+            return sorted({self._entries[key][2] for key in keys}, key=lambda n: (normalize_text(n), n))
+
+    def _lookup(self, index, query, prefix, fuzzy):
+        matches = []
+        for token in tokenize(query):
+            terms = set(index.prefixed(token)) if prefix else {token} & index.postings.keys()
+            if fuzzy and not terms:
+                terms = index.similar(token)
+            if not terms:
+                return set()
+            if len(terms) == 1:
+                # Read-only use of the posting set itself; no copy
+                matches.append(index.postings[next(iter(terms))])
+            else:
+                matches.append(set().union(*(index.postings[term] for term in terms)))
+        if not matches:
+            return set()
+        matches.sort(key=len)
+        return matches[0].intersection(*matches[1:])
+
+    def _results(self, keys, limit):
+        # Walking the timeline visits about limit * len(timeline) / len(keys)
+        # events; sorting visits every match. Take whichever is cheaper.
+        if limit and len(keys) * len(keys) > limit * len(self._timeline):
+            events = []
+            for _, key in self._timeline:
+                if key in keys:
+                    events.append(self._events[key])
+                    if len(events) >= limit:
+                        break
+            return events
+        events = sorted((self._events[key] for key in keys), key=self._start)
+        return events[:limit] if limit else events
+
+def main(argv=None):
+    from src.WarehouseNode import SessionWarehouse
+
+    parser = argparse.ArgumentParser(description="Search stored sessions by artist or keyword.")
+    parser.add_argument("command", choices=["artist", "keyword"])
+    parser.add_argument("query", help="Artist name or words to look for")
+    parser.add_argument("--exact", action="store_true", help="Disable prefix and fuzzy matching")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--db", default=WAREHOUSE_FILE)
+    args = parser.parse_args(argv)
+
+    index = EventSearchIndex()
+    with SessionWarehouse(args.db) as warehouse:
+        index.update(warehouse.iter_events())
+
+    lookup = index.search_artist if args.command == "artist" else index.search
+    started = time.perf_counter()
+    events = lookup(args.query, prefix=not args.exact, fuzzy=not args.exact, limit=args.limit)
+    elapsed = time.perf_counter() - started
+    for event in events:
+        print(f"{event['start']}  {event['summary']}")
+    print(f"{len(events)} match(es) among {len(index)} sessions in {elapsed * 1000:.3f} ms")
+
+if __name__ == '__main__':
+    main()
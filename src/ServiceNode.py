@@ -0,0 +1,170 @@
+import sys
+import threading
+import time
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from google.auth.credentials import AnonymousCredentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+from config.settings import API_RATE_LIMIT, API_RATE_BURST, API_NUM_RETRIES
+from src.MetricsNode import current_metrics
+from src.CalendarNode import get_credentials
+from src.SheetNode import get_sheets_credentials
+from src.TransportNode import default_transport
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every API request in the process.
+    Allows bursts of up to `burst` requests, refilled at `rate` per second.
+    """
+
+    def __init__(self, rate=API_RATE_LIMIT, burst=API_RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request may be sent. A rate of 0 disables limiting."""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def make_request_builder(limiter, max_retries=API_NUM_RETRIES, sleep=time.sleep):
+    """
+    Returns an HttpRequest subclass for build(requestBuilder=...) that waits
+    on `limiter` before every attempt, retries throttled and transient
+    failures with exponential backoff, and records each call's latency,
+    bytes and retries into the RunMetrics bound to the calling thread.
+    """
+
+    class PooledRequest(HttpRequest):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.response_bytes = 0
+            self.parse_seconds = 0.0
+            # Response parser; JsonStreamNode.stream_items swaps in a streaming one
+            self.parse_response = self.postproc
+
+            def measured_postproc(resp, content):
+                self.response_bytes = len(content or b'')
+                started = time.perf_counter()
+                try:
+                    return self.parse_response(resp, content)
+                finally:
+                    self.parse_seconds = time.perf_counter() - started
+            self.postproc = measured_postproc
+
+        def execute(self, http=None, num_retries=0):
+            metrics = current_metrics()
+            started = time.perf_counter()
+            retries = 0
+            allowed = max(num_retries, max_retries)
+            while True:
+                limiter.acquire()
+                try:
+                    result = super().execute(http=http)
+                    break
+                except HttpError as e:
+                    if e.resp.status in RETRY_STATUSES and retries < allowed:
+                        sleep(min(2 ** retries, 32))
+                        retries += 1
+                        continue
+                    if metrics is not None:
+                        metrics.observe_api(self.methodId, time.perf_counter() - started,
+                                            request_bytes=len(self.body or ''), error=True, retries=retries)
+                    raise
+            if metrics is not None:
+                metrics.observe_api(self.methodId, time.perf_counter() - started,
+                                    request_bytes=len(self.body or ''),
+                                    response_bytes=self.response_bytes, retries=retries,
+                                    parse_seconds=self.parse_seconds)
+            return result
+
+    return PooledRequest
+
+
+class ServicePool:
+    """
+    Shares credentials, a request budget and a connection pool across threads.
+    Credentials are loaded once; each thread gets its own Calendar and Sheets
+    service objects, all sending through one thread-safe keep-alive
+    transport (TransportNode.SessionHttp), so concurrent fetches and writes
+    reuse sockets. Every request built by these services waits on the shared
+    RateLimiter before it is sent, and is measured (see make_request_builder).
+    A replaying transport (TransportNode.CassettePlayer) needs no credentials.
+    """
+
+    def __init__(self, limiter=None, transport=None):
+        self.limiter = limiter or RateLimiter()
+        self.transport = transport or default_transport()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._calendar_creds = None
+        self._sheets_creds = None
+        self.request_builder = make_request_builder(self.limiter)
+
+    def authenticate(self):
+        """
+        Loads both sets of credentials up front. Call this on the main thread
+        before starting workers, since it may open the browser consent flow.
+        """
+        with self._lock:
+            if getattr(self.transport, 'replaying', False):
+                self._calendar_creds = self._sheets_creds = AnonymousCredentials()
+            if self._calendar_creds is None:
+                self._calendar_creds = get_credentials()
+            if self._sheets_creds is None:
+                self._sheets_creds = get_sheets_credentials()
+        return self
+
+    def calendar(self):
+        """Returns this thread's Calendar service."""
+        service = getattr(self._local, 'calendar', None)
+        self._record_cache(service)
+        if service is None:
+            self.authenticate()
+            service = build('calendar', 'v3', http=AuthorizedHttp(self._calendar_creds, http=self.transport),
+                            requestBuilder=self.request_builder)
+            self._local.calendar = service
+        return service
+
+    def sheets(self):
+        """Returns this thread's Sheets service."""
+        service = getattr(self._local, 'sheets', None)
+        self._record_cache(service)
+        if service is None:
+            self.authenticate()
+            service = build('sheets', 'v4', http=AuthorizedHttp(self._sheets_creds, http=self.transport),
+                            requestBuilder=self.request_builder)
+            self._local.sheets = service
+        return service
+
+    def _record_cache(self, service):
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.cache('service_pool', hit=service is not None)
@@ -14,7 +14,8 @@ from config.settings import (
     SHEETS_TOKEN_FILE,
     CREDENTIALS_FILE,
     PRIMARY_CALENDAR_ID,
-    SECOND_CALENDAR_ID
+    SECOND_CALENDAR_ID,
+    SHEET_CHUNK_SIZE
 )
 
 
@@ -25,8 +26,11 @@ from googleapiclient.errors import HttpError
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google.auth.exceptions import RefreshError
 from datetime import datetime
 
+from src.ReconcileNode import column_letter
+
 
 
 
@@ -35,21 +39,29 @@ from datetime import datetime
 # TOKEN_FILE = 'sheet_token.json'
 #CREDENTIALS_FILE = 'credentials.json'
 
-def get_sheets_service():
+def get_sheets_credentials():
     """
-    Authenticate and return a Google Sheets API service instance.
+    Load, refresh or obtain the Google Sheets credentials.
+    The saved token is kept between runs (see CalendarNode.get_credentials).
     """
     creds = None
     
     # Check if token.json exists
     if os.path.exists(SHEETS_TOKEN_FILE):
-        creds = Credentials.from_authorized_user_file(SHEETS_TOKEN_FILE, SHEET_SCOPES) #TOKEN_FILE
+        try:
+            creds = Credentials.from_authorized_user_file(SHEETS_TOKEN_FILE, SHEET_SCOPES) #TOKEN_FILE
+        except ValueError as error:
+            print(f"Ignoring unreadable sheets token ({error}); authorizing again")
     
     # If token.json is missing or invalid, prompt the user for authorization
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
+            try:
+                creds.refresh(Request())
+            except RefreshError as error:
+                print(f"Saved sheets token was rejected ({error}); authorizing again")
+                creds = None
+        if not creds or not creds.valid:
             flow = InstalledAppFlow.from_client_secrets_file(
                 CREDENTIALS_FILE, SHEET_SCOPES
             )
@@ -59,6 +71,14 @@ def get_sheets_service():
         with open(SHEETS_TOKEN_FILE, 'w') as token:
             token.write(creds.to_json())
    
+    return creds
+
+def get_sheets_service():
+    """
+    Authenticate and return a Google Sheets API service instance.
+    """
+    creds = get_sheets_credentials()
+    
     # Build the Google Sheets API service
     service = build('sheets', 'v4', credentials=creds)
     return service
@@ -165,6 +185,69 @@ def write_data_to_sheet(service, spreadsheet_id, sheet_name, data):
         print(f"An error occurred: {error}")
         return False
 
+def write_rows_in_chunks(service, spreadsheet_id, sheet_name, rows, chunk_size=SHEET_CHUNK_SIZE, on_chunk=None,
+                         stopped=None):
+    """
+    Write a stream of rows to a Google Sheet in chunks, so rows can be written
+    while later ones are still being produced. Each chunk overwrites the rows
+    it lands on, below the previous one; the rows the tab holds past the last
+    one written are cleared only once the stream has ended cleanly. If
+    producing the rows raises, or the stream was stopped, nothing is cleared
+    and the tab keeps its earlier rows below the ones already written.
+    
+    Args:
+        service: Google Sheets API service instance
+        spreadsheet_id (str): ID of the spreadsheet
+        sheet_name (str): Name of the sheet to write to
+        rows (iterable): Rows (header first) in the FormatterNode format
+        chunk_size (int): Rows per update request
+        on_chunk (callable, optional): Called with the running cell count after each chunk
+        stopped (callable, optional): Checked once the rows run out; True means
+            the stream was cut short (e.g. cancelled), so nothing is cleared
+        
+    Returns:
+        int: Number of cells written
+    """
+    cells = 0
+    next_row = 1
+    width = 0
+    chunk = []
+    
+    def flush():
+        nonlocal cells, next_row, chunk
+        result = service.spreadsheets().values().update(
+            spreadsheetId=spreadsheet_id,
+            range=f"{sheet_name}!A{next_row}",
+            valueInputOption='RAW',
+            body={'values': chunk}
+        ).execute()
+        cells += result.get('updatedCells', sum(len(row) for row in chunk))
+        next_row += len(chunk)
+        chunk = []
+        if on_chunk is not None:
+            on_chunk(cells)
+    
+    for row in rows:
+        chunk.append(row)
+        width = max(width, len(row))
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    if stopped is not None and stopped():
+        print(f"Writing to sheet '{sheet_name}' stopped after {next_row - 1} rows; earlier rows left in place.")
+        return cells
+
+    # Clear what an earlier, longer write left below the new rows
+    service.spreadsheets().values().clear(
+        spreadsheetId=spreadsheet_id,
+        range=f"{sheet_name}!A{next_row}:{column_letter(width - 1)}" if width else sheet_name,
+        body={}
+    ).execute()
+    
+    print(f"Data written to sheet '{sheet_name}'. Updated {cells} cells in {next_row - 1} rows.")
+    return cells
+
 def main():
     from FormatterNode import FormatterNode
     from CalendarNode import get_calendar_data
@@ -0,0 +1,136 @@
+import heapq
+import json
+import sys
+import tempfile
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from config.settings import SORT_SPILL_DIR, SORT_SPILL_EVENTS
+
+
+# Most spilled runs merged at once; past it, the runs are first merged into one
+MERGE_WIDTH = 64
+
+# One encoder and decoder for every line, rather than one per json.dumps call
+_encode = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+_decode = json.JSONDecoder().decode
+
+
+def _read_run(run):
+    run.seek(0)
+    for line in run:
+        yield _decode(line)
+
+
+class ExternalSorter:
+    """
+    Sorts more items than fit in memory. Items are buffered until
+    `spill_threshold` of them are held, then the buffer is sorted and written
+    to a temporary file as one run (JSON lines) and emptied. `merged` yields
+    every item in order by merging the runs and the final buffer with
+    heapq.merge, which holds one item per run, so memory stays bounded by the
+    threshold whatever the number of items.
+
+    Runs are unnamed temporary files (removed as soon as they're closed, even
+    if the process dies) in `spill_dir`. When more than MERGE_WIDTH runs
+    exist they are merged into a single run first, to bound open files.
+
+    Items must be JSON-serializable; spilled items come back decoded (tuples
+    as lists). The sort is stable, as sorted() is: items with equal keys keep
+    the order they were added in.
+    """
+
+    def __init__(self, key, spill_threshold=SORT_SPILL_EVENTS, spill_dir=SORT_SPILL_DIR, merge_width=MERGE_WIDTH):
+        """
+        Args:
+            key (callable): Sort key, as for sorted()
+            spill_threshold (int): Items buffered before a run spills; 0 or
+                None keeps everything in memory
+            spill_dir (str, optional): Directory for the runs; the system
+                temp directory if None
+            merge_width (int): Most runs open at once
+        """
+        self.key = key
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self.merge_width = max(2, merge_width)
+        self.count = 0
+        self.spilled_runs = 0
+        self._buffer = []
+        self._runs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add(self, item):
+        """Adds one item, spilling the buffer once it reaches the threshold."""
+        self._buffer.append(item)
+        self.count += 1
+        if self.spill_threshold and len(self._buffer) >= self.spill_threshold:
+            self._spill()
+
+    def extend(self, items):
+        """Adds every item of an iterable (e.g. a page generator) without materializing it."""
+        for item in items:
+            self.add(item)
+
+    def _write_run(self, items):
+        run = tempfile.TemporaryFile(mode='w+', encoding='utf-8', prefix='sort-run-', dir=self.spill_dir)
+        run.writelines(_encode(item) + '\n' for item in items)
+        run.flush()
+        return run
+
+    def _spill(self):
+        self._buffer.sort(key=self.key)
+        self._runs.append(self._write_run(self._buffer))
+        self._buffer = []
+        self.spilled_runs += 1
+        if len(self._runs) >= self.merge_width:
+            runs, self._runs = self._runs, []
+            self._runs.append(self._write_run(heapq.merge(*map(_read_run, runs), key=self.key)))
+            for run in runs:
+                run.close()
+
+    def merged(self):
+        """
+        Yields every added item in key order, then releases the runs.
+        Consumes the sorter: it is empty afterwards.
+        """
+        self._buffer.sort(key=self.key)
+        buffer, self._buffer = self._buffer, []
+        try:
+            if not self._runs:
+                yield from buffer
+                return
+            # Earlier runs first, so ties keep their insertion order
+            yield from heapq.merge(*map(_read_run, self._runs), buffer, key=self.key)
+        finally:
+            self.close()
+
+    def close(self):
+        """Removes the spilled runs and drops any buffered items."""
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._buffer = []
+
+def external_sort(items, key, spill_threshold=SORT_SPILL_EVENTS, spill_dir=SORT_SPILL_DIR):
+    """
+    Yields the items of an iterable in key order, spilling sorted runs to
+    temporary files past `spill_threshold` items (see ExternalSorter).
+    Nothing is yielded until every item has been read.
+    """
+    sorter = ExternalSorter(key, spill_threshold, spill_dir)
+    try:
+        sorter.extend(items)
+    except BaseException:
+        sorter.close()
+        raise
+    yield from sorter.merged()
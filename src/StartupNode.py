@@ -0,0 +1,138 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+# Set by the launcher (LauncherNode) to its start time, as time.time()
+LAUNCH_ENV = 'LAUNCH_STARTED_AT'
+
+# Modules the GUI needs once the user submits; imported in the background
+# after the first window is shown
+BACKGROUND_MODULES = ('src.Controller', 'src.AvailabilityNode')
+
+# Modules measured by the import-time report
+REPORT_MODULES = ('tkinter',) + BACKGROUND_MODULES
+
+
+class BackgroundImporter:
+    """
+    Imports the heavy pipeline modules (googleapiclient, google_auth_oauthlib,
+    dotenv and everything under src) on a background thread, so the Tk window
+    can appear before they are loaded.
+    """
+
+    def __init__(self, modules=BACKGROUND_MODULES):
+        self.modules = modules
+        self.error = None
+        self.seconds = None
+        self._thread = None
+
+    def start(self):
+        """Starts importing in the background; safe to call more than once."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="BackgroundImporter", daemon=True)
+            self._thread.start()
+        return self
+
+    def ready(self):
+        """Returns True once every module has been imported (or failed to)."""
+        return self._thread is not None and not self._thread.is_alive()
+
+    def wait(self):
+        """Blocks until the imports are done, re-raising any import error."""
+        self.start()
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            for module in self.modules:
+                __import__(module)
+        except Exception as e:
+            self.error = e
+        self.seconds = time.perf_counter() - started
+        print(f"Background imports finished in {self.seconds:.2f}s")
+
+def import_time_report(modules=REPORT_MODULES, python=sys.executable):
+    """
+    Measures cold import times in a fresh interpreter with `python -X importtime`
+    and totals them per top-level package.
+
+    Args:
+        modules (tuple): Modules to import
+        python (str): Interpreter to run
+
+    Returns:
+        list: (package, seconds) tuples, slowest first
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=str(project_root), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    totals = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(self_us)
+
+    return sorted(((package, us / 1e6) for package, us in totals.items()),
+                  key=lambda item: item[1], reverse=True)
+
+def print_import_report(modules=REPORT_MODULES, top=15):
+    """Prints the per-package import-time breakdown."""
+    report = import_time_report(modules)
+    total = sum(seconds for _, seconds in report)
+    print(f"Import time for {', '.join(modules)}: {total:.3f}s")
+    for package, seconds in report[:top]:
+        print(f"  {package:<32} {seconds:7.3f}s  {100 * seconds / total:5.1f}%")
+    return total
+
+def check_first_window(seconds, target=None):
+    """
+    Reports time-to-first-window against STARTUP_TARGET_SECONDS.
+
+    Returns:
+        bool: True if the window appeared within the target
+    """
+    if target is None:
+        from config.settings import STARTUP_TARGET_SECONDS
+        target = STARTUP_TARGET_SECONDS
+    within = seconds <= target
+    print(f"Time to first window: {seconds:.3f}s (target {target:.3f}s){'' if within else ' - over target'}")
+    return within
+
+def report_launch_to_ready(started_at=None, now=None):
+    """
+    Reports the time from the launcher starting (environment check included)
+    to the GUI being ready, when the app was started by the launcher.
+
+    Returns:
+        float: Seconds from launch to ready, or None without a launch time
+    """
+    if started_at is None:
+        started_at = os.environ.get(LAUNCH_ENV)
+    try:
+        started_at = float(started_at)
+    except (TypeError, ValueError):
+        return None
+    seconds = (time.time() if now is None else now) - started_at
+    print(f"Launch to ready: {seconds:.3f}s")
+    return seconds
+
+if __name__ == '__main__':
+    print_import_report()
@@ -0,0 +1,180 @@
+import calendar
+import sys
+from datetime import datetime, timedelta
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from config.settings import STUDIO_HOURS_PER_DAY
+from src.ExportNode import to_number
+from src.FormatterNode import FormatterNode
+
+
+class GroupTotals:
+    """Running totals for one summary group. Constant size regardless of how many rows it absorbs."""
+
+    __slots__ = ("sessions", "hours", "revenue", "engineer_payout", "referral_payout")
+
+    def __init__(self):
+        self.sessions = 0
+        self.hours = 0.0
+        self.revenue = 0.0
+        self.engineer_payout = 0.0
+        self.referral_payout = 0.0
+
+    def add(self, hours, price, engineer_payment, referral_payment):
+        self.sessions += 1
+        self.hours += hours
+        self.revenue += price
+        self.engineer_payout += engineer_payment
+        self.referral_payout += referral_payment
+
+
+class SummaryAggregator:
+    """
+    Single-pass payroll and utilization summary over the FormatterNode row stream.
+    Totals hours, revenue, engineer payout and referral payout per engineer,
+    studio, artist, ISO week and month, and reports utilization as a percentage
+    of the studio hours available in each group's period.
+    """
+
+    DIMENSIONS = ("Engineer", "Studio", "Artist", "Week", "Month")
+
+    HEADER = [
+        "Dimension", "Group", "Sessions", "Hours", "Revenue",
+        "Engineer Payout", "Referral Payout", "Utilization %"
+    ]
+
+    def __init__(self, start_date=None, end_date=None, studio_hours_per_day=STUDIO_HOURS_PER_DAY, studios=None):
+        """
+        Args:
+            start_date (str, optional): First day of the reporting window (YYYY-MM-DD);
+                defaults to the earliest session date seen
+            end_date (str, optional): Last day of the reporting window (YYYY-MM-DD);
+                defaults to the latest session date seen
+            studio_hours_per_day (float): Bookable hours per studio per day
+            studios (iterable, optional): Names of every bookable studio, e.g.
+                FormatterNode.studio_names(); studios with no sessions still count
+                toward available hours. Defaults to the studios seen in the rows
+        """
+        self.start_date = start_date
+        self.end_date = end_date
+        self.studio_hours_per_day = studio_hours_per_day
+        self.studios = set(studios or ())
+        self.groups = {dimension: {} for dimension in self.DIMENSIONS}
+        self._first_date = None
+        self._last_date = None
+        # Column positions; replaced by the stream's own header in `consume`
+        self._columns = {name: index for index, name in enumerate(FormatterNode().template)}
+
+    def consume(self, rows):
+        """
+        Aggregates a row stream (header row first) and passes every row through,
+        so the summary can be computed while the rows flow on to a sink.
+
+        Yields:
+            list: The rows, unchanged
+        """
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            return
+        self._columns = {name: index for index, name in enumerate(header)}
+        yield header
+        for row in rows:
+            self.add(row)
+            yield row
+
+    def aggregate(self, rows):
+        """Aggregates a row stream (header row first) and returns the summary rows."""
+        for _ in self.consume(rows):
+            pass
+        return self.summary_rows()
+
+    def add(self, row):
+        """Adds one formatted row to every group it belongs to."""
+        columns = self._columns
+
+        def cell(name):
+            index = columns.get(name)
+            return row[index] if index is not None and index < len(row) else ""
+
+        date = cell("Date")
+        hours = to_number(cell("Hours")) or 0.0
+        price = to_number(cell("Price")) or 0.0
+        engineer_payment = to_number(cell("Engineer Payment")) or 0.0
+        referral_payment = to_number(cell("Referral Payment")) or 0.0
+
+        keys = {
+            "Engineer": cell("Engineer Name") or "No Engineer",
+            "Studio": cell("Studio"),
+            "Artist": cell("Artist Name"),
+        }
+        if date:
+            self._first_date = min(self._first_date or date, date)
+            self._last_date = max(self._last_date or date, date)
+            day = datetime.strptime(date, "%Y-%m-%d")
+            iso_year, iso_week, _ = day.isocalendar()
+            keys["Week"] = f"{iso_year}-W{iso_week:02d}"
+            keys["Month"] = date[:7]
+
+        for dimension, key in keys.items():
+            totals = self.groups[dimension].get(key)
+            if totals is None:
+                totals = self.groups[dimension][key] = GroupTotals()
+            totals.add(hours, price, engineer_payment, referral_payment)
+
+    def window(self):
+        """Returns the reporting window as (first_day, last_day) datetimes, or (None, None)."""
+        start = self.start_date or self._first_date
+        end = self.end_date or self._last_date
+        if not start or not end:
+            return None, None
+        return datetime.strptime(start, "%Y-%m-%d"), datetime.strptime(end, "%Y-%m-%d")
+
+    def available_hours(self, dimension, key):
+        """Bookable studio hours in the period covered by a group, clipped to the reporting window."""
+        first, last = self.window()
+        if first is None:
+            return 0.0
+
+        if dimension == "Week":
+            year, week = key.split("-W")
+            period_start = datetime.fromisocalendar(int(year), int(week), 1)
+            period_end = period_start + timedelta(days=6)
+        elif dimension == "Month":
+            year, month = (int(part) for part in key.split("-"))
+            period_start = datetime(year, month, 1)
+            period_end = datetime(year, month, calendar.monthrange(year, month)[1])
+        else:
+            period_start, period_end = first, last
+
+        days = (min(period_end, last) - max(period_start, first)).days + 1
+        studios = 1 if dimension == "Studio" else max(len(self.studio_keys()), 1)
+        return max(days, 0) * studios * self.studio_hours_per_day
+
+    def studio_keys(self):
+        """Returns every studio in the summary: the bookable studios plus any seen in the rows."""
+        return self.studios | set(self.groups["Studio"])
+
+    def summary_rows(self):
+        """
+        Returns the summary as a header row plus one row per group, ready for
+        SheetNode.write_data_to_sheet or ExportNode.export_rows.
+        """
+        rows = [list(self.HEADER)]
+        for dimension in self.DIMENSIONS:
+            keys = self.studio_keys() if dimension == "Studio" else self.groups[dimension]
+            for key in sorted(keys):
+                totals = self.groups[dimension].get(key) or GroupTotals()
+                available = self.available_hours(dimension, key)
+                utilization = f"{100 * totals.hours / available:.1f}" if available else ""
+                rows.append([
+                    dimension, key, totals.sessions, f"{totals.hours:.2f}",
+                    f"{totals.revenue:.2f}", f"{totals.engineer_payout:.2f}",
+                    f"{totals.referral_payout:.2f}", utilization
+                ])
+        return rows
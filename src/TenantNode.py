@@ -0,0 +1,85 @@
+import json
+import sys
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from config.settings import TENANTS_FILE, PRIMARY_CALENDAR_ID, SECOND_CALENDAR_ID, STUDIO_TIMEZONE
+from src.TimezoneNode import get_zone
+
+
+class Tenant:
+    """
+    One studio location: its calendars, the studio name for each calendar,
+    and the spreadsheet its sessions are written to.
+    """
+
+    def __init__(self, name, spreadsheet_id, calendars, studio_map=None, timezone=STUDIO_TIMEZONE):
+        """
+        Args:
+            name (str): Short unique name, used in logs, metrics and reports
+            spreadsheet_id (str): Spreadsheet the tenant's sheets are written to
+            calendars (list): Calendar IDs, fetched in this order
+            studio_map (dict, optional): Calendar ID -> studio name; None keeps
+                FormatterNode's built-in map
+            timezone (str, optional): IANA zone event times are converted to
+                (see TimezoneNode); empty keeps each event's own wall clock
+        """
+        self.name = name
+        self.spreadsheet_id = spreadsheet_id
+        self.calendar_ids = list(calendars)
+        self.studio_map = studio_map
+        self.timezone = timezone
+
+    def __repr__(self):
+        return f"Tenant({self.name!r}, calendars={len(self.calendar_ids)})"
+
+def default_tenant(spreadsheet_id):
+    """Returns the single-location tenant described by the .env settings."""
+    return Tenant('default', spreadsheet_id, [PRIMARY_CALENDAR_ID, SECOND_CALENDAR_ID])
+
+def parse_tenants(config):
+    """
+    Builds tenants from a parsed config of the form
+
+        {"tenants": [
+            {"name": "downtown",
+             "spreadsheet_id": "1AbC...",
+             "timezone": "America/New_York",
+             "calendars": {"primary": "Studio A", "abc123@group.calendar.google.com": "Studio B"}}
+        ]}
+
+    Raises:
+        ValueError: If an entry is missing a field, a name is repeated or a
+            time zone is unknown
+    """
+    tenants = []
+    names = set()
+    for index, entry in enumerate(config.get('tenants', [])):
+        missing = [key for key in ('name', 'spreadsheet_id', 'calendars') if not entry.get(key)]
+        if missing:
+            raise ValueError(f"Tenant #{index + 1} is missing {', '.join(missing)}")
+        if entry['name'] in names:
+            raise ValueError(f"Tenant name '{entry['name']}' is used more than once")
+        names.add(entry['name'])
+        calendars = entry['calendars']
+        if not isinstance(calendars, dict):
+            raise ValueError(f"Tenant '{entry['name']}': calendars must map calendar IDs to studio names")
+        zone = entry.get('timezone', STUDIO_TIMEZONE)
+        if zone:
+            try:
+                get_zone(zone)
+            except ValueError as e:
+                raise ValueError(f"Tenant '{entry['name']}': {e}")
+        tenants.append(Tenant(entry['name'], entry['spreadsheet_id'], calendars, dict(calendars), zone))
+    if not tenants:
+        raise ValueError("No tenants configured")
+    return tenants
+
+def load_tenants(path=TENANTS_FILE):
+    """Loads the tenants from a JSON config file (see parse_tenants)."""
+    with open(path) as f:
+        return parse_tenants(json.load(f))
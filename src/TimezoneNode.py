@@ -0,0 +1,177 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from config.settings import STUDIO_TIMEZONE
+
+
+_LAST_SECOND = timedelta(minutes=59, seconds=59)
+
+
+@lru_cache(maxsize=None)
+def get_zone(name):
+    """
+    Returns the ZoneInfo for an IANA zone name, resolved once per name.
+
+    Raises:
+        ValueError: If the zone is unknown
+    """
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone {name!r}")
+
+def format_offset(offset):
+    """Formats a UTC offset as in ISO 8601 event times: +HH:MM / -HH:MM."""
+    sign = '-' if offset < timedelta(0) else '+'
+    minutes = abs(offset) // timedelta(minutes=1)
+    return f"{sign}{minutes // 60:02d}:{minutes % 60:02d}"
+
+@lru_cache(maxsize=None)
+def parse_offset(suffix):
+    """Parses 'Z', '+HH:MM' or '-HH:MM' into a timedelta."""
+    if suffix == 'Z':
+        return timedelta(0)
+    sign = -1 if suffix[0] == '-' else 1
+    return sign * timedelta(hours=int(suffix[1:3]), minutes=int(suffix[4:6]))
+
+def _split(value):
+    """
+    Splits an ISO 8601 date-time into (wall clock 'YYYY-MM-DDTHH:MM:SS',
+    fractional seconds, UTC offset suffix); the suffix is '' for a floating time.
+    """
+    head, rest = value[:19], value[19:]
+    if rest.endswith('Z'):
+        return head, rest[:-1], 'Z'
+    if len(rest) >= 6 and rest[-6] in '+-':
+        return head, rest[:-6], rest[-6:]
+    return head, rest, ''
+
+
+class TimezoneNormalizer:
+    """
+    Rewrites event start/end times into one studio time zone, so events
+    created in other zones, or whose start and end fall on different sides
+    of a DST change, sort and compute hours like the rest.
+
+    A timed value keeps its instant and gets the studio's wall clock and
+    offset ("2024-12-16T16:30:00-08:00" becomes "2024-12-16T19:30:00-05:00"
+    for America/New_York); consumers that drop the offset (FormatterNode,
+    AvailabilityNode) then read studio local time. Floating values (no
+    offset) are taken as studio time and left alone. All-day values are
+    dates on the studio's calendar and are never shifted.
+
+    Conversions are cached per (source offset, source wall-clock hour): the
+    shift to studio time is worked out once per hour bucket, checked to be
+    constant across it, and reused for every event in it, so a batch costs
+    about one dict lookup per value. A value already in studio time is
+    returned unchanged without being parsed.
+    """
+
+    def __init__(self, zone_name):
+        """
+        Args:
+            zone_name (str): IANA zone of the studio, e.g. 'America/New_York'
+
+        Raises:
+            ValueError: If the zone is unknown
+        """
+        self.zone_name = zone_name
+        self.zone = get_zone(zone_name)
+        self._shifts = {}
+
+    def _bucket(self, hour, suffix):
+        """Returns (shift, studio offset suffix) for a source hour, or None if the studio offset changes in it."""
+        source_offset = parse_offset(suffix)
+        utc_start = (datetime.fromisoformat(hour + ':00:00') - source_offset).replace(tzinfo=timezone.utc)
+        offset = utc_start.astimezone(self.zone).utcoffset()
+        if (utc_start + _LAST_SECOND).astimezone(self.zone).utcoffset() != offset:
+            return None
+        return offset - source_offset, format_offset(offset)
+
+    def normalize(self, value):
+        """
+        Returns an event start/end string in studio time.
+
+        Args:
+            value (str): ISO 8601 date-time, date (all-day) or empty
+
+        Returns:
+            str: The value in studio time; dates and empty values unchanged
+        """
+        if not value or 'T' not in value:
+            return value
+        head, fraction, suffix = _split(value)
+        if not suffix:
+            return value
+        key = (head[:13], suffix)
+        entry = self._shifts.get(key, False)
+        if entry is False:
+            entry = self._shifts[key] = self._bucket(head[:13], suffix)
+        if entry is None:
+            # The studio zone changes offset within this hour; convert exactly
+            moment = datetime.fromisoformat(head).replace(tzinfo=timezone(parse_offset(suffix)))
+            local = moment.astimezone(self.zone)
+            return local.replace(tzinfo=None).isoformat() + fraction + format_offset(local.utcoffset())
+        shift, studio_suffix = entry
+        if not shift:
+            return value if studio_suffix == suffix else head + fraction + studio_suffix
+        return (datetime.fromisoformat(head) + shift).isoformat() + fraction + studio_suffix
+
+    def normalize_event(self, event):
+        """Rewrites an event's 'start' and 'end' into studio time, in place, and returns it."""
+        start = event.get('start')
+        if start and 'T' in start:
+            event['start'] = self.normalize(start)
+            event['end'] = self.normalize(event.get('end'))
+        return event
+
+    def normalize_events(self, events):
+        """
+        Rewrites the start and end of every event into studio time, in place.
+
+        Args:
+            events (list): Event dictionaries from CalendarNode.get_calendar_data
+
+        Returns:
+            int: Number of events whose times changed
+        """
+        normalize = self.normalize
+        changed = 0
+        for event in events:
+            start = event.get('start')
+            if not start or 'T' not in start:
+                # All-day: a date on the studio calendar, no instant to convert
+                continue
+            end = event.get('end')
+            new_start, new_end = normalize(start), normalize(end)
+            if new_start is not start or new_end is not end:
+                event['start'], event['end'] = new_start, new_end
+                changed += 1
+        return changed
+
+@lru_cache(maxsize=None)
+def get_normalizer(zone_name=STUDIO_TIMEZONE):
+    """
+    Returns the shared normalizer for a studio zone, so its conversion cache
+    carries over between runs; None when no zone is configured.
+    """
+    return TimezoneNormalizer(zone_name) if zone_name else None
+
+def normalize_events(events, zone_name=STUDIO_TIMEZONE):
+    """
+    Rewrites event times into the studio zone in place (see
+    TimezoneNormalizer); does nothing when no zone is configured.
+
+    Returns:
+        int: Number of events whose times changed
+    """
+    normalizer = get_normalizer(zone_name)
+    return normalizer.normalize_events(events) if normalizer is not None else 0
@@ -0,0 +1,366 @@
+import atexit
+import gzip
+import json
+import re
+import socket
+import sys
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+import httplib2
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config.settings import (
+    API_CASSETTE,
+    API_CASSETTE_MODE,
+    API_REPLAY_TIMING,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_TIMEOUT
+)
+from src.MetricsNode import current_metrics
+
+
+# Set on the requesting thread when urllib3 has to open a new connection
+_opened = threading.local()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _opened.new_connection = True
+        return super()._new_conn()
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _opened.new_connection = True
+        return super()._new_conn()
+
+
+class _PoolAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools note every new connection."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+
+class SessionHttp:
+    """
+    Thread-safe, keep-alive stand-in for httplib2.Http, backed by one
+    requests.Session and its urllib3 connection pool.
+
+    Pass it to google_auth_httplib2.AuthorizedHttp and then to build(http=...)
+    so every Calendar and Sheets service in the process shares the same
+    sockets instead of opening one httplib2 connection per service. Responses
+    are requested gzip-compressed. Each request records a hit (reused socket)
+    or miss (new connection) for the 'http_connection' cache in the RunMetrics
+    bound to the calling thread.
+    """
+
+    def __init__(self, pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                 timeout=HTTP_TIMEOUT):
+        """
+        Args:
+            pool_connections (int): Hosts to keep a connection pool for
+            pool_maxsize (int): Idle connections kept per host
+            timeout (float): Seconds to wait for a connection or response
+        """
+        self.timeout = timeout
+        self.follow_redirects = True
+        self.redirect_codes = {300, 301, 302, 303, 307, 308}
+        self.connections = {}
+        self.session = requests.Session()
+        adapter = _PoolAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'connections_opened': 0}
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5,
+                connection_type=None, **kwargs):
+        """Sends a request; returns (httplib2.Response, content bytes) like httplib2.Http.request."""
+        headers = dict(headers or {})
+        headers.setdefault('accept-encoding', 'gzip, deflate')
+        # Google APIs only compress responses for user agents that mention gzip
+        user_agent = headers.get('user-agent', 'studio-calendar')
+        if 'gzip' not in user_agent:
+            headers['user-agent'] = f"{user_agent} (gzip)"
+
+        _opened.new_connection = False
+        try:
+            response = self.session.request(
+                method, uri, data=body, headers=headers, timeout=self.timeout,
+                allow_redirects=self.follow_redirects and redirections > 0
+            )
+        except requests.exceptions.Timeout as e:
+            raise socket.timeout(str(e)) from e
+        except requests.exceptions.ConnectionError as e:
+            raise ConnectionError(str(e)) from e
+
+        opened = _opened.new_connection
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['connections_opened'] += 1 if opened else 0
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.cache('http_connection', hit=not opened)
+
+        info = {key.lower(): value for key, value in response.headers.items()}
+        # requests has already decoded the body, as httplib2 would have
+        if 'content-encoding' in info:
+            info['-content-encoding'] = info.pop('content-encoding')
+        info['status'] = str(response.status_code)
+        info['reason'] = response.reason
+        return httplib2.Response(info), response.content
+
+    def add_certificate(self, key, cert, domain, password=None):
+        self.session.cert = (cert, key)
+
+    def close(self):
+        self.session.close()
+
+
+# Values never written to a cassette: OAuth tokens and secrets in JSON or
+# form bodies, watch channel tokens, and API keys or tokens in query strings.
+# Keys match exactly, so "pageToken" and "syncToken" are kept.
+_SECRET_FIELDS = r'access_token|refresh_token|id_token|client_secret|client_id|api_key|key|code|token'
+_SECRET_JSON = re.compile(r'("(?:%s)"\s*:\s*)"[^"]*"' % _SECRET_FIELDS)
+_SECRET_FORM = re.compile(r'(?<![\w-])((?:%s)=)[^&\s"]+' % _SECRET_FIELDS)
+# Request lines of the parts of a batch body, whose URIs carry query strings
+_REQUEST_LINE = re.compile(r'^((?:GET|POST|PUT|PATCH|DELETE) )(\S+)', re.M)
+# Hosts whose exchanges are credentials traffic, never recorded
+_AUTH_HOSTS = ('oauth2.googleapis.com', 'accounts.google.com')
+# Response headers kept in a cassette
+_KEPT_HEADERS = ('content-type', '-content-encoding')
+# Batch requests name their parts after a random ID, echoed in the response
+_BATCH_ID = re.compile(r'Content-ID: <([^+>]+)\+')
+
+CASSETTE_VERSION = 1
+
+
+def scrub(text, form=True):
+    """
+    Replaces tokens, keys and client secrets in a URI or body with REDACTED.
+    `form` also replaces key=value pairs; leave it off for JSON and other
+    text, where "code=4471" in an event description is data, not a secret.
+    """
+    if not text:
+        return text
+    text = _SECRET_JSON.sub(r'\1"REDACTED"', text)
+    return _SECRET_FORM.sub(r'\1REDACTED', text) if form else text
+
+def scrub_body(text, content_type=None):
+    """
+    Scrubs a request or response body by its content type: key=value pairs
+    only in form bodies and in the request lines of batch parts, secret
+    fields everywhere.
+    """
+    content_type = (content_type or '').lower()
+    if content_type.startswith('application/x-www-form-urlencoded'):
+        return scrub(text)
+    text = scrub(text, form=False)
+    if text and content_type.startswith('multipart/'):
+        text = _REQUEST_LINE.sub(lambda match: match.group(1) + scrub(match.group(2)), text)
+    return text
+
+def _content_type(headers):
+    """Returns the content-type of a request headers dict, whatever its case."""
+    return next((value for name, value in (headers or {}).items() if name.lower() == 'content-type'), None)
+
+def _request_key(method, uri):
+    """Scrubbed method and URI with the query parameters sorted, for matching."""
+    parts = urlsplit(scrub(uri))
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {urlunsplit(parts._replace(query=query))}"
+
+def _text(data):
+    """Returns a request or response body as text, or None."""
+    if data is None:
+        return None
+    if isinstance(data, bytes):
+        return data.decode('utf-8', errors='replace')
+    return str(data)
+
+class CassetteMiss(LookupError):
+    """Raised on replay when a request has no recorded exchange left."""
+
+
+class CassetteRecorder:
+    """
+    httplib2-compatible transport that sends through another transport
+    (SessionHttp by default) and appends every exchange to a cassette: one
+    gzip-compressed JSON line per request with the method, URI, request
+    body, status, content type, response body and response time.
+
+    Nothing secret is written: request headers (Authorization) are dropped,
+    OAuth token exchanges are not recorded at all, and tokens, keys and
+    client secrets in URIs and bodies are replaced (see scrub). Lines are
+    written as exchanges complete, so memory stays flat over long runs;
+    call close() to finish the file.
+    """
+
+    def __init__(self, path, http=None, meta=None):
+        """
+        Args:
+            path (str): Cassette file to write (conventionally .jsonl.gz)
+            http (optional): Transport that actually sends; a new SessionHttp if omitted
+            meta (dict, optional): Run details stored in the header line, e.g. date ranges
+        """
+        self.path = str(path)
+        self.http = http or SessionHttp()
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(self.path, 'wt', encoding='utf-8', compresslevel=9)
+        self._write({'cassette': CASSETTE_VERSION, 'meta': meta or {}})
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry, separators=(',', ':'), ensure_ascii=False))
+        self._file.write('\n')
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5,
+                connection_type=None, **kwargs):
+        """Sends the request through the wrapped transport and records the exchange."""
+        started = time.perf_counter()
+        resp, content = self.http.request(uri, method=method, body=body, headers=headers,
+                                          redirections=redirections, connection_type=connection_type, **kwargs)
+        elapsed = time.perf_counter() - started
+        if urlsplit(uri).hostname in _AUTH_HOSTS:
+            return resp, content
+        entry = {
+            'method': method.upper(),
+            'uri': _request_key(method, uri).split(' ', 1)[1],
+            'body': scrub_body(_text(body), _content_type(headers)),
+            'status': resp.status,
+            'headers': {name: resp[name] for name in _KEPT_HEADERS if name in resp},
+            'content': scrub_body(_text(content), resp.get('content-type')),
+            'elapsed': round(elapsed, 4),
+        }
+        with self._lock:
+            if self._file is not None:
+                self._write(entry)
+                self.recorded += 1
+        return resp, content
+
+    def close(self):
+        """Finishes the cassette file and closes the wrapped transport."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if hasattr(self.http, 'close'):
+            self.http.close()
+
+
+class CassettePlayer:
+    """
+    httplib2-compatible transport that answers from a recorded cassette
+    without touching the network, for offline benchmarks and tests.
+
+    Each request is matched on method and URI (query parameters in any
+    order) and, among those exchanges, on its body first, so repeated and
+    concurrent requests replay deterministically. Batch requests are matched
+    on their URI and their random part IDs rewritten to the new request's.
+    With timing 0 responses return at once; with timing 1.0 each one waits
+    its recorded response time (0.5 halves it), to reproduce the original
+    latency. Credentials aren't needed: `replaying` tells ServicePool to
+    build its services with anonymous credentials.
+    """
+
+    replaying = True
+
+    def __init__(self, path, timing=0.0, sleep=time.sleep):
+        """
+        Args:
+            path (str): Cassette written by CassetteRecorder
+            timing (float): Fraction of each recorded response time to wait
+            sleep (callable): Used to wait; replaced in tests
+
+        Raises:
+            ValueError: If the file is not a cassette
+        """
+        self.path = str(path)
+        self.timing = timing
+        self.sleep = sleep
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self._exchanges = {}
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline() or '{}')
+            if header.get('cassette') != CASSETTE_VERSION:
+                raise ValueError(f"{self.path} is not a version {CASSETTE_VERSION} cassette")
+            self.meta = header.get('meta', {})
+            for line in f:
+                entry = json.loads(line)
+                self._exchanges.setdefault(f"{entry['method']} {entry['uri']}", []).append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._exchanges.values())
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5,
+                connection_type=None, **kwargs):
+        """Returns the recorded (httplib2.Response, content) for the request."""
+        key = _request_key(method, uri)
+        body = scrub_body(_text(body), _content_type(headers))
+        with self._lock:
+            entries = self._exchanges.get(key)
+            if not entries:
+                raise CassetteMiss(f"No recorded response left for {key}")
+            entry = next((e for e in entries if e['body'] == body), entries[0])
+            entries.remove(entry)
+            self.replayed += 1
+        if self.timing:
+            self.sleep(entry['elapsed'] * self.timing)
+
+        content = entry['content'] or ''
+        new_id, old_id = _BATCH_ID.search(body or ''), _BATCH_ID.search(entry['body'] or '')
+        if new_id and old_id:
+            content = content.replace(old_id.group(1), new_id.group(1))
+        info = dict(entry['headers'], status=str(entry['status']))
+        return httplib2.Response(info), content.encode('utf-8')
+
+    def close(self):
+        pass
+
+def load_cassette_meta(path):
+    """Returns the meta dict stored in a cassette's header line."""
+    with gzip.open(str(path), 'rt', encoding='utf-8') as f:
+        return json.loads(f.readline() or '{}').get('meta', {})
+
+# Cassette transport shared by every ServicePool in the process
+_cassette = None
+_cassette_lock = threading.Lock()
+
+def default_transport(mode=API_CASSETTE_MODE, path=API_CASSETTE, timing=API_REPLAY_TIMING, meta=None):
+    """
+    Returns the transport for a new ServicePool: a fresh SessionHttp, or,
+    with mode 'record' or 'replay' and a cassette path, the process-wide
+    CassetteRecorder (closed at exit) or CassettePlayer.
+
+    Raises:
+        ValueError: If the mode is not '', 'record' or 'replay'
+    """
+    global _cassette
+    if not mode or not path:
+        return SessionHttp()
+    if mode not in ('record', 'replay'):
+        raise ValueError(f"Unknown cassette mode {mode!r}; use 'record' or 'replay'")
+    with _cassette_lock:
+        if _cassette is None:
+            if mode == 'record':
+                _cassette = CassetteRecorder(path, meta=meta)
+                atexit.register(_cassette.close)
+            else:
+                _cassette = CassettePlayer(path, timing)
+        return _cassette
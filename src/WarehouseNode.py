@@ -0,0 +1,305 @@
+import argparse
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+from pathlib import Path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+from config.settings import WAREHOUSE_FILE
+from src.AvailabilityNode import parse_event_time
+from src.ExportNode import NUMERIC_COLUMNS, column_name, to_number
+from src.FormatterNode import FormatterNode
+
+
+# Raw event fields stored alongside the formatted row
+EVENT_COLUMNS = ["start", "end", "summary", "description"]
+
+# Formatted columns that can be grouped on by `SessionWarehouse.totals`
+GROUP_COLUMNS = {
+    "artist": "artist_name",
+    "engineer": "engineer_name",
+    "studio": "studio",
+    "month": "substr(date, 1, 7)",
+    "date": "date",
+}
+
+
+class SessionWarehouse:
+    """
+    Persistent local store of fetched and formatted calendar events.
+    Events are keyed by (calendar_id, event_id) and upserted on every run, with
+    secondary indexes on date, studio, engineer and artist so that queries are
+    answered locally without touching the Google APIs. A run that fetched a
+    whole window also deletes the stored sessions of that window it no longer
+    returned, so deleted and cancelled sessions stop counting in `totals`.
+    """
+
+    def __init__(self, path=WAREHOUSE_FILE):
+        self.path = str(path)
+        self.template = FormatterNode().template
+        self.row_columns = [column_name(h) for h in self.template]
+        self._numeric = [h in NUMERIC_COLUMNS for h in self.template]
+        # Concurrent pipeline runs share the file; wait for each other's writes
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        row_defs = ", ".join(
+            f"{name} {'REAL' if numeric else 'TEXT COLLATE NOCASE'}"
+            for name, numeric in zip(self.row_columns, self._numeric)
+        )
+        event_defs = ", ".join(f'"{name}" TEXT' for name in EVENT_COLUMNS)
+        with self.conn:
+            self.conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS sessions (
+                    calendar_id TEXT NOT NULL,
+                    event_id TEXT NOT NULL,
+                    {event_defs},
+                    {row_defs},
+                    updated_at TEXT,
+                    PRIMARY KEY (calendar_id, event_id)
+                )"""
+            )
+            for name in ("date", "studio", "engineer_name", "artist_name"):
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_sessions_{name} ON sessions ({name})")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @staticmethod
+    def event_key(event):
+        """Returns the (calendar_id, event_id) key; events without an ID fall back to start and summary."""
+        calendar_id = event.get("calendar") or "primary"
+        event_id = event.get("id") or f"{event.get('start', '')}|{event.get('summary', '')}"
+        return calendar_id, event_id
+
+    def upsert_formatted(self, pairs, window_start=None, window_end=None, calendars=None):
+        """
+        Inserts or updates events together with their formatted rows. Given
+        the window the pairs are a full fetch of, stored sessions of the
+        fetched calendars in that window that are not among them are deleted
+        in the same transaction (see forget_missing).
+
+        Args:
+            pairs (iterable): (event dict, formatted row) pairs, as produced by
+                FormatterNode.iter_event_rows
+            window_start, window_end (datetime, optional): The fetched window
+            calendars (iterable, optional): Calendars fetched; all if omitted
+
+        Returns:
+            int: Number of events upserted
+        """
+        columns = ["calendar_id", "event_id"] + [f'"{c}"' for c in EVENT_COLUMNS] + self.row_columns + ["updated_at"]
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns[2:])
+        sql = (
+            f"INSERT INTO sessions ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT(calendar_id, event_id) DO UPDATE SET {updates}"
+        )
+        now = datetime.now().isoformat(timespec="seconds")
+
+        values = []
+        for event, row in pairs:
+            cells = [to_number(v) if numeric else v for v, numeric in zip(row, self._numeric)]
+            values.append(
+                list(self.event_key(event))
+                + [event.get(c, "") for c in EVENT_COLUMNS]
+                + cells
+                + [now]
+            )
+
+        with self.conn:
+            self.conn.executemany(sql, values)
+            removed = 0
+            if window_start is not None and window_end is not None:
+                keys = {(row[0], row[1]) for row in values}
+                removed = self._delete_missing(keys, window_start, window_end, calendars)
+        print(f"Upserted {len(values)} events into {self.path}" + (f", removed {removed}" if removed else ""))
+        return len(values)
+
+    def forget_missing(self, keys, window_start, window_end, calendars=None):
+        """
+        Deletes stored sessions of `calendars` overlapping the window whose
+        (calendar_id, event_id) keys are not in `keys`, the events a refetch
+        of the window returned: sessions deleted or cancelled in the calendar,
+        or moved out of the window.
+
+        Returns:
+            int: Number of sessions deleted
+        """
+        with self.conn:
+            return self._delete_missing(keys, window_start, window_end, calendars)
+
+    def _delete_missing(self, keys, window_start, window_end, calendars):
+        calendars = set(calendars) if calendars is not None else None
+        # The date column narrows the scan; the overlap test is the API's timeMin/timeMax one
+        cursor = self.conn.execute(
+            "SELECT calendar_id, event_id, start, \"end\" FROM sessions WHERE date BETWEEN ? AND ?",
+            ((window_start - timedelta(days=1)).strftime("%Y-%m-%d"),
+             (window_end + timedelta(days=1)).strftime("%Y-%m-%d")),
+        )
+        missing = []
+        for calendar_id, event_id, start, end in cursor.fetchall():
+            if (calendar_id, event_id) in keys or (calendars is not None and calendar_id not in calendars):
+                continue
+            start = parse_event_time(start)
+            end = parse_event_time(end) or start
+            if start is not None and start < window_end and (end > window_start or start == window_start):
+                missing.append((calendar_id, event_id))
+        self.conn.executemany("DELETE FROM sessions WHERE calendar_id = ? AND event_id = ?", missing)
+        return len(missing)
+
+    def upsert_events(self, events, formatter=None):
+        """
+        Formats and upserts raw CalendarNode events.
+
+        Args:
+            events (list): Event dictionaries from CalendarNode.get_calendar_data
+            formatter (FormatterNode, optional): Formatter to use
+
+        Returns:
+            int: Number of events upserted
+        """
+        formatter = formatter or FormatterNode()
+        return self.upsert_formatted(formatter.iter_event_rows(events))
+
+    def query_sessions(self, start_date=None, end_date=None, studio=None, engineer=None, artist=None):
+        """
+        Returns stored sessions matching every given filter, ordered by date and start time.
+
+        Args:
+            start_date (str, optional): Inclusive lower bound, YYYY-MM-DD
+            end_date (str, optional): Inclusive upper bound, YYYY-MM-DD
+            studio (str, optional): Studio name (case-insensitive)
+            engineer (str, optional): Engineer name (case-insensitive)
+            artist (str, optional): Artist name (case-insensitive)
+
+        Returns:
+            list: One dict per session
+        """
+        where, params = self._where(start_date, end_date, studio, engineer, artist)
+        cursor = self.conn.execute(
+            f"SELECT * FROM sessions{where} ORDER BY date, start_time", params
+        )
+        return [dict(row) for row in cursor]
+
+    def iter_events(self):
+        """Yields the stored events in CalendarNode.get_calendar_data form, e.g. to seed a search index."""
+        columns = ", ".join(f'"{c}"' for c in EVENT_COLUMNS)
+        cursor = self.conn.execute(f"SELECT calendar_id, event_id, {columns} FROM sessions")
+        for row in cursor:
+            event = {c: row[c] or '' for c in EVENT_COLUMNS}
+            event['id'] = row['event_id']
+            event['calendar'] = row['calendar_id']
+            yield event
+
+    def totals(self, group_by, start_date=None, end_date=None, studio=None, engineer=None, artist=None):
+        """
+        Returns session count, hours, revenue and payouts per group.
+
+        Args:
+            group_by (str): One of 'artist', 'engineer', 'studio', 'month' or 'date'
+            start_date, end_date, studio, engineer, artist: Filters as in `query_sessions`
+
+        Returns:
+            list: One dict per group, highest revenue first
+        """
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"group_by must be one of: {', '.join(sorted(GROUP_COLUMNS))}")
+        where, params = self._where(start_date, end_date, studio, engineer, artist)
+        cursor = self.conn.execute(
+            f"""SELECT {GROUP_COLUMNS[group_by]} AS "group",
+                       COUNT(*) AS sessions,
+                       ROUND(TOTAL(hours), 2) AS hours,
+                       TOTAL(price) AS revenue,
+                       TOTAL(engineer_payment) AS engineer_payout,
+                       TOTAL(referral_payment) AS referral_payout
+                FROM sessions{where}
+                GROUP BY 1
+                ORDER BY revenue DESC""",
+            params,
+        )
+        return [dict(row) for row in cursor]
+
+    @staticmethod
+    def _where(start_date, end_date, studio, engineer, artist):
+        clauses, params = [], []
+        if start_date:
+            clauses.append("date >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("date <= ?")
+            params.append(end_date)
+        for column, value in (("studio", studio), ("engineer_name", engineer), ("artist_name", artist)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+def period_bounds(year=None, quarter=None, month=None):
+    """
+    Converts a year, quarter (1-4) or month (YYYY-MM) into inclusive YYYY-MM-DD bounds.
+
+    Returns:
+        tuple: (start_date, end_date), or (None, None) when nothing is given
+    """
+    if month:
+        parsed = datetime.strptime(month, "%Y-%m")
+        year, first, last = parsed.year, parsed.month, parsed.month
+    elif year and quarter:
+        first, last = 3 * (quarter - 1) + 1, 3 * quarter
+    elif year:
+        first, last = 1, 12
+    else:
+        return None, None
+    return f"{year:04d}-{first:02d}-01", f"{year:04d}-{last:02d}-31"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the local session warehouse.")
+    parser.add_argument("command", choices=["sessions", "totals"])
+    parser.add_argument("--group-by", choices=sorted(GROUP_COLUMNS), default="artist")
+    parser.add_argument("--start", help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="End date (YYYY-MM-DD)")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--quarter", type=int, choices=[1, 2, 3, 4])
+    parser.add_argument("--month", help="Month (YYYY-MM)")
+    parser.add_argument("--studio")
+    parser.add_argument("--engineer")
+    parser.add_argument("--artist")
+    parser.add_argument("--db", default=WAREHOUSE_FILE)
+    args = parser.parse_args(argv)
+
+    if args.quarter and not args.year:
+        parser.error("--quarter requires --year")
+    start_date, end_date = period_bounds(args.year, args.quarter, args.month)
+    start_date = args.start or start_date
+    end_date = args.end or end_date
+    filters = dict(start_date=start_date, end_date=end_date,
+                   studio=args.studio, engineer=args.engineer, artist=args.artist)
+
+    with SessionWarehouse(args.db) as warehouse:
+        if args.command == "sessions":
+            for session in warehouse.query_sessions(**filters):
+                print(f"{session['date']} {session['start_time']}-{session['end_time']}  "
+                      f"{session['studio']}  {session['artist_name']}  "
+                      f"{session['engineer_name']}  {session['price'] if session['price'] is not None else ''}")
+        else:
+            for group in warehouse.totals(args.group_by, **filters):
+                print(f"{group['group']}: {group['sessions']} sessions, {group['hours']} hours, "
+                      f"revenue {group['revenue']:.2f}, engineer payout {group['engineer_payout']:.2f}, "
+                      f"referral payout {group['referral_payout']:.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import unittest
+import os
+import sys
+from datetime import datetime, timedelta
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from AvailabilityNode import StudioAvailability
+
+
+def event(start, end, calendar="primary", event_id=None):
+    return {'id': event_id or start, 'calendar': calendar, 'start': start, 'end': end}
+
+
+class TestAvailabilityNode(unittest.TestCase):
+    def setUp(self):
+        self.index = StudioAvailability()
+        self.index.update([
+            event('2025-04-07T12:00:00-04:00', '2025-04-07T14:00:00-04:00'),
+            event('2025-04-07T13:00:00-04:00', '2025-04-07T15:00:00-04:00'),
+            event('2025-04-07T15:00:00-04:00', '2025-04-07T16:00:00-04:00'),
+            event('2025-04-07T19:00:00-04:00', '2025-04-07T21:00:00-04:00'),
+        ])
+
+    def test_overlapping_blocks_are_merged(self):
+        """Test that overlapping and touching events collapse into one busy block."""
+        self.assertEqual(self.index.busy_blocks("Studio A"), [
+            (datetime(2025, 4, 7, 12), datetime(2025, 4, 7, 16)),
+            (datetime(2025, 4, 7, 19), datetime(2025, 4, 7, 21)),
+        ])
+
+    def test_block_spanning_existing_blocks(self):
+        """Test that an event covering several blocks replaces them."""
+        self.index.update([event('2025-04-07T11:00:00', '2025-04-07T20:00:00')])
+        self.assertEqual(self.index.busy_blocks("Studio A"), [
+            (datetime(2025, 4, 7, 11), datetime(2025, 4, 7, 21)),
+        ])
+
+    def test_duplicate_events_are_skipped(self):
+        """Test that re-fetching the same events does not add them twice."""
+        added = self.index.update([event('2025-04-07T12:00:00-04:00', '2025-04-07T14:00:00-04:00')])
+        self.assertEqual(added, 0)
+
+    def test_free_slots_within_opening_hours(self):
+        """Test that free slots respect busy blocks and opening hours."""
+        slots = self.index.free_slots(
+            "Studio A", timedelta(hours=2),
+            datetime(2025, 4, 7), datetime(2025, 4, 8),
+            open_hour=10, close_hour=22,
+        )
+        self.assertEqual(slots, [
+            (datetime(2025, 4, 7, 10), datetime(2025, 4, 7, 12)),
+            (datetime(2025, 4, 7, 16), datetime(2025, 4, 7, 19)),
+        ])
+
+    def test_first_free_slot_next_day(self):
+        """Test that a slot too long for the gaps is found on the following day."""
+        slot = self.index.first_free_slot(
+            "Studio A", timedelta(hours=4),
+            datetime(2025, 4, 7), datetime(2025, 4, 9),
+            open_hour=10, close_hour=22,
+        )
+        self.assertEqual(slot, (datetime(2025, 4, 8, 10), datetime(2025, 4, 8, 22)))
+
+    def test_is_free(self):
+        """Test point availability checks."""
+        self.assertFalse(self.index.is_free("Studio A", datetime(2025, 4, 7, 15), datetime(2025, 4, 7, 17)))
+        self.assertTrue(self.index.is_free("Studio A", datetime(2025, 4, 7, 16), datetime(2025, 4, 7, 19)))
+        self.assertTrue(self.index.is_free("Studio B", datetime(2025, 4, 7, 12), datetime(2025, 4, 7, 13)))
+
+
+    def test_moved_event_frees_its_old_slot(self):
+        """Test that an event fetched again at another time no longer blocks its old slot."""
+        self.index.update([event('2025-04-08T12:00:00', '2025-04-08T14:00:00', event_id='moving')])
+        self.assertFalse(self.index.is_free("Studio A", datetime(2025, 4, 8, 12), datetime(2025, 4, 8, 13)))
+        self.assertEqual(self.index.update([event('2025-04-09T12:00:00', '2025-04-09T14:00:00', event_id='moving')]), 1)
+        self.assertTrue(self.index.is_free("Studio A", datetime(2025, 4, 8, 12), datetime(2025, 4, 8, 13)))
+        self.assertFalse(self.index.is_free("Studio A", datetime(2025, 4, 9, 12), datetime(2025, 4, 9, 13)))
+        # Merged blocks are rebuilt from the remaining events
+        self.index.update([event('2025-04-07T13:00:00-04:00', '2025-04-07T13:30:00-04:00',
+                                 event_id='2025-04-07T13:00:00-04:00')])
+        self.assertEqual(self.index.busy_blocks("Studio A")[:2], [
+            (datetime(2025, 4, 7, 12), datetime(2025, 4, 7, 14)),
+            (datetime(2025, 4, 7, 15), datetime(2025, 4, 7, 16)),
+        ])
+
+    def test_refetched_window_drops_cancelled_events(self):
+        """Test that events missing from a refetched window are removed, only for the calendars fetched."""
+        self.index.update([event('2025-04-08T12:00:00', '2025-04-08T14:00:00', calendar='second', event_id='b')])
+        kept = [event('2025-04-07T12:00:00-04:00', '2025-04-07T14:00:00-04:00')]
+        changed = self.index.replace_window(kept, datetime(2025, 4, 7), datetime(2025, 4, 7, 23, 59, 59),
+                                            calendars=['primary'])
+        self.assertEqual(changed, 3)
+        self.assertEqual(self.index.busy_blocks("Studio A"), [(datetime(2025, 4, 7, 12), datetime(2025, 4, 7, 14))])
+        self.assertEqual(len(self.index.busy_blocks("second")), 1)
+        self.assertEqual(self.index.replace_window(kept, datetime(2025, 4, 7), datetime(2025, 4, 9)), 1)
+        self.assertEqual(self.index.studios(), ["Studio A"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import unittest
+import json
+import os
+import sys
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from BatchNode import BatchFetchError, run_batch, fetch_event_lists, ensure_sheets
+from src.RecurrenceNode import _cache as recurrence_cache
+
+
+def http_error(status, reason=None):
+    content = {'error': {'message': 'failed', 'errors': [{'reason': reason}] if reason else []}}
+    return HttpError(httplib2.Response({'status': status}), json.dumps(content).encode())
+
+
+class FakeRequest:
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+
+
+class FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batches.append(len(self.requests))
+        for request_id, request in self.requests:
+            self.callback(request_id, request.response, request.error)
+
+
+class FakeService:
+    """Serves events().list pages and spreadsheet metadata through fake batch requests."""
+
+    def __init__(self, pages=None, sheets=None, failures=None, exceptions=None):
+        self.pages = pages or {}
+        # iCalUID -> every exception of the series
+        self.exceptions = exceptions or {}
+        self.lookups = []
+        self.sheets = sheets or {}
+        # (calendarId, page index) -> errors returned before that page, in order
+        self.failures = failures or {}
+        self.batches = []
+        self.added = {}
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def events(self):
+        return self
+
+    def spreadsheets(self):
+        return self
+
+    def list(self, calendarId, pageToken=None, **kwargs):
+        if 'iCalUID' in kwargs:
+            self.lookups.append(kwargs['iCalUID'])
+            return FakeRequest({'items': self.exceptions.get(kwargs['iCalUID'], [])})
+        if calendarId == 'broken':
+            return FakeRequest(error=http_error(403, 'forbidden'))
+        index = int(pageToken or 0)
+        if self.failures.get((calendarId, index)):
+            return FakeRequest(error=self.failures[(calendarId, index)].pop(0))
+        pages = self.pages[calendarId]
+        response = {'items': pages[index]}
+        if index + 1 < len(pages):
+            response['nextPageToken'] = str(index + 1)
+        return FakeRequest(response)
+
+    def get(self, spreadsheetId, fields=None):
+        return FakeRequest({'sheets': [{'properties': {'title': t}} for t in self.sheets[spreadsheetId]]})
+
+    def batchUpdate(self, spreadsheetId, body):
+        titles = [r['addSheet']['properties']['title'] for r in body['requests']]
+        self.added[spreadsheetId] = titles
+        return FakeRequest({'replies': titles})
+
+
+class TestBatchNode(unittest.TestCase):
+    def test_run_batch_respects_limit(self):
+        """Test that requests are split into batches of at most `limit`."""
+        service = FakeService()
+        requests = {n: FakeRequest({'n': n}) for n in range(7)}
+        responses, errors, round_trips = run_batch(service, requests, limit=3)
+        self.assertEqual(round_trips, 3)
+        self.assertEqual(service.batches, [3, 3, 1])
+        self.assertEqual(responses[6], {'n': 6})
+        self.assertEqual(errors, {})
+
+    def test_paging_continues_across_rounds(self):
+        """Test that queries with more pages are batched again until exhausted."""
+        service = FakeService(pages={
+            'a': [[{'id': 'a1'}], [{'id': 'a2'}], [{'id': 'a3'}]],
+            'b': [[{'id': 'b1'}, {'id': 'b2'}]],
+        })
+        queries = {
+            ('jan', 'a'): ('a', 'min', 'max'),
+            ('jan', 'b'): ('b', 'min', 'max'),
+        }
+        items, stats = fetch_event_lists(service, queries, limit=50)
+
+        self.assertEqual([e['id'] for e in items[('jan', 'a')]], ['a1', 'a2', 'a3'])
+        self.assertEqual([e['id'] for e in items[('jan', 'b')]], ['b1', 'b2'])
+        self.assertEqual(stats, {'rounds': 3, 'round_trips': 3, 'requests': 4, 'retries': 0})
+        self.assertEqual(service.batches, [2, 1, 1])
+
+    def test_retryable_parts_are_batched_again(self):
+        """Test that rate-limited and 5xx parts are retried with backoff, on the page that failed."""
+        waits = []
+        service = FakeService(
+            pages={'a': [[{'id': 'a1'}], [{'id': 'a2'}]], 'b': [[{'id': 'b1'}]]},
+            failures={('a', 1): [http_error(403, 'rateLimitExceeded'), http_error(503)], ('b', 0): [http_error(429)]},
+        )
+        queries = {'a': ('a', 'min', 'max'), 'b': ('b', 'min', 'max')}
+        items, stats = fetch_event_lists(service, queries, sleep=waits.append)
+
+        self.assertEqual([e['id'] for e in items['a']], ['a1', 'a2'])
+        self.assertEqual([e['id'] for e in items['b']], ['b1'])
+        self.assertEqual(stats['retries'], 3)
+        self.assertEqual(waits, [1, 1, 2])
+
+    def test_failed_queries_raise_after_the_rest_complete(self):
+        """Test that a query failing for good raises instead of yielding no events."""
+        service = FakeService(pages={'a': [[{'id': 'a1'}]]}, failures={('c', 0): [http_error(500)] * 4})
+        queries = {'a': ('a', 'min', 'max'), 'x': ('broken', 'min', 'max'), 'c': ('c', 'min', 'max')}
+        with self.assertRaises(BatchFetchError) as raised:
+            fetch_event_lists(service, queries, max_retries=3, sleep=lambda seconds: None)
+        self.assertEqual(set(raised.exception.errors), {'x', 'c'})
+        self.assertEqual(raised.exception.items, {'a': [{'id': 'a1'}]})
+        self.assertEqual(raised.exception.stats['retries'], 3)
+
+    def test_series_exceptions_are_batched_and_cached(self):
+        """Test that series exceptions are looked up in one batch per fetch, and not again while unchanged."""
+        recurrence_cache.clear()
+        self.addCleanup(recurrence_cache.clear)
+        series = {
+            'id': 'weekly', 'iCalUID': 'weekly@google.com', 'updated': '2024-11-01T00:00:00Z',
+            'start': {'dateTime': '2024-12-02T14:00:00Z'}, 'end': {'dateTime': '2024-12-02T15:00:00Z'},
+            'recurrence': ['RRULE:FREQ=WEEKLY;BYDAY=MO'],
+        }
+        # The Dec 30 session moved to Jan 2, outside the December window
+        moved = {'recurringEventId': 'weekly', 'originalStartTime': {'dateTime': '2024-12-30T14:00:00Z'}}
+        service = FakeService(pages={'a': [[series]], 'b': [[dict(series, id='other', iCalUID='other@google.com')]]},
+                              exceptions={'weekly@google.com': [series, moved]})
+        queries = {
+            ('dec', 'a'): ('a', '2024-12-01T00:00:00Z', '2024-12-31T23:59:59Z'),
+            ('late-dec', 'a'): ('a', '2024-12-20T00:00:00Z', '2024-12-31T23:59:59Z'),
+            ('dec', 'b'): ('b', '2024-12-01T00:00:00Z', '2024-12-31T23:59:59Z'),
+        }
+        items, stats = fetch_event_lists(service, queries, local_recurrence=True)
+
+        self.assertEqual([e['start']['dateTime'][:10] for e in items[('dec', 'a')]],
+                         ['2024-12-02', '2024-12-09', '2024-12-16', '2024-12-23'])
+        self.assertEqual(len(items[('dec', 'b')]), 5)
+        # One batch for the listings and one for both series' lookups
+        self.assertEqual(service.batches, [3, 2])
+        self.assertEqual(stats['series_lookups'], 2)
+
+        fetch_event_lists(service, queries, local_recurrence=True)
+        self.assertEqual(sorted(service.lookups), ['other@google.com', 'weekly@google.com'])
+
+    def test_ensure_sheets_batches_lookups_and_creates(self):
+        """Test that missing sheets are created per spreadsheet in one batched round."""
+        service = FakeService(sheets={'s1': ['Jan'], 's2': []})
+        ready, round_trips = ensure_sheets(service, {'s1': ['Jan', 'Jan_summary'], 's2': ['Jan', 'Jan']})
+
+        self.assertEqual(round_trips, 2)
+        self.assertEqual(service.added, {'s1': ['Jan_summary'], 's2': ['Jan']})
+        self.assertEqual(ready, {('s1', 'Jan'), ('s1', 'Jan_summary'), ('s2', 'Jan')})
+
+
+if __name__ == '__main__':
+    unittest.main()
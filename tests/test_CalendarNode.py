@@ -9,8 +9,14 @@ from CalendarNode import (
     format_dates_for_api,
     fetch_events_from_service,
     format_events,
-    get_calendar_data
+    get_calendar_data,
+    iter_event_pages,
+    event_fields_mask,
+    list_event_changes,
+    SyncTokenExpired
 )
+import httplib2
+from googleapiclient.errors import HttpError
 
 class TestCalendarNode(unittest.TestCase):
 
@@ -159,6 +165,82 @@ class TestCalendarNode(unittest.TestCase):
         events = get_calendar_data('2024-12-01', '2024-12-31')
         self.assertEqual(events, [])
 
+    def test_lean_fetch_requests_only_formatter_fields(self):
+        """
+        Test that the lean mask covers the fields the formatter reads and is sent with every page request.
+        """
+        mask = event_fields_mask()
+        self.assertEqual(mask, "nextPageToken,items(id,start,end,summary,description)")
+
+        mock_service = MagicMock()
+        mock_service.events().list().execute.return_value = {'items': [{'id': '1'}]}
+        pages = list(iter_event_pages(mock_service, 'primary', 'min', 'max', fields=mask))
+        self.assertEqual(pages, [[{'id': '1'}]])
+        self.assertEqual(mock_service.events().list.call_args.kwargs['fields'], mask)
+
+    def test_local_recurrence_lists_series_once(self):
+        """
+        Test that local recurrence lists without singleEvents/orderBy and expands the series itself.
+        """
+        mock_service = MagicMock()
+        mock_service.events().list().execute.return_value = {'items': [{
+            'id': 'weekly', 'summary': 'Rehearsal',
+            'start': {'dateTime': '2024-12-02T14:00:00-05:00'}, 'end': {'dateTime': '2024-12-02T15:00:00-05:00'},
+            'recurrence': ['RRULE:FREQ=WEEKLY;BYDAY=MO'],
+        }]}
+        events = fetch_events_from_service(mock_service, 'primary', '2024-12-01T00:00:00Z',
+                                           '2024-12-31T23:59:59Z', local_recurrence=True)
+        self.assertEqual(len(events), 5)
+        kwargs = mock_service.events().list.call_args.kwargs
+        self.assertFalse(kwargs['singleEvents'])
+        self.assertNotIn('orderBy', kwargs)
+
+    def test_local_recurrence_drops_instances_moved_out_of_range(self):
+        """
+        Test that a series' exceptions are looked up by iCalUID without time bounds.
+        """
+        series = {
+            'id': 'weekly', 'iCalUID': 'weekly@google.com', 'summary': 'Rehearsal',
+            'start': {'dateTime': '2024-12-02T14:00:00-05:00'}, 'end': {'dateTime': '2024-12-02T15:00:00-05:00'},
+            'recurrence': ['RRULE:FREQ=WEEKLY;BYDAY=MO'],
+        }
+        # Dec 30 moved to Jan 2
+        moved = {'recurringEventId': 'weekly', 'originalStartTime': {'dateTime': '2024-12-30T14:00:00-05:00'}}
+        calls = []
+
+        def list_events(**kwargs):
+            calls.append(kwargs)
+            request = MagicMock()
+            request.execute.return_value = {'items': [series, moved] if 'iCalUID' in kwargs else [series]}
+            return request
+
+        mock_service = MagicMock()
+        mock_service.events().list.side_effect = list_events
+        events = fetch_events_from_service(mock_service, 'primary', '2024-12-01T00:00:00Z',
+                                           '2024-12-31T23:59:59Z', local_recurrence=True)
+        self.assertEqual([e['start']['dateTime'][:10] for e in events],
+                         ['2024-12-02', '2024-12-09', '2024-12-16', '2024-12-23'])
+        lookup = calls[-1]
+        self.assertEqual(lookup['iCalUID'], 'weekly@google.com')
+        self.assertNotIn('timeMin', lookup)
+
+    def test_list_event_changes_follows_sync_token(self):
+        """
+        Test that changes are listed with the sync token alone and an expired token is reported.
+        """
+        mock_service = MagicMock()
+        mock_service.events().list().execute.return_value = {
+            'items': [{'id': '1', 'status': 'cancelled'}], 'nextSyncToken': 'next'}
+        events, token = list_event_changes(mock_service, 'primary', 'previous')
+        self.assertEqual((events, token), ([{'id': '1', 'status': 'cancelled'}], 'next'))
+        kwargs = mock_service.events().list.call_args.kwargs
+        self.assertEqual(kwargs['syncToken'], 'previous')
+        self.assertNotIn('timeMin', kwargs)
+
+        mock_service.events().list().execute.side_effect = HttpError(httplib2.Response({'status': 410}), b'Gone')
+        with self.assertRaises(SyncTokenExpired):
+            list_event_changes(mock_service, 'primary', 'previous')
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,144 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from Controller import PipelineCancelled, PipelineWorker, seed_search_index
+from SearchNode import EventSearchIndex
+from WarehouseNode import SessionWarehouse
+
+
+def wait_for(worker, kind, job_id, timeout=5):
+    """Polls the worker until a message of `kind` arrives for `job_id`; returns all messages seen."""
+    seen = []
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        seen.extend(worker.poll())
+        if any(k == kind and j == job_id for k, j, _ in seen):
+            return seen
+        time.sleep(0.01)
+    raise AssertionError(f"No '{kind}' message for job {job_id}; got {seen}")
+
+
+class TestController(unittest.TestCase):
+    def test_jobs_run_in_order_with_progress(self):
+        """Test that queued ranges run one after another and report each stage."""
+        calls = []
+
+        def pipeline(start_date, end_date, progress=None, cancel_event=None):
+            calls.append((start_date, end_date))
+            progress('fetched', 3)
+            progress('formatted', 3)
+            progress('written', 39)
+            return {'sheet': start_date, 'rows': 3}
+
+        worker = PipelineWorker(pipeline=pipeline)
+        try:
+            first = worker.submit('2025-01-01', '2025-01-31')
+            second = worker.submit('2025-02-01')
+            messages = wait_for(worker, 'done', second)
+        finally:
+            worker.stop()
+
+        self.assertEqual(calls, [('2025-01-01', '2025-01-31'), ('2025-02-01', None)])
+        progress = [payload for kind, job, payload in messages if kind == 'progress' and job == first]
+        self.assertEqual(progress, [('fetched', 3), ('formatted', 3), ('written', 39)])
+        self.assertIn(('done', first, {'sheet': '2025-01-01', 'rows': 3}), messages)
+
+    def test_cancel_running_job(self):
+        """Test that cancelling stops the running job at its next checkpoint."""
+        started = threading.Event()
+
+        def pipeline(start_date, end_date, progress=None, cancel_event=None):
+            started.set()
+            cancel_event.wait(5)
+            if cancel_event.is_set():
+                raise PipelineCancelled()
+            return {}
+
+        worker = PipelineWorker(pipeline=pipeline)
+        try:
+            job = worker.submit('2025-01-01')
+            started.wait(5)
+            worker.cancel()
+            wait_for(worker, 'cancelled', job)
+        finally:
+            worker.stop()
+
+    def test_cancel_queued_job(self):
+        """Test that a queued job can be cancelled before it starts."""
+        release = threading.Event()
+        calls = []
+
+        def pipeline(start_date, end_date, progress=None, cancel_event=None):
+            calls.append(start_date)
+            release.wait(5)
+            return {}
+
+        worker = PipelineWorker(pipeline=pipeline)
+        try:
+            first = worker.submit('2025-01-01')
+            second = worker.submit('2025-02-01')
+            worker.cancel(second)
+            release.set()
+            wait_for(worker, 'cancelled', second)
+        finally:
+            worker.stop()
+
+        self.assertEqual(calls, ['2025-01-01'])
+
+    def test_failures_are_reported(self):
+        """Test that pipeline errors are posted instead of killing the worker."""
+        def pipeline(start_date, end_date, progress=None, cancel_event=None):
+            raise ValueError("bad range")
+
+        worker = PipelineWorker(pipeline=pipeline)
+        try:
+            job = worker.submit('2025-01-01')
+            messages = wait_for(worker, 'failed', job)
+        finally:
+            worker.stop()
+
+        errors = [payload for kind, _, payload in messages if kind == 'failed']
+        self.assertEqual(str(errors[0]), "bad range")
+
+
+    def test_search_index_is_seeded_on_the_worker(self):
+        """Test that the warehouse is indexed by a worker job, on the worker thread."""
+        threads = []
+        index = EventSearchIndex()
+        original_update = index.update
+
+        def update(events):
+            threads.append(threading.current_thread().name)
+            return original_update(events)
+        index.update = update
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sessions.db')
+            with SessionWarehouse(path) as warehouse:
+                warehouse.upsert_events([{'id': '9', 'calendar': 'primary', 'start': '2024-12-05T12:00:00',
+                                          'end': '2024-12-05T14:00:00', 'summary': 'Session w/ Kaytranada',
+                                          'description': ''}])
+            worker = PipelineWorker(search_index=index)
+            try:
+                with patch('Controller.SessionWarehouse', lambda: SessionWarehouse(path)):
+                    job = worker.submit(None, None, pipeline=seed_search_index)
+                    messages = wait_for(worker, 'done', job)
+            finally:
+                worker.stop()
+
+        done = [payload for kind, _, payload in messages if kind == 'done']
+        self.assertEqual(done[0], {'seeded': 1, 'sessions': 1})
+        self.assertEqual(threads, ['PipelineWorker'])
+        self.assertEqual([e['id'] for e in index.search_artist('kaytra')], ['9'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from DaemonNode import SyncDaemon, send_test_notification
+from src.CalendarNode import SyncTokenExpired
+
+
+class TestDaemonNode(unittest.TestCase):
+    def start_daemon(self, **kwargs):
+        self.syncs = []
+        self.synced = threading.Event()
+
+        def sync(start_date, end_date):
+            self.syncs.append((start_date, end_date))
+            self.synced.set()
+            return {'rows': 0}
+
+        options = dict(sync=sync, interval=3600, debounce=0.2, host='127.0.0.1', port=0,
+                       channel_token='', sync_range=lambda: ('2025-04-01', None))
+        options.update(kwargs)
+        daemon = SyncDaemon(**options).start()
+        self.addCleanup(daemon.stop)
+        return daemon
+
+    def test_burst_of_notifications_is_debounced(self):
+        """Test that a burst of push notifications results in a single sync."""
+        daemon = self.start_daemon()
+        url = f"{daemon.address}/notifications"
+        for _ in range(5):
+            self.assertEqual(send_test_notification(url, token=''), 200)
+
+        self.assertTrue(self.synced.wait(5))
+        time.sleep(0.5)
+        self.assertEqual(self.syncs, [('2025-04-01', None)])
+        self.assertEqual(daemon.status['notifications'], 5)
+
+    def test_sync_handshake_does_not_trigger(self):
+        """Test that the channel 'sync' handshake is acknowledged without syncing."""
+        daemon = self.start_daemon()
+        self.assertEqual(send_test_notification(f"{daemon.address}/notifications", state='sync', token=''), 200)
+        self.assertFalse(self.synced.wait(0.5))
+
+    def test_channel_token_is_checked(self):
+        """Test that notifications with the wrong channel token are rejected."""
+        daemon = self.start_daemon(channel_token='secret')
+        url = f"{daemon.address}/notifications"
+        self.assertEqual(send_test_notification(url, token='wrong'), 403)
+        self.assertEqual(send_test_notification(url, token='secret'), 200)
+        self.assertTrue(self.synced.wait(5))
+
+    def test_scheduled_sync_and_health(self):
+        """Test that syncs run on schedule and are reported by the health endpoint."""
+        daemon = self.start_daemon(interval=0.1)
+        self.assertTrue(self.synced.wait(5))
+        time.sleep(0.05)
+        with urllib.request.urlopen(f"{daemon.address}/healthz") as response:
+            status = json.loads(response.read())
+        self.assertGreaterEqual(status['syncs'], 1)
+        self.assertEqual(status['last_sync']['reason'], 'schedule')
+
+    def test_metrics_endpoint(self):
+        """Test that accumulated metrics are served in the Prometheus text format."""
+        daemon = self.start_daemon()
+        daemon.notify('exists')
+        self.assertTrue(self.synced.wait(5))
+        time.sleep(0.05)
+        with urllib.request.urlopen(f"{daemon.address}/metrics") as response:
+            self.assertTrue(response.headers['Content-Type'].startswith('text/plain'))
+            body = response.read().decode()
+        self.assertIn("studio_calendar_daemon_syncs_total 1", body)
+        self.assertIn("studio_calendar_daemon_notifications_total 1", body)
+
+    def test_incremental_sync_updates_changed_months(self):
+        """Test that only the months of changed events are synced, and tokens advance after a sync."""
+        listings = []
+        responses = [
+            ([{'id': 'a', 'start': {'dateTime': '2025-04-10T10:00:00Z'}}], 't1'),
+            # 'a' moved to May
+            ([{'id': 'a', 'start': {'dateTime': '2025-05-02T10:00:00Z'}}], 't2'),
+            ([{'id': 'a', 'status': 'cancelled'}], 't3'),
+            ([], 't4'),
+        ]
+
+        def changes(calendar_id, sync_token):
+            listings.append(sync_token)
+            return responses.pop(0)
+
+        daemon = self.start_daemon(changes=changes, calendar_ids=['cal'])
+        for _ in range(4):
+            daemon._run_sync('notification')
+        self.assertEqual(listings, [None, 't1', 't2', 't3'])
+        self.assertEqual(self.syncs, [('2025-04-01', None), ('2025-04-01', None), ('2025-05-01', None),
+                                      ('2025-05-01', None)])
+        self.assertEqual(daemon.status['last_result']['ranges'], [])
+
+    def test_failed_sync_keeps_token_and_expired_token_resyncs(self):
+        """Test that a failed sync lists the same changes again and an expired token lists in full."""
+        listings = []
+
+        def changes(calendar_id, sync_token):
+            listings.append(sync_token)
+            if sync_token == 'stale':
+                raise SyncTokenExpired("Sync token for cal expired")
+            return [{'id': 'a', 'start': {'date': '2025-06-03'}}], 'stale' if sync_token else 'first'
+
+        failures = [RuntimeError("quota")]
+
+        def sync(start_date, end_date):
+            self.syncs.append((start_date, end_date))
+            if failures:
+                raise failures.pop()
+
+        daemon = self.start_daemon(sync=sync, changes=changes, calendar_ids=['cal'])
+        daemon._run_sync('schedule')
+        daemon._run_sync('schedule')
+        daemon._run_sync('schedule')
+        daemon._run_sync('schedule')
+        # The failed first sync didn't store 'first', so the second lists from scratch again
+        self.assertEqual(listings, [None, None, 'first', 'stale', None])
+        self.assertEqual(self.syncs, [('2025-04-01', None), ('2025-04-01', None), ('2025-06-01', None),
+                                      ('2025-04-01', None)])
+        self.assertEqual(daemon.status['failures'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
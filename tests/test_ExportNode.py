@@ -0,0 +1,86 @@
+import unittest
+import csv
+import os
+import sqlite3
+import sys
+import tempfile
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from ExportNode import CsvSink, SqliteSink, column_name, export_rows, get_sink
+
+
+HEADER = ["Date", "Studio", "Artist Name", "Hours", "Price", "Engineer Name"]
+ROWS = [
+    ["2024-12-16", "Studio A", "Joe", "3.00", "300", "Jaylun"],
+    ["2024-12-17", "Studio B", "Holiday", "24.0", "", "No Engineer"],
+    ["2024-12-18", "Studio A", "Meeting", "1.00", "150", "Chris"],
+]
+
+
+class TestExportNode(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_column_name(self):
+        """Test that template headers become valid column names."""
+        self.assertEqual(column_name("Paid?"), "paid")
+        self.assertEqual(column_name("Artist Name"), "artist_name")
+
+    def test_csv_sink_writes_in_batches(self):
+        """Test that the CSV sink writes every row even when batches are smaller than the data."""
+        path = self.path("sessions.csv")
+        written = CsvSink(path, batch_size=2).write_rows([HEADER] + ROWS)
+
+        self.assertEqual(written, 3)
+        with open(path, newline='', encoding='utf-8') as f:
+            self.assertEqual(list(csv.reader(f)), [HEADER] + ROWS)
+
+    def test_sqlite_sink_creates_indexes_and_numbers(self):
+        """Test that the SQLite sink bulk inserts rows, types numeric columns and indexes lookups."""
+        path = self.path("sessions.db")
+        written = SqliteSink(path, batch_size=2).write_rows(iter([HEADER] + ROWS))
+        self.assertEqual(written, 3)
+
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute("SELECT artist_name, hours, price FROM sessions ORDER BY date").fetchall()
+            self.assertEqual(rows, [("Joe", 3.0, 300.0), ("Holiday", 24.0, None), ("Meeting", 1.0, 150.0)])
+
+            indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            self.assertTrue({"idx_sessions_date", "idx_sessions_studio", "idx_sessions_engineer_name"} <= indexes)
+        finally:
+            conn.close()
+
+    def test_sqlite_export_twice_replaces_rows(self):
+        """Test that exporting the same range again doesn't duplicate its rows."""
+        path = self.path("sessions.db")
+        SqliteSink(path).write_rows([HEADER] + ROWS)
+        SqliteSink(path).write_rows([HEADER] + ROWS[:2])
+
+        conn = sqlite3.connect(path)
+        try:
+            self.assertEqual(conn.execute("SELECT artist_name FROM sessions ORDER BY date").fetchall(),
+                             [("Joe",), ("Holiday",)])
+        finally:
+            conn.close()
+
+    def test_empty_stream(self):
+        """Test that an empty stream writes nothing."""
+        self.assertEqual(export_rows([], self.path("empty.csv")), 0)
+
+    def test_unsupported_extension(self):
+        """Test that unknown extensions are rejected."""
+        with self.assertRaises(ValueError):
+            get_sink(self.path("sessions.xlsx"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import json
+import os
+import sys
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from googleapiclient.http import HttpMockSequence, HttpRequest
+
+from src.JsonStreamNode import StreamedPage, stream_items
+
+
+PAGE = {
+    'kind': 'calendar#events',
+    'items': [
+        {'id': '1', 'summary': 'Session w/ Joe', 'start': {'dateTime': '2024-12-16T19:30:00-05:00'},
+         'items': ['nested arrays named items are left alone']},
+        {'id': '2', 'summary': 'Quote \\"unicode\\" é', 'description': 'a,b]}'},
+    ],
+    'nextPageToken': 'next',
+}
+
+
+class TestJsonStreamNode(unittest.TestCase):
+
+    def test_items_match_json_loads(self):
+        body = json.dumps(PAGE, indent=2).encode('utf-8')
+        page = StreamedPage(body)
+        self.assertEqual(list(page.get('items', [])), PAGE['items'])
+        self.assertEqual(page.get('nextPageToken'), 'next')
+        self.assertEqual(page['kind'], 'calendar#events')
+
+    def test_token_before_items_and_unread_items_skipped(self):
+        body = json.dumps({'nextPageToken': 'next', 'items': PAGE['items']}, separators=(',', ':'))
+        page = StreamedPage(body)
+        items = page.get('items')
+        self.assertEqual(next(items)['id'], '1')
+        self.assertEqual(page.get('nextPageToken'), 'next')
+        self.assertEqual(list(items), [])
+        self.assertNotIn('missing', page)
+
+    def test_empty_and_itemless_bodies(self):
+        self.assertEqual(list(StreamedPage(b'').get('items', [])), [])
+        page = StreamedPage(b'{"items": []}')
+        self.assertEqual(list(page.get('items', [])), [])
+        self.assertIsNone(page.get('nextPageToken'))
+        with self.assertRaises(json.JSONDecodeError):
+            list(StreamedPage(b'{"items": [{"id": 1},').get('items'))
+
+    def test_stream_items_replaces_request_parser(self):
+        body = json.dumps(PAGE)
+        http = HttpMockSequence([({'status': '200'}, body)])
+        request = HttpRequest(http, lambda resp, content: json.loads(content), 'https://example.com/events')
+        page = stream_items(request).execute()
+        self.assertIsInstance(page, StreamedPage)
+        self.assertEqual([item['id'] for item in page.get('items')], ['1', '2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from src.LauncherNode import env_python, ensure_environment, launch, remove_tokens
+from src.StartupNode import LAUNCH_ENV
+
+
+class FakeRun:
+    """Records commands; `python -m venv` creates the interpreter and pyvenv.cfg."""
+
+    def __init__(self, returncode=0):
+        self.calls = []
+        self.returncode = returncode
+
+    def __call__(self, command, **kwargs):
+        self.calls.append((command, kwargs))
+        if command[1:3] == ['-m', 'venv']:
+            env_dir = Path(command[3])
+            python = env_python(env_dir)
+            python.parent.mkdir(parents=True)
+            python.touch()
+            (env_dir / 'pyvenv.cfg').write_text('home = /usr/bin\nversion = 3.11.4\n')
+        return SimpleNamespace(returncode=self.returncode)
+
+    def pip_installs(self):
+        return sum(1 for command, _ in self.calls if 'pip' in command)
+
+
+class TestLauncherNode(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.env_dir = self.root / '.venv'
+        self.requirements = self.root / 'requirements.txt'
+        self.requirements.write_text('google-auth==2.17.3\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_installs_only_when_requirements_change(self):
+        run = FakeRun()
+        python, installed = ensure_environment(self.env_dir, self.requirements, run=run)
+        self.assertTrue(installed)
+        self.assertEqual(python, env_python(self.env_dir))
+        self.assertEqual(ensure_environment(self.env_dir, self.requirements, run=run), (python, False))
+        self.assertEqual(run.pip_installs(), 1)
+        self.requirements.write_text('google-auth==2.17.3\nrequests>=2.28\n')
+        self.assertTrue(ensure_environment(self.env_dir, self.requirements, run=run)[1])
+        self.assertTrue(ensure_environment(self.env_dir, self.requirements, reinstall=True, run=run)[1])
+        self.assertEqual(run.pip_installs(), 3)
+        # A new base interpreter changes the hash as well
+        (self.env_dir / 'pyvenv.cfg').write_text('version = 3.12.1\n')
+        self.assertTrue(ensure_environment(self.env_dir, self.requirements, run=run)[1])
+
+    def test_failed_install_is_retried(self):
+        run = FakeRun()
+        ensure_environment(self.env_dir, self.requirements, run=run)
+        self.requirements.write_text('package-that-fails\n')
+        run.returncode = 1
+        with self.assertRaises(RuntimeError):
+            ensure_environment(self.env_dir, self.requirements, run=run)
+        run.returncode = 0
+        self.assertTrue(ensure_environment(self.env_dir, self.requirements, run=run)[1])
+
+    def test_launch_passes_start_time(self):
+        run = FakeRun()
+        self.assertEqual(launch(['--import-report'], self.env_dir, self.requirements, run=run), 0)
+        command, kwargs = run.calls[-1]
+        self.assertTrue(command[1].endswith('main.py'))
+        self.assertEqual(command[2:], ['--import-report'])
+        self.assertGreater(float(kwargs['env'][LAUNCH_ENV]), 0)
+
+
+    def test_remove_tokens(self):
+        token = self.root / 'token.json'
+        token.write_text('{}')
+        remove_tokens([token, self.root / 'sheet_token.json'])
+        self.assertFalse(token.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from MetricsNode import RunMetrics, bind_metrics, current_metrics
+
+
+class TestMetricsNode(unittest.TestCase):
+    def test_stages_counters_and_caches(self):
+        """Test that stage timings, counters and cache hit rates are reported."""
+        metrics = RunMetrics(run_id='test')
+        with metrics.stage('fetch'):
+            pass
+        with metrics.stage('fetch'):
+            pass
+        metrics.count('fetched', 5)
+        metrics.count('fetched', 2)
+        metrics.cache('service_pool', hit=False)
+        metrics.cache('service_pool', hit=True)
+        metrics.cache('service_pool', hit=True)
+
+        report = metrics.to_dict()
+        self.assertEqual(report['stages']['fetch']['calls'], 2)
+        self.assertGreaterEqual(report['stages']['fetch']['seconds'], 0)
+        self.assertEqual(report['counters'], {'fetched': 7})
+        self.assertAlmostEqual(report['caches']['service_pool']['hit_rate'], 2 / 3)
+
+    def test_api_observations_and_merge(self):
+        """Test that API calls aggregate per method and runs merge into totals."""
+        run = RunMetrics()
+        run.observe_api('calendar.events.list', 0.2, response_bytes=100)
+        run.observe_api('calendar.events.list', 0.4, response_bytes=50, retries=1)
+        run.observe_api('sheets.spreadsheets.values.update', 0.1, error=True)
+
+        call = run.to_dict()['api']['calendar.events.list']
+        self.assertEqual(call['calls'], 2)
+        self.assertEqual(call['retries'], 1)
+        self.assertEqual(call['response_bytes'], 150)
+        self.assertAlmostEqual(call['avg_seconds'], 0.3)
+        self.assertAlmostEqual(call['max_seconds'], 0.4)
+
+        totals = RunMetrics()
+        totals.merge(run)
+        totals.merge(run)
+        report = totals.to_dict()
+        self.assertEqual(report['api_totals']['calls'], 6)
+        self.assertEqual(report['api_totals']['errors'], 2)
+        self.assertAlmostEqual(report['api']['calendar.events.list']['max_seconds'], 0.4)
+
+    def test_bind_is_per_thread(self):
+        """Test that a bound run is visible only on the binding thread."""
+        metrics = RunMetrics()
+        seen = []
+        with bind_metrics(metrics):
+            self.assertIs(current_metrics(), metrics)
+            thread = threading.Thread(target=lambda: seen.append(current_metrics()))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [None])
+        self.assertIsNone(current_metrics())
+
+    def test_json_report_and_prometheus(self):
+        """Test that the run report is written as JSON and rendered for Prometheus."""
+        metrics = RunMetrics(run_id='abc', labels={'start_date': '2025-04-01'})
+        metrics.count('rows_formatted', 3)
+        metrics.observe_api('calendar.events.list', 0.5)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = metrics.write_report(directory)
+            self.assertEqual(os.path.basename(path), 'run-abc.json')
+            with open(path) as f:
+                self.assertEqual(json.load(f)['counters'], {'rows_formatted': 3})
+
+        text = metrics.to_prometheus()
+        self.assertIn('# TYPE studio_calendar_api_calls_total counter', text)
+        self.assertIn('studio_calendar_api_calls_total{method="calendar.events.list",start_date="2025-04-01"} 1', text)
+        self.assertIn('studio_calendar_items_total{counter="rows_formatted",start_date="2025-04-01"} 3', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
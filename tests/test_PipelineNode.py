@@ -0,0 +1,124 @@
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import threading
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from PipelineNode import StreamingPipeline
+from FormatterNode import FormatterNode
+
+
+class FakeCalendarService:
+    """Serves events in pages, following pageToken like events().list."""
+
+    def __init__(self, pages_by_calendar):
+        self.pages_by_calendar = pages_by_calendar
+
+    def events(self):
+        return self
+
+    def list(self, calendarId, pageToken=None, **kwargs):
+        pages = self.pages_by_calendar[calendarId]
+        index = int(pageToken or 0)
+        result = {'items': pages[index]}
+        if index + 1 < len(pages):
+            result['nextPageToken'] = str(index + 1)
+        request = MagicMock()
+        request.execute.return_value = result
+        return request
+
+
+def event(day, hour, summary):
+    return {
+        'id': f"{day}-{hour}",
+        'start': {'dateTime': f"2025-04-{day:02d}T{hour:02d}:00:00"},
+        'end': {'dateTime': f"2025-04-{day:02d}T{hour + 1:02d}:00:00"},
+        'summary': summary,
+    }
+
+
+class TestPipelineNode(unittest.TestCase):
+    def setUp(self):
+        self.calendar = FakeCalendarService({
+            'primary': [[event(1, 10, 'A1'), event(3, 10, 'A2')], [event(5, 10, 'A3')]],
+            'second': [[event(2, 10, 'B1')], [event(4, 10, 'B2'), event(6, 10, 'B3')]],
+        })
+        self.sheets = MagicMock()
+        self.sheets.spreadsheets().get().execute.return_value = {'sheets': []}
+        self.written = []
+
+        def update(**kwargs):
+            self.written.append((kwargs['range'], kwargs['body']['values']))
+            request = MagicMock()
+            request.execute.return_value = {'updatedCells': sum(len(r) for r in kwargs['body']['values'])}
+            return request
+        self.sheets.spreadsheets().values().update.side_effect = update
+
+    def run_pipeline(self, **kwargs):
+        pipeline = StreamingPipeline(FormatterNode(), queue_size=1, chunk_size=2, **kwargs)
+        counts = pipeline.run(
+            ['primary', 'second'], 'min', 'max',
+            calendar_service_factory=lambda: self.calendar,
+            sheets_service_factory=lambda: self.sheets,
+            spreadsheet_id='sheet-id', sheet_name='Test',
+        )
+        return pipeline, counts
+
+    def test_rows_are_merged_chronologically_and_chunked(self):
+        """Test that pages from both calendars are merged in order and written in chunks."""
+        _, counts = self.run_pipeline()
+
+        self.assertEqual(counts['fetched'], 6)
+        self.assertEqual(counts['formatted'], 6)
+        self.assertEqual(counts['written'], 7 * 13)
+
+        ranges = [r for r, _ in self.written]
+        self.assertEqual(ranges, ['Test!A1', 'Test!A3', 'Test!A5', 'Test!A7'])
+        rows = [row for _, chunk in self.written for row in chunk]
+        self.assertEqual(rows[0], FormatterNode().template)
+        self.assertEqual([row[2] for row in rows[1:]], ['A1', 'B1', 'A2', 'B2', 'A3', 'B3'])
+        # Only the rows past the new data are cleared, after the last chunk
+        clear = self.sheets.spreadsheets().values().clear
+        self.assertEqual([c.kwargs['range'] for c in clear.call_args_list], ['Test!A8:M'])
+
+    def test_progress_is_reported_per_stage(self):
+        """Test that running totals are reported for every stage."""
+        reports = []
+        lock = threading.Lock()
+
+        def progress(stage, count):
+            with lock:
+                reports.append((stage, count))
+
+        self.run_pipeline(progress=progress)
+        finals = {}
+        for stage, count in reports:
+            finals[stage] = max(finals.get(stage, 0), count)
+        self.assertEqual(finals, {'fetched': 6, 'formatted': 6, 'written': 91})
+
+    def test_writer_error_stops_pipeline(self):
+        """Test that an error in one stage is raised and stops the others."""
+        self.sheets.spreadsheets().values().update.side_effect = RuntimeError("quota")
+        with self.assertRaises(RuntimeError):
+            self.run_pipeline()
+
+    def test_fetch_error_leaves_existing_rows(self):
+        """Test that a fetch failing mid-stream raises without clearing the tab."""
+        list_events = self.calendar.list
+
+        def failing_list(calendarId, pageToken=None, **kwargs):
+            if calendarId == 'second' and pageToken:
+                raise RuntimeError("backend error")
+            return list_events(calendarId, pageToken, **kwargs)
+        self.calendar.list = failing_list
+
+        with self.assertRaises(RuntimeError):
+            self.run_pipeline()
+        self.sheets.spreadsheets().values().clear.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
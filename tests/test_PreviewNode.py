@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import tkinter as tk
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from src.FormatterNode import FormatterNode
+from src.PreviewNode import ALL, PreviewTable, RowView
+
+
+HEADER = FormatterNode().template
+
+
+def row(date, studio, artist, hours, engineer):
+    return [date, studio, artist, "Recording", "12:00", "14:00", hours, "No", 300, engineer, 100, "", 0]
+
+
+ROWS = [
+    row("2024-12-03", "Studio A", "Nova", "2.00", "John"),
+    row("2024-12-01", "Studio B", "Kai", "10.00", "Aaron"),
+    row("2024-12-02", "Studio A", "Lola", "3.00", "Aaron"),
+    row("2024-12-04", "Studio B", "Zed", "", "John"),
+]
+
+
+def tk_root():
+    try:
+        return tk.Tk()
+    except tk.TclError:
+        return None
+
+
+class TestPreviewNode(unittest.TestCase):
+
+    def test_sort_numbers_by_value_and_toggle(self):
+        view = RowView(HEADER, ROWS)
+        view.sort_by("Hours")
+        self.assertEqual([r[2] for r in view.page(0, 10)], ["Nova", "Lola", "Kai", "Zed"])
+        view.sort_by("Hours")
+        self.assertTrue(view.descending)
+        self.assertEqual([r[2] for r in view.page(0, 10)], ["Zed", "Kai", "Lola", "Nova"])
+        view.sort_by("Date", descending=False)
+        self.assertEqual([r[2] for r in view.page(1, 2)], ["Lola", "Nova"])
+
+    def test_filters_combine_and_keep_sort(self):
+        view = RowView(HEADER, ROWS)
+        self.assertEqual(view.filter_columns, ["Studio", "Engineer Name"])
+        self.assertEqual(view.choices("Engineer Name"), ["Aaron", "John"])
+        view.sort_by("Date")
+        view.set_filter("Studio", "Studio A")
+        self.assertEqual([r[2] for r in view.page(0, 10)], ["Lola", "Nova"])
+        view.set_filter("Engineer Name", "John")
+        self.assertEqual(len(view), 1)
+        view.set_filter("Studio", ALL)
+        self.assertEqual([r[2] for r in view.page(0, 10)], ["Nova", "Zed"])
+
+    def test_table_builds_only_visible_rows(self):
+        root = tk_root()
+        if root is None:
+            self.skipTest("no display")
+        try:
+            table = PreviewTable(root, visible_rows=5)
+            rows = [row(f"2024-12-{i % 28 + 1:02d}", "Studio A", f"Artist {i}", "1.00", "John") for i in range(50000)]
+            table.set_rows(HEADER, rows)
+            self.assertEqual(len(table.tree.get_children()), 5)
+            table.scroll_to(49998)
+            self.assertEqual(table.offset, 49995)
+            self.assertEqual(table.tree.item(table.tree.get_children()[-1])["values"][2], "Artist 49999")
+        finally:
+            root.destroy()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from ProfileNode import StageProfiler
+from MetricsNode import RunMetrics
+
+
+class TestProfileNode(unittest.TestCase):
+    def setUp(self):
+        self.run_dir = tempfile.mkdtemp()
+
+    def test_stage_writes_profiles_and_summary(self):
+        """Test that each stage gets a CPU profile, an allocation report and a summary entry."""
+        profiler = StageProfiler(self.run_dir)
+        with profiler.stage('format'):
+            rows = [[str(i)] * 13 for i in range(2000)]
+        profiler.close()
+
+        files = sorted(os.listdir(self.run_dir))
+        self.assertEqual(files, ['01-format-alloc.txt', '01-format.prof', '01-format.txt', 'stages.json'])
+        with open(os.path.join(self.run_dir, 'stages.json')) as f:
+            summary = json.load(f)
+        self.assertEqual(summary[0]['stage'], 'format')
+        self.assertGreater(summary[0]['net_allocated_bytes'], 0)
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(len(rows), 2000)
+
+    def test_metrics_stages_are_profiled_except_total(self):
+        """Test that RunMetrics profiles its stages through the attached profiler."""
+        metrics = RunMetrics(profiler=StageProfiler(self.run_dir))
+        with metrics.stage('total', profile=False):
+            with metrics.stage('fetch'):
+                pass
+            with metrics.stage('write'):
+                pass
+        metrics.profiler.close()
+
+        self.assertEqual([s['stage'] for s in metrics.profiler.stages], ['fetch', 'write'])
+        self.assertEqual(set(metrics.stages), {'total', 'fetch', 'write'})
+
+    def test_nested_stage_is_timed_only(self):
+        """Test that a stage nested in a profiled stage on the same thread is not CPU-profiled."""
+        profiler = StageProfiler(self.run_dir)
+        with profiler.stage('outer'):
+            with profiler.stage('inner'):
+                pass
+        profiler.close()
+        by_stage = {s['stage']: s for s in profiler.stages}
+        self.assertIn('cpu_profile', by_stage['outer'])
+        self.assertNotIn('cpu_profile', by_stage['inner'])
+        self.assertEqual(by_stage['inner']['cpu_profile_skipped'], 'nested stage')
+
+    def test_tracing_stops_when_last_profiler_closes(self):
+        """Test that closing one of two concurrent profilers leaves tracemalloc running for the other."""
+        first = StageProfiler(self.run_dir)
+        second = StageProfiler(tempfile.mkdtemp())
+        first.close()
+        first.close()
+        self.assertTrue(tracemalloc.is_tracing())
+        with second.stage('write'):
+            pass
+        self.assertIn('allocations', second.stages[0])
+        second.close()
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+if __name__ == '__main__':
+    unittest.main()
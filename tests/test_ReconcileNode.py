@@ -0,0 +1,159 @@
+import unittest
+import os
+import sys
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from src.FormatterNode import FormatterNode
+from src.ReconcileNode import SheetReconciler, column_letter, reconcile_sheet
+
+
+TEMPLATE = FormatterNode().template
+ID_TEMPLATE = FormatterNode(event_ids=True).template
+
+
+def row(date, start, artist, paid="No", price=300, studio="Studio A"):
+    return [date, studio, artist, "Recording", start, "2:00 PM", 2.0, paid,
+            price, "John", 100, "", 0]
+
+def id_row(event_id, date, start, artist, paid="No", price=300):
+    return row(date, start, artist, paid, price) + [f"cal/{event_id}" if event_id else ""]
+
+
+class FakeRequest:
+    def __init__(self, result=None):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+
+class FakeSheets:
+    """Answers values().batchGet with a fixed grid and records writes."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.gets = []
+        self.updates = []
+        self.clears = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def batchGet(self, **kwargs):
+        self.gets.append(kwargs)
+        return FakeRequest({'valueRanges': [{'values': self.grid}] if self.grid else [{}]})
+
+    def batchUpdate(self, spreadsheetId, body):
+        self.updates.extend(body['data'])
+        return FakeRequest({})
+
+    def clear(self, spreadsheetId, range, body):
+        self.clears.append(range)
+        return FakeRequest({})
+
+
+class TestReconcileNode(unittest.TestCase):
+
+    def test_manual_edits_kept_and_only_changes_written(self):
+        # Staff marked the first session paid and discounted the second
+        sheet = [TEMPLATE,
+                 row("12/01/2024", "12:00 PM", "Nova", paid="Yes"),
+                 row("12/02/2024", "12:00 PM", "Kai", price=250)]
+        fresh = [TEMPLATE,
+                 row("12/01/2024", "12:00 PM", "Nova"),
+                 row("12/02/2024", "12:00 PM", "Kai Renamed"),
+                 row("12/03/2024", "1:00 PM", "Lola")]
+        service = FakeSheets(sheet)
+        merged, stats = reconcile_sheet(service, "sheet-id", "Tab", fresh)
+
+        self.assertEqual(len(service.gets), 1)
+        self.assertEqual(merged[1][7], "Yes")
+        self.assertEqual(merged[2][8], 250)
+        self.assertEqual(stats['kept_manual'], 2)
+        self.assertEqual(stats['matched'], 2)
+        self.assertEqual(service.updates, [
+            {'range': 'Tab!C3:C3', 'values': [["Kai Renamed"]]},
+            {'range': 'Tab!A4:M4', 'values': [merged[3]]},
+        ])
+        self.assertEqual(stats['changed_cells'], 1 + len(TEMPLATE))
+        self.assertEqual(service.clears, [])
+
+    def test_empty_tab_written_in_one_range(self):
+        fresh = [TEMPLATE, row("12/01/2024", "12:00 PM", "Nova"), row("12/02/2024", "12:00 PM", "Kai")]
+        service = FakeSheets([])
+        merged, stats = reconcile_sheet(service, "sheet-id", "Tab", fresh)
+        self.assertEqual(service.updates, [{'range': 'Tab!A1:M3', 'values': merged}])
+        self.assertEqual(stats['matched'], 0)
+
+    def test_repeated_keys_and_removed_rows(self):
+        sheet = [TEMPLATE,
+                 row("12/01/2024", "12:00 PM", "Nova", paid="Yes"),
+                 row("12/01/2024", "12:00 PM", "Nova", paid="Partial"),
+                 row("12/05/2024", "12:00 PM", "Cancelled")]
+        fresh = [TEMPLATE, row("12/01/2024", "12:00 PM", "Nova"), row("12/01/2024", "12:00 PM", "Nova")]
+        service = FakeSheets(sheet)
+        merged, stats = reconcile_sheet(service, "sheet-id", "Tab", fresh)
+        self.assertEqual([r[7] for r in merged[1:]], ["Yes", "Partial"])
+        self.assertEqual(service.updates, [])
+        self.assertEqual(service.clears, ["Tab!A4:M4"])
+        self.assertEqual(stats['removed_rows'], 1)
+
+    def test_carry_manual_for_streamed_rows(self):
+        reconciler = SheetReconciler(TEMPLATE)
+        # Sheet rows come back without their trailing blank cells
+        sheet_row = row("12/01/2024", "12:00 PM", "Nova", paid="Yes", price="")[:8]
+        reconciler.load(FakeSheets([TEMPLATE, sheet_row]), "sheet-id", "Tab")
+        streamed = row("12/01/2024", "12:00 PM", "Nova")
+        self.assertTrue(reconciler.carry_manual(streamed))
+        # Blank manual cells take the formatted value
+        self.assertEqual((streamed[7], streamed[8]), ("Yes", 300))
+        self.assertFalse(reconciler.carry_manual(row("12/09/2024", "12:00 PM", "New")))
+
+    def test_rebooked_slot_does_not_inherit_manual_values(self):
+        # Nova's paid session was cancelled and Kai booked the same slot
+        sheet = [ID_TEMPLATE, id_row("nova1", "12/01/2024", "12:00 PM", "Nova", paid="Yes", price=250)]
+        fresh = [ID_TEMPLATE, id_row("kai1", "12/01/2024", "12:00 PM", "Kai")]
+        merged, stats = reconcile_sheet(FakeSheets(sheet), "sheet-id", "Tab", fresh)
+        self.assertEqual((merged[1][7], merged[1][8]), ("No", 300))
+        self.assertEqual(stats['matched'], 0)
+
+    def test_moved_session_keeps_manual_values(self):
+        sheet = [ID_TEMPLATE,
+                 id_row("nova1", "12/01/2024", "12:00 PM", "Nova", paid="Yes", price=250),
+                 id_row("kai1", "12/02/2024", "12:00 PM", "Kai")]
+        # Nova moved to the 3rd, after Kai
+        fresh = [ID_TEMPLATE,
+                 id_row("kai1", "12/02/2024", "12:00 PM", "Kai"),
+                 id_row("nova1", "12/03/2024", "1:00 PM", "Nova")]
+        merged, stats = reconcile_sheet(FakeSheets(sheet), "sheet-id", "Tab", fresh)
+        self.assertEqual([(r[2], r[7], r[8]) for r in merged[1:]], [("Kai", "No", 300), ("Nova", "Yes", 250)])
+        self.assertEqual(stats['matched'], 2)
+
+    def test_legacy_rows_matched_by_slot_and_given_ids(self):
+        # Written before the ID column: the header and rows stop at Referral Payment
+        sheet = [TEMPLATE, row("12/01/2024", "12:00 PM", "Nova", paid="Yes")]
+        fresh = [ID_TEMPLATE, id_row("nova1", "12/01/2024", "12:00 PM", "Nova")]
+        service = FakeSheets(sheet)
+        merged, stats = reconcile_sheet(service, "sheet-id", "Tab", fresh)
+        self.assertEqual(merged[1][7], "Yes")
+        self.assertEqual(stats['matched'], 1)
+        self.assertEqual(service.updates, [{'range': 'Tab!N1:N2', 'values': [["Event ID"], ["cal/nova1"]]}])
+
+    def test_event_row_id(self):
+        formatter = FormatterNode(event_ids=True)
+        event = {'id': 'abc', 'calendar': 'studio-a', 'start': '2024-12-01T12:00:00', 'end': '2024-12-01T14:00:00',
+                 'summary': 'Nova', 'description': ''}
+        self.assertEqual(formatter.format_event(event)[-1], "studio-a/abc")
+        self.assertEqual(FormatterNode.event_row_id({'calendar': 'studio-a'}), "")
+
+    def test_column_letter(self):
+        self.assertEqual([column_letter(i) for i in (0, 12, 25, 26, 701, 702)], ["A", "M", "Z", "AA", "ZZ", "AAA"])
+
+
+if __name__ == '__main__':
+    unittest.main()
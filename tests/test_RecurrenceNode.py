@@ -0,0 +1,148 @@
+import unittest
+import os
+import sys
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from src.MetricsNode import RunMetrics, bind_metrics
+from src.RecurrenceNode import ExpansionCache, UnsupportedRule, expand_events, parse_rrule
+
+
+def master(rule, start='2025-03-03T14:00:00-05:00', end='2025-03-03T16:00:00-05:00', extra=()):
+    return {
+        'id': 'weekly',
+        'summary': 'Band rehearsal',
+        'description': 'Artist: Nova',
+        'start': {'dateTime': start, 'timeZone': 'America/New_York'},
+        'end': {'dateTime': end, 'timeZone': 'America/New_York'},
+        'recurrence': [rule, *extra],
+    }
+
+
+class TestRecurrenceNode(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ExpansionCache()
+
+    def expand(self, events, time_min='2025-03-01T00:00:00Z', time_max='2025-04-01T00:00:00Z', **kwargs):
+        return expand_events(events, time_min, time_max, cache=self.cache, **kwargs)
+
+    def test_weekly_keeps_wall_clock_across_dst(self):
+        instances = self.expand([master('RRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=4')])
+        self.assertEqual([e['start']['dateTime'] for e in instances], [
+            '2025-03-03T14:00:00-05:00',
+            '2025-03-10T14:00:00-04:00',
+            '2025-03-17T14:00:00-04:00',
+            '2025-03-24T14:00:00-04:00',
+        ])
+        self.assertEqual(instances[1]['id'], 'weekly_20250310T180000Z')
+        self.assertEqual(instances[1]['end']['dateTime'], '2025-03-10T16:00:00-04:00')
+        self.assertEqual(instances[1]['recurringEventId'], 'weekly')
+        self.assertEqual(instances[1]['summary'], 'Band rehearsal')
+        self.assertNotIn('recurrence', instances[1])
+
+    def test_exdate_and_exceptions(self):
+        series = master('RRULE:FREQ=WEEKLY;BYDAY=MO,TH;UNTIL=20250314T190000Z',
+                        extra=['EXDATE;TZID=America/New_York:20250306T140000'])
+        moved = {
+            'id': 'weekly_20250310T180000Z', 'recurringEventId': 'weekly', 'summary': 'Moved',
+            'originalStartTime': {'dateTime': '2025-03-10T14:00:00-04:00', 'timeZone': 'America/New_York'},
+            'start': {'dateTime': '2025-03-11T10:00:00-04:00'}, 'end': {'dateTime': '2025-03-11T12:00:00-04:00'},
+        }
+        cancelled = {
+            'id': 'weekly_20250313T180000Z', 'recurringEventId': 'weekly', 'status': 'cancelled',
+            'originalStartTime': {'dateTime': '2025-03-13T18:00:00Z'},
+        }
+        single = {'id': 'one-off', 'start': {'dateTime': '2025-03-05T09:00:00-05:00'},
+                  'end': {'dateTime': '2025-03-05T10:00:00-05:00'}}
+        instances = self.expand([cancelled, series, single, moved])
+        self.assertEqual([e['id'] for e in instances], [
+            'weekly_20250303T190000Z', 'one-off', 'weekly_20250310T180000Z',
+        ])
+        self.assertEqual(instances[2]['summary'], 'Moved')
+
+    def test_monthly_by_weekday_ordinal(self):
+        second_tuesday = master('RRULE:FREQ=MONTHLY;BYDAY=2TU;COUNT=3',
+                                start='2025-01-14T18:00:00-05:00', end='2025-01-14T20:00:00-05:00')
+        last_friday = dict(master('RRULE:FREQ=MONTHLY;BYDAY=-1FR',
+                                  start='2025-01-31T12:00:00-05:00', end='2025-01-31T13:00:00-05:00'), id='friday')
+        instances = self.expand([second_tuesday, last_friday], time_min='2025-01-01T00:00:00Z',
+                                time_max='2025-05-01T00:00:00Z')
+        self.assertEqual([e['start']['dateTime'][:10] for e in instances], [
+            '2025-01-14', '2025-01-31', '2025-02-11', '2025-02-28', '2025-03-11', '2025-03-28', '2025-04-25',
+        ])
+
+    def test_all_day_interval(self):
+        event = {'id': 'block', 'start': {'date': '2025-03-01'}, 'end': {'date': '2025-03-02'},
+                 'recurrence': ['RRULE:FREQ=DAILY;INTERVAL=2;COUNT=3']}
+        instances = self.expand([event])
+        self.assertEqual([e['start'] for e in instances],
+                         [{'date': '2025-03-01'}, {'date': '2025-03-03'}, {'date': '2025-03-05'}])
+        self.assertEqual(instances[0]['id'], 'block_20250301')
+
+    def test_instance_moved_out_of_window_is_not_generated(self):
+        series = dict(master('RRULE:FREQ=WEEKLY;BYDAY=MO'), iCalUID='weekly@google.com')
+        # The Mar 31 session moved to Apr 2, so the March listing doesn't hold the exception
+        moved = {
+            'recurringEventId': 'weekly',
+            'originalStartTime': {'dateTime': '2025-03-31T14:00:00-04:00', 'timeZone': 'America/New_York'},
+        }
+        looked_up = []
+        instances = self.expand([series], fetch_exceptions=lambda event: looked_up.append(event['id']) or [moved])
+        self.assertEqual(looked_up, ['weekly'])
+        self.assertEqual([e['start']['dateTime'][:10] for e in instances],
+                         ['2025-03-03', '2025-03-10', '2025-03-17', '2025-03-24'])
+        self.assertEqual(len(self.expand([series])), 5)
+
+    def test_series_exceptions_cached_until_master_changes(self):
+        series = dict(master('RRULE:FREQ=WEEKLY;BYDAY=MO'), iCalUID='weekly@google.com', updated='2025-02-01T00:00:00Z')
+        looked_up = []
+        lookup = lambda event: looked_up.append(event['updated']) or []
+        self.expand([series], fetch_exceptions=lookup)
+        self.expand([series], time_min='2025-03-10T00:00:00Z', fetch_exceptions=lookup)
+        self.expand([dict(series, updated='2025-03-05T00:00:00Z')], fetch_exceptions=lookup)
+        self.assertEqual(looked_up, ['2025-02-01T00:00:00Z', '2025-03-05T00:00:00Z'])
+        self.cache.exceptions_ttl = -1
+        self.expand([series], fetch_exceptions=lookup)
+        self.assertEqual(len(looked_up), 3)
+
+    def test_window_excludes_instances_outside_range(self):
+        instances = self.expand([master('RRULE:FREQ=WEEKLY;BYDAY=MO')],
+                                time_min='2025-03-15T00:00:00Z', time_max='2025-03-25T00:00:00Z')
+        self.assertEqual([e['start']['dateTime'][:10] for e in instances], ['2025-03-17', '2025-03-24'])
+
+    def test_unsupported_rule_falls_back_to_server(self):
+        series = master('RRULE:FREQ=MONTHLY;BYDAY=MO,TU;BYSETPOS=1')
+        exception = {'id': 'weekly_x', 'recurringEventId': 'weekly',
+                     'originalStartTime': {'dateTime': '2025-03-03T19:00:00Z'},
+                     'start': {'dateTime': '2025-03-04T19:00:00Z'}, 'end': {'dateTime': '2025-03-04T20:00:00Z'}}
+        server = [{'id': 'weekly_20250303T190000Z', 'start': {'dateTime': '2025-03-04T19:00:00Z'},
+                   'end': {'dateTime': '2025-03-04T20:00:00Z'}}]
+        requested = []
+        instances = self.expand([series, exception],
+                                fetch_instances=lambda event_id: requested.append(event_id) or server)
+        self.assertEqual(requested, ['weekly'])
+        self.assertEqual(instances, server)
+        with self.assertRaises(UnsupportedRule):
+            self.expand([series])
+
+    def test_series_cached_across_windows(self):
+        metrics = RunMetrics(run_id='test')
+        series = master('RRULE:FREQ=DAILY')
+        with bind_metrics(metrics):
+            march = self.expand([series])
+            april = self.expand([series], time_min='2025-04-01T00:00:00Z', time_max='2025-04-08T00:00:00Z')
+        self.assertEqual(len(march), 29)
+        self.assertEqual(len(april), 7)
+        cache = metrics.to_dict()['caches']['recurrence']
+        self.assertEqual((cache['hits'], cache['misses']), (1, 1))
+
+    def test_parse_rrule_rejects_unknown_parts(self):
+        self.assertEqual(parse_rrule('RRULE:FREQ=WEEKLY;INTERVAL=2')['INTERVAL'], '2')
+        with self.assertRaises(UnsupportedRule):
+            parse_rrule('RRULE:FREQ=HOURLY')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import os
+import sys
+import tempfile
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from src.SearchNode import EventSearchIndex, edit_distance, tokenize
+from src.WarehouseNode import SessionWarehouse
+
+
+def event(event_id, summary, description='', start='2024-12-16T19:30:00-05:00'):
+    return {'id': event_id, 'calendar': 'primary', 'start': start, 'end': start,
+            'summary': summary, 'description': description}
+
+
+class TestSearchNode(unittest.TestCase):
+
+    def setUp(self):
+        self.index = EventSearchIndex()
+        self.index.update([
+            event('1', 'Session w/ Beyoncé', 'Vocals, 300', start='2024-12-03T10:00:00-05:00'),
+            event('2', 'Recording session for BEYONCE', 'mixing john', start='2024-12-01T10:00:00-05:00'),
+            event('3', 'Beyonce: vocals', '', start='2024-12-02T10:00:00-05:00'),
+            event('4', 'Session w/ Nova Twins', 'Drums tracking'),
+        ])
+
+    def test_artist_forms_normalize_to_one_artist(self):
+        sessions = self.index.search_artist('beyonce', prefix=False, fuzzy=False)
+        self.assertEqual([e['id'] for e in sessions], ['2', '3', '1'])
+        self.assertEqual(self.index.artist_names('beyonce'), ['BEYONCE', 'Beyonce', 'Beyoncé'])
+
+    def test_prefix_and_fuzzy(self):
+        self.assertEqual([e['id'] for e in self.index.search_artist('nov')], ['4'])
+        self.assertEqual(self.index.search_artist('nov', prefix=False, fuzzy=False), [])
+        self.assertEqual([e['id'] for e in self.index.search_artist('beyocne')], ['2', '3', '1'])
+        self.assertEqual([e['id'] for e in self.index.search('vocls')], ['3', '1'])
+        self.assertEqual(self.index.search('vocls', fuzzy=False), [])
+
+    def test_long_tokens_stay_out_of_fuzzy_variants(self):
+        """Test that Drive-style IDs are indexed for exact and prefix search only, keeping the index small."""
+        index = EventSearchIndex()
+        index.update([event(str(i), 'Session w/ Nova', f'https://drive.google.com/file/d/1AbCdEfGhIjKlMnOpQrStUv{i:05d}/view')
+                      for i in range(500)])
+        self.assertLess(len(index.keywords.deletes), 200)
+        self.assertEqual([e['id'] for e in index.search('1abcdefghijklmnopqrstuv00042')], ['42'])
+        self.assertEqual(index.count('1abcdefghijklmnopqrstuv0004'), 10)
+        # Keywords allow one edit even for long words
+        self.assertEqual(len(index.search('sesxion')), 500)
+        self.assertEqual(index.search('sesxiom'), [])
+
+    def test_keyword_search_requires_every_word(self):
+        self.assertEqual([e['id'] for e in self.index.search('drums nova')], ['4'])
+        self.assertEqual(self.index.search('drums beyonce'), [])
+        self.assertEqual(self.index.search(''), [])
+
+    def test_update_reindexes_changed_events_only(self):
+        self.assertEqual(self.index.update([event('4', 'Session w/ Nova Twins', 'Drums tracking')]), 0)
+        self.assertEqual(self.index.update([event('4', 'Session w/ Lola', 'Bass')]), 1)
+        self.assertEqual(self.index.search_artist('nova'), [])
+        self.assertNotIn('nova', self.index.artists.postings)
+        self.assertNotIn('twins', self.index.artists.terms)
+        self.assertEqual([e['id'] for e in self.index.search_artist('lola')], ['4'])
+        self.assertEqual(len(self.index), 4)
+
+    def test_limited_results_stay_in_start_order(self):
+        self.index.update([event('1', 'Session w/ Beyoncé', 'Vocals, 300', start='2024-11-30T10:00:00-05:00')])
+        self.assertEqual([e['id'] for e in self.index.search('session', limit=2)], ['1', '2'])
+        self.assertEqual([e['id'] for e in self.index.search('session', limit=1)], ['1'])
+        self.assertEqual(self.index.count('session'), 3)
+        self.assertEqual(self.index.count('beyonce', artist=True), 3)
+
+    def test_helpers(self):
+        self.assertEqual(tokenize("Session w/ Zoë: lead_vox"), ['session', 'w', 'zoe', 'lead', 'vox'])
+        self.assertEqual(edit_distance('vocals', 'vocasl', 2), 1)
+        self.assertEqual(edit_distance('vocals', 'drums', 2), 3)
+
+    def test_seeded_from_warehouse(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with SessionWarehouse(os.path.join(tmp, 'sessions.db')) as warehouse:
+                warehouse.upsert_events([event('9', 'Session w/ Kaytranada', 'Beat 500', start='2024-12-05T12:00:00')])
+                index = EventSearchIndex()
+                index.update(warehouse.iter_events())
+        self.assertEqual([e['id'] for e in index.search_artist('kaytra')], ['9'])
+
+
+if __name__ == '__main__':
+    unittest.main()
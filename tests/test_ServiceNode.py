@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import threading
+import time
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpMockSequence
+from googleapiclient.model import JsonModel
+
+from ServiceNode import RateLimiter, ServicePool, make_request_builder
+from src.MetricsNode import RunMetrics, bind_metrics
+
+
+class TestServiceNode(unittest.TestCase):
+    def test_rate_limiter_allows_burst_then_throttles(self):
+        """Test that the bucket allows a burst and then paces requests."""
+        limiter = RateLimiter(rate=50, burst=5)
+        started = time.monotonic()
+        for _ in range(10):
+            limiter.acquire()
+        elapsed = time.monotonic() - started
+        # 5 immediate, 5 more at 50/s
+        self.assertGreaterEqual(elapsed, 0.08)
+
+    def test_rate_limiter_disabled(self):
+        """Test that a rate of 0 never blocks."""
+        limiter = RateLimiter(rate=0, burst=1)
+        started = time.monotonic()
+        for _ in range(100):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - started, 0.05)
+
+    @patch('ServiceNode.get_sheets_credentials')
+    @patch('ServiceNode.get_credentials')
+    @patch('ServiceNode.build')
+    def test_pool_shares_credentials_and_builds_per_thread(self, mock_build, mock_creds, mock_sheet_creds):
+        """Test that credentials load once while each thread gets its own service."""
+        mock_build.side_effect = lambda *args, **kwargs: MagicMock()
+        pool = ServicePool(RateLimiter(rate=0))
+
+        services = []
+        def worker():
+            services.append((pool.calendar(), pool.calendar()))
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        mock_creds.assert_called_once()
+        mock_sheet_creds.assert_called_once()
+        self.assertEqual(mock_build.call_count, 3)
+        for first, second in services:
+            self.assertIs(first, second)
+        self.assertEqual(len({id(first) for first, _ in services}), 3)
+        self.assertIs(mock_build.call_args.kwargs['requestBuilder'], pool.request_builder)
+
+    def request(self, responses, max_retries=2):
+        request_class = make_request_builder(RateLimiter(rate=0), max_retries=max_retries, sleep=lambda s: None)
+        return request_class(HttpMockSequence(responses), JsonModel().response,
+                             'https://example.invalid/calendar', methodId='calendar.events.list')
+
+    def test_request_retries_and_records_metrics(self):
+        """Test that a throttled call is retried and measured in the bound metrics."""
+        metrics = RunMetrics()
+        request = self.request([({'status': '503'}, b'busy'), ({'status': '200'}, b'{"items": []}')])
+        with bind_metrics(metrics):
+            self.assertEqual(request.execute(), {'items': []})
+
+        call = metrics.to_dict()['api']['calendar.events.list']
+        self.assertEqual(call['calls'], 1)
+        self.assertEqual(call['retries'], 1)
+        self.assertEqual(call['errors'], 0)
+        self.assertEqual(call['response_bytes'], len(b'{"items": []}'))
+
+    def test_request_gives_up_after_retries(self):
+        """Test that persistent failures are raised and counted as errors."""
+        metrics = RunMetrics()
+        request = self.request([({'status': '503'}, b'busy')] * 3, max_retries=1)
+        with bind_metrics(metrics), self.assertRaises(HttpError):
+            request.execute()
+        call = metrics.to_dict()['api']['calendar.events.list']
+        self.assertEqual((call['errors'], call['retries']), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
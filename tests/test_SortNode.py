@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import MagicMock
+import csv
+import os
+import random
+import sys
+import tempfile
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from src.Controller import export_range
+from src.FormatterNode import FormatterNode
+from src.SortNode import ExternalSorter, external_sort
+from src.TenantNode import Tenant
+
+
+def event(day, hour, summary, calendar='primary'):
+    start = f"2025-04-{day:02d}T{hour:02d}:00:00"
+    return {'id': f"{calendar}-{day}-{hour}", 'start': start, 'end': start,
+            'summary': summary, 'description': '', 'calendar': calendar}
+
+
+class FakeCalendarService:
+    """Serves every calendar's events as one page."""
+
+    def __init__(self, events_by_calendar):
+        self.events_by_calendar = events_by_calendar
+
+    def events(self):
+        return self
+
+    def list(self, calendarId, **kwargs):
+        request = MagicMock()
+        request.execute.return_value = {'items': self.events_by_calendar[calendarId]}
+        return request
+
+
+class TestSortNode(unittest.TestCase):
+
+    def test_spilled_sort_matches_sorted(self):
+        items = [{'n': random.Random(7).randrange(100), 'i': i} for i in range(1000)]
+        random.Random(3).shuffle(items)
+        with ExternalSorter(lambda item: item['n'], spill_threshold=64, merge_width=4) as sorter:
+            sorter.extend(iter(items))
+            self.assertEqual(sorter.spilled_runs, 15)
+            result = list(sorter.merged())
+        # Stable: equal keys keep insertion order, as with sorted()
+        self.assertEqual(result, sorted(items, key=lambda item: item['n']))
+
+    def test_no_spill_below_threshold(self):
+        sorter = ExternalSorter(lambda n: -n, spill_threshold=10)
+        sorter.extend([3, 1, 2])
+        self.assertEqual(sorter.spilled_runs, 0)
+        self.assertEqual(list(sorter.merged()), [3, 2, 1])
+        self.assertEqual(list(sorter.merged()), [])
+        self.assertEqual(list(external_sort([], key=lambda n: n, spill_threshold=1)), [])
+
+    def test_formatter_rows_with_spill_match_in_memory(self):
+        events = [event(day, hour, f"Session w/ Artist {day}") for day in (5, 1, 3, 2, 4) for hour in (14, 10)]
+        in_memory = FormatterNode().format_data(events)
+        spilled = FormatterNode(spill_threshold=3).format_data(iter(events))
+        self.assertEqual(spilled, in_memory)
+
+    def test_export_range_streams_sorted_rows(self):
+        calendar = FakeCalendarService({
+            'primary': [{'id': '1', 'start': {'dateTime': '2025-04-03T10:00:00'},
+                         'end': {'dateTime': '2025-04-03T12:00:00'}, 'summary': 'Session w/ Nova'}],
+            'second': [{'id': '2', 'start': {'dateTime': '2025-04-01T10:00:00'},
+                        'end': {'dateTime': '2025-04-01T11:00:00'}, 'summary': 'Session w/ Kai'},
+                       {'id': '3', 'start': {'dateTime': '2025-04-05T10:00:00'},
+                        'end': {'dateTime': '2025-04-05T11:00:00'}, 'summary': 'Session w/ Lola'}],
+        })
+        services = MagicMock()
+        services.calendar.return_value = calendar
+        tenant = Tenant('test', 'sheet-id', ['primary', 'second'], {'primary': 'A', 'second': 'B'})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sessions.csv')
+            summary = export_range('2025-04-01', None, path, services=services, tenant=tenant,
+                                   spill_threshold=1, spill_dir=tmp)
+            with open(path, newline='', encoding='utf-8') as f:
+                rows = list(csv.reader(f))
+            self.assertEqual(os.listdir(tmp), ['sessions.csv'])
+        self.assertEqual([row[2] for row in rows[1:]], ['Kai', 'Nova', 'Lola'])
+        self.assertEqual((summary['events'], summary['rows'], summary['spilled_runs']), (3, 3, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import os
+import sys
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from StartupNode import BackgroundImporter, check_first_window, import_time_report, report_launch_to_ready
+
+
+class TestStartupNode(unittest.TestCase):
+    def test_background_importer_loads_modules(self):
+        """Test that modules are imported on the background thread."""
+        importer = BackgroundImporter(modules=('json', 'csv')).start()
+        importer.wait()
+        self.assertTrue(importer.ready())
+        self.assertIn('csv', sys.modules)
+
+    def test_background_importer_reraises_errors(self):
+        """Test that an import failure surfaces when the caller waits."""
+        importer = BackgroundImporter(modules=('module_that_does_not_exist',))
+        with self.assertRaises(ImportError):
+            importer.wait()
+
+    def test_import_time_report(self):
+        """Test that the report totals import time per top-level package."""
+        report = import_time_report(modules=('json',))
+        packages = [package for package, _ in report]
+        self.assertIn('json', packages)
+        self.assertTrue(all(seconds >= 0 for _, seconds in report))
+
+    def test_check_first_window(self):
+        """Test the time-to-first-window target check."""
+        self.assertTrue(check_first_window(0.2, target=1.0))
+        self.assertFalse(check_first_window(1.5, target=1.0))
+
+
+    def test_report_launch_to_ready(self):
+        """Test the launcher's start time is turned into launch-to-ready."""
+        self.assertAlmostEqual(report_launch_to_ready("100.0", now=102.5), 2.5)
+        self.assertIsNone(report_launch_to_ready(""))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from SummaryNode import SummaryAggregator
+
+
+HEADER = [
+    "Date", "Studio", "Artist Name", "Session Type",
+    "Start Time", "End Time", "Hours", "Paid?",
+    "Price", "Engineer Name", "Engineer Payment",
+    "Referral", "Referral Payment"
+]
+ROWS = [
+    ["2025-04-07", "Studio A", "Joe", "Engineer", "12:00", "15:00", "3.00", "Y", "300", "Jaylun", "150", "Ann", "30"],
+    ["2025-04-08", "Studio B", "Joe", "Engineer", "18:00", "20:00", "2.00", "Y", "100", "Chris", "50", "", ""],
+    ["2025-04-14", "Studio A", "Ann", "Engineer", "10:00", "11:00", "1.00", "Y", "200", "Jaylun", "100", "", ""],
+]
+
+
+class TestSummaryNode(unittest.TestCase):
+    def summary(self, **kwargs):
+        aggregator = SummaryAggregator(studio_hours_per_day=10, **kwargs)
+        rows = aggregator.aggregate([HEADER] + ROWS)
+        self.assertEqual(rows[0], SummaryAggregator.HEADER)
+        return {(row[0], row[1]): row for row in rows[1:]}
+
+    def test_totals_per_engineer(self):
+        """Test that payouts and revenue are totalled per engineer."""
+        summary = self.summary()
+        self.assertEqual(summary[("Engineer", "Jaylun")][2:7], [2, "4.00", "500.00", "250.00", "30.00"])
+        self.assertEqual(summary[("Engineer", "Chris")][2:7], [1, "2.00", "100.00", "50.00", "0.00"])
+
+    def test_totals_per_week_and_month(self):
+        """Test that rows are bucketed by ISO week and by month."""
+        summary = self.summary()
+        self.assertEqual(summary[("Week", "2025-W15")][2], 2)
+        self.assertEqual(summary[("Week", "2025-W16")][2], 1)
+        self.assertEqual(summary[("Month", "2025-04")][4], "600.00")
+
+    def test_studio_utilization(self):
+        """Test utilization against the bookable hours in the reporting window."""
+        summary = self.summary(start_date="2025-04-07", end_date="2025-04-16")
+        # Studio A: 4 hours booked out of 10 days * 10 hours
+        self.assertEqual(summary[("Studio", "Studio A")][7], "4.0")
+        # Week 16 is clipped to 3 days (14th-16th) across 2 studios
+        self.assertEqual(summary[("Week", "2025-W16")][7], "1.7")
+
+    def test_idle_studio_counts_toward_utilization(self):
+        """Test that a studio with no sessions in the window still adds bookable hours."""
+        summary = self.summary(start_date="2025-04-07", end_date="2025-04-16",
+                               studios={"Studio A", "Studio B", "Studio C"})
+        self.assertEqual(summary[("Studio", "Studio C")][2:8], [0, "0.00", "0.00", "0.00", "0.00", "0.0"])
+        # Week 16: 1 hour out of 3 days * 10 hours across 3 studios
+        self.assertEqual(summary[("Week", "2025-W16")][7], "1.1")
+
+    def test_consume_passes_rows_through(self):
+        """Test that consume yields the stream unchanged while aggregating."""
+        aggregator = SummaryAggregator()
+        self.assertEqual(list(aggregator.consume([HEADER] + ROWS)), [HEADER] + ROWS)
+        self.assertEqual(aggregator.groups["Artist"]["Joe"].sessions, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from TenantNode import Tenant, parse_tenants, load_tenants
+from FormatterNode import FormatterNode
+from cli import run_ranges
+
+
+CONFIG = {
+    'tenants': [
+        {'name': 'downtown', 'spreadsheet_id': 'sheet-1',
+         'calendars': {'primary': 'Room 1', 'b@group.calendar.google.com': 'Room 2'}},
+        {'name': 'eastside', 'spreadsheet_id': 'sheet-2',
+         'calendars': {'c@group.calendar.google.com': 'East A'}},
+    ]
+}
+
+
+class TestTenantNode(unittest.TestCase):
+    def test_load_tenants(self):
+        """Test that tenants are loaded with their calendars in order and studio names."""
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(CONFIG, f)
+        self.addCleanup(os.remove, f.name)
+
+        downtown, eastside = load_tenants(f.name)
+        self.assertEqual(downtown.name, 'downtown')
+        self.assertEqual(downtown.calendar_ids, ['primary', 'b@group.calendar.google.com'])
+        self.assertEqual(eastside.spreadsheet_id, 'sheet-2')
+        self.assertEqual(eastside.studio_map, {'c@group.calendar.google.com': 'East A'})
+
+    def test_invalid_config(self):
+        """Test that missing fields, duplicate names and empty configs are rejected."""
+        with self.assertRaisesRegex(ValueError, 'spreadsheet_id'):
+            parse_tenants({'tenants': [{'name': 'x', 'calendars': {'primary': 'A'}}]})
+        with self.assertRaisesRegex(ValueError, 'more than once'):
+            parse_tenants({'tenants': [CONFIG['tenants'][0], CONFIG['tenants'][0]]})
+        with self.assertRaises(ValueError):
+            parse_tenants({'tenants': []})
+
+    def test_formatter_uses_tenant_studio_map(self):
+        """Test that a tenant's studio names replace the built-in map."""
+        formatter = FormatterNode(studio_map={'c@group.calendar.google.com': 'East A'})
+        self.assertEqual(formatter.determine_studio('c@group.calendar.google.com'), 'East A')
+        self.assertEqual(FormatterNode().determine_studio('primary'), 'Studio A')
+
+    def test_failing_tenant_is_isolated(self):
+        """Test that one tenant's failure does not affect the other tenants' runs."""
+        tenants = parse_tenants(CONFIG)
+
+        def pipeline(start_date, end_date, tenant=None):
+            if tenant.name == 'eastside':
+                raise RuntimeError("calendar not shared")
+            return {'tenant': tenant.name, 'rows': 2}
+
+        results = list(run_ranges([('2025-01-01', None), ('2025-02-01', None)], workers=4,
+                                  pipeline=pipeline, tenants=tenants))
+        self.assertEqual(len(results), 4)
+        status = {(r['tenant'], r['start_date']): r['status'] for r in results}
+        self.assertEqual(status[('downtown', '2025-01-01')], 'ok')
+        self.assertEqual(status[('downtown', '2025-02-01')], 'ok')
+        self.assertEqual(status[('eastside', '2025-01-01')], 'error')
+        self.assertIn('calendar not shared', [r for r in results if r['status'] == 'error'][0]['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
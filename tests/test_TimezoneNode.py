@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from src.FormatterNode import FormatterNode
+from src.TenantNode import parse_tenants
+from src.TimezoneNode import TimezoneNormalizer, get_normalizer, normalize_events
+
+
+def event(start, end, summary='Session w/ Nova'):
+    return {'id': start, 'calendar': 'primary', 'start': start, 'end': end,
+            'summary': summary, 'description': ''}
+
+
+class TestTimezoneNode(unittest.TestCase):
+
+    def setUp(self):
+        self.normalizer = TimezoneNormalizer('America/New_York')
+
+    def test_values_move_to_studio_wall_clock(self):
+        normalize = self.normalizer.normalize
+        self.assertEqual(normalize('2024-12-16T16:30:00-08:00'), '2024-12-16T19:30:00-05:00')
+        self.assertEqual(normalize('2024-12-17T00:30:00Z'), '2024-12-16T19:30:00-05:00')
+        self.assertEqual(normalize('2024-07-01T12:00:00.500Z'), '2024-07-01T08:00:00.500-04:00')
+        # Already in studio time, floating, all-day and empty values pass through
+        value = '2024-12-16T19:30:00-05:00'
+        self.assertIs(normalize(value), value)
+        self.assertEqual(normalize('2024-12-16T19:30:00'), '2024-12-16T19:30:00')
+        self.assertEqual(normalize('2024-12-16'), '2024-12-16')
+        self.assertEqual(normalize(''), '')
+
+    def test_dst_transition_hours_are_exact(self):
+        normalize = self.normalizer.normalize
+        # 2024-03-10: 2:00 EST becomes 3:00 EDT (07:00 UTC); 2024-11-03: back at 06:00 UTC
+        self.assertEqual(normalize('2024-03-10T06:30:00Z'), '2024-03-10T01:30:00-05:00')
+        self.assertEqual(normalize('2024-03-10T07:30:00Z'), '2024-03-10T03:30:00-04:00')
+        self.assertEqual(normalize('2024-11-03T05:30:00Z'), '2024-11-03T01:30:00-04:00')
+        self.assertEqual(normalize('2024-11-03T06:30:00Z'), '2024-11-03T01:30:00-05:00')
+        # A source hour straddling the change is converted exactly, not cached
+        self.assertEqual(normalize('2024-03-10T02:59:00-04:30'), '2024-03-10T03:29:00-04:00')
+        self.assertEqual(normalize('2024-03-10T02:00:00-04:30'), '2024-03-10T01:30:00-05:00')
+
+    def test_events_sort_and_hours_in_studio_time(self):
+        events = [
+            event('2024-12-16T17:00:00-08:00', '2024-12-16T18:00:00-08:00', 'Session w/ West'),
+            event('2024-12-16T19:30:00-05:00', '2024-12-16T21:30:00-05:00', 'Session w/ East'),
+            event('2024-12-16', '2024-12-17', 'Session w/ Allday'),
+            # Across the fall-back change: three hours of wall clock, four elapsed
+            event('2024-11-02T23:00:00-04:00', '2024-11-03T02:00:00-05:00', 'Session w/ Overnight'),
+        ]
+        self.assertEqual(self.normalizer.normalize_events(events), 1)
+        self.assertEqual(events[0]['start'], '2024-12-16T20:00:00-05:00')
+        self.assertEqual(events[2]['start'], '2024-12-16')
+        rows = FormatterNode().format_data(events)[1:]
+        self.assertEqual([(r[2], r[4], r[6]) for r in rows], [
+            ('Overnight', '23:00', '4.00'),
+            ('Allday', '00:00', '24.0'),
+            ('East', '19:30', '2.00'),
+            ('West', '20:00', '1.00'),
+        ])
+
+    def test_shared_normalizer_and_unset_zone(self):
+        self.assertIs(get_normalizer('Europe/London'), get_normalizer('Europe/London'))
+        self.assertIsNone(get_normalizer(''))
+        events = [event('2024-12-16T16:30:00-08:00', '2024-12-16T17:30:00-08:00')]
+        self.assertEqual(normalize_events(events, ''), 0)
+        self.assertEqual(events[0]['start'], '2024-12-16T16:30:00-08:00')
+        with self.assertRaises(ValueError):
+            TimezoneNormalizer('Mars/Olympus_Mons')
+
+    def test_tenant_timezone_is_validated(self):
+        config = {'tenants': [{'name': 'la', 'spreadsheet_id': 's', 'timezone': 'America/Los_Angeles',
+                               'calendars': {'primary': 'Studio A'}}]}
+        self.assertEqual(parse_tenants(config)[0].timezone, 'America/Los_Angeles')
+        config['tenants'][0]['timezone'] = 'Nowhere/Land'
+        with self.assertRaises(ValueError):
+            parse_tenants(config)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+import gzip
+import json
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpMockSequence
+
+from src.TransportNode import (
+    CassetteMiss, CassettePlayer, CassetteRecorder, SessionHttp, load_cassette_meta, scrub, scrub_body
+)
+from src.MetricsNode import RunMetrics, bind_metrics
+from src.ServiceNode import RateLimiter, ServicePool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'path': self.path, 'user_agent': self.headers.get('User-Agent')}).encode()
+        self.send_response(200)
+        if 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestTransportNode(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.http = SessionHttp(pool_maxsize=4)
+        self.addCleanup(self.http.close)
+
+    def test_response_is_httplib2_compatible_and_gzip_decoded(self):
+        """Test that responses look like httplib2's and gzip bodies are decoded."""
+        resp, content = self.http.request(f"{self.url}/events", headers={'user-agent': 'client/1.0'})
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp['-content-encoding'], 'gzip')
+        payload = json.loads(content)
+        self.assertEqual(payload['path'], '/events')
+        self.assertIn('gzip', payload['user_agent'])
+
+    def test_connections_are_reused_across_threads(self):
+        """Test that sequential and concurrent requests reuse pooled sockets, and metrics show it."""
+        metrics = RunMetrics()
+
+        def fetch(index):
+            with bind_metrics(metrics):
+                return self.http.request(f"{self.url}/{index}")[0].status
+
+        for index in range(5):
+            fetch(index)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(list(executor.map(fetch, range(20))), [200] * 20)
+
+        self.assertEqual(self.http.stats['requests'], 25)
+        self.assertLessEqual(self.http.stats['connections_opened'], 4)
+        cache = metrics.to_dict()['caches']['http_connection']
+        self.assertEqual(cache['misses'], self.http.stats['connections_opened'])
+        self.assertEqual(cache['hits'] + cache['misses'], 25)
+
+
+class TestCassettes(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'run.jsonl.gz')
+
+    def test_recorded_exchanges_replay_without_secrets(self):
+        """Test that a cassette replays calls made through a real service, with tokens scrubbed."""
+        page = {'items': [{'id': '1', 'summary': 'Session w/ Nova'}], 'nextPageToken': 'p2'}
+        inner = HttpMockSequence([
+            ({'status': '200'}, json.dumps({'access_token': 'ya29.SECRET', 'expires_in': 3599})),
+            ({'status': '200', 'content-type': 'application/json'}, json.dumps(page)),
+            ({'status': '200', 'content-type': 'application/json'}, json.dumps({'items': []})),
+        ])
+        recorder = CassetteRecorder(self.path, http=inner, meta={'ranges': [['2024-12-01', None]]})
+        recorder.request('https://oauth2.googleapis.com/token', 'POST', body='refresh_token=1//SECRET')
+        service = build('calendar', 'v3', http=recorder)
+        first = service.events().list(calendarId='primary', maxResults=10, key='AIzaSECRET').execute()
+        service.events().list(calendarId='primary', pageToken='p2').execute()
+        recorder.close()
+
+        with gzip.open(self.path, 'rt') as f:
+            text = f.read()
+        self.assertNotIn('SECRET', text)
+        self.assertNotIn('oauth2', text)
+        self.assertEqual(load_cassette_meta(self.path), {'ranges': [['2024-12-01', None]]})
+
+        # Replayed through a ServicePool: no credentials, no network
+        player = CassettePlayer(self.path)
+        self.assertEqual(len(player), 2)
+        calendar = ServicePool(RateLimiter(rate=0), transport=player).calendar()
+        self.assertEqual(calendar.events().list(calendarId='primary', pageToken='p2').execute(), {'items': []})
+        self.assertEqual(calendar.events().list(calendarId='primary', key='AIzaOTHER', maxResults=10).execute(),
+                         first)
+        with self.assertRaises(CassetteMiss):
+            calendar.events().list(calendarId='primary', pageToken='p2').execute()
+
+    def test_replay_timing_and_body_matching(self):
+        """Test that identical URIs match on body and replay waits the recorded time when asked."""
+        inner = HttpMockSequence([({'status': '200'}, 'one'), ({'status': '200'}, 'two')])
+        recorder = CassetteRecorder(self.path, http=inner)
+        recorder.request('https://sheets.example/values:batchUpdate', 'POST', body='{"n": 1}')
+        recorder.request('https://sheets.example/values:batchUpdate', 'POST', body='{"n": 2}')
+        recorder.close()
+
+        waits = []
+        player = CassettePlayer(self.path, timing=0.5, sleep=waits.append)
+        self.assertEqual(player.request('https://sheets.example/values:batchUpdate', 'POST', body='{"n": 2}')[1], b'two')
+        resp, content = player.request('https://sheets.example/values:batchUpdate', 'POST', body='{"n": 3}')
+        self.assertEqual((resp.status, content), (200, b'one'))
+        self.assertEqual(len(waits), 2)
+
+
+    def test_scrub_keeps_event_text(self):
+        """Test that channel tokens are scrubbed and form patterns only apply to form bodies and URIs."""
+        self.assertEqual(scrub('{"token": "s3cret", "pageToken": "p2", "syncToken": "s1"}'),
+                         '{"token": "REDACTED", "pageToken": "p2", "syncToken": "s1"}')
+        event = '{"description": "door code=4471", "id": "1"}'
+        self.assertEqual(scrub_body(event, 'application/json; charset=UTF-8'), event)
+        self.assertEqual(scrub_body('code=4/abc&client_id=1', 'application/x-www-form-urlencoded'),
+                         'code=REDACTED&client_id=REDACTED')
+        batch = 'GET /calendar/v3/calendars/primary/events?key=AIzaSECRET&pageToken=p2\n\n{"note": "key=kept"}'
+        self.assertEqual(scrub_body(batch, 'multipart/mixed; boundary=x'),
+                         'GET /calendar/v3/calendars/primary/events?key=REDACTED&pageToken=p2\n\n{"note": "key=kept"}')
+
+        inner = HttpMockSequence([({'status': '200', 'content-type': 'application/json'},
+                                   '{"id": "ch1", "token": "s3cret", "description": "door code=4471"}')])
+        recorder = CassetteRecorder(self.path, http=inner)
+        recorder.request('https://www.googleapis.com/calendar/v3/calendars/primary/events/watch', 'POST',
+                         body='{"id": "ch1", "token": "s3cret"}', headers={'Content-Type': 'application/json'})
+        recorder.close()
+        player = CassettePlayer(self.path)
+        content = player.request('https://www.googleapis.com/calendar/v3/calendars/primary/events/watch', 'POST',
+                                 body='{"id": "ch1", "token": "s3cret"}')[1]
+        self.assertEqual(json.loads(content), {'id': 'ch1', 'token': 'REDACTED', 'description': 'door code=4471'})
+
+
+if __name__ == '__main__':
+    unittest.main()
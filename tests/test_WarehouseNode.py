@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+from WarehouseNode import SessionWarehouse, period_bounds
+
+
+EVENTS = [
+    {
+        'id': 'evt1', 'calendar': 'primary',
+        'start': '2025-04-10T12:00:00', 'end': '2025-04-10T15:00:00',
+        'summary': 'Session w/ Joe', 'description': 'jaylun $300',
+    },
+    {
+        'id': 'evt2', 'calendar': 'primary',
+        'start': '2025-05-02T18:00:00', 'end': '2025-05-02T20:00:00',
+        'summary': 'Joe: vocals', 'description': 'chris $100',
+    },
+    {
+        'id': 'evt3', 'calendar': 'primary',
+        'start': '2025-08-01T10:00:00', 'end': '2025-08-01T11:00:00',
+        'summary': 'Session w/ Ann', 'description': 'jaylun $200',
+    },
+]
+
+
+class TestWarehouseNode(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.warehouse = SessionWarehouse(os.path.join(self.tmpdir.name, "sessions.db"))
+        self.warehouse.upsert_events(EVENTS)
+
+    def tearDown(self):
+        self.warehouse.close()
+        self.tmpdir.cleanup()
+
+    def test_query_by_engineer_and_quarter(self):
+        """Test that sessions can be filtered by engineer and date range, case-insensitively."""
+        start_date, end_date = period_bounds(2025, 2)
+        sessions = self.warehouse.query_sessions(start_date, end_date, engineer="JAYLUN")
+        self.assertEqual([s['event_id'] for s in sessions], ['evt1'])
+
+    def test_upsert_updates_existing_event(self):
+        """Test that re-fetching an event updates it instead of duplicating it."""
+        changed = dict(EVENTS[0], description='jaylun $400')
+        self.warehouse.upsert_events([changed])
+
+        sessions = self.warehouse.query_sessions(artist="Joe")
+        self.assertEqual(len(sessions), 2)
+        self.assertEqual(sessions[0]['price'], 400.0)
+
+    def test_revenue_per_artist(self):
+        """Test revenue totals grouped by artist."""
+        totals = {t['group']: t for t in self.warehouse.totals("artist", *period_bounds(2025))}
+        self.assertEqual(totals['Joe']['revenue'], 400.0)
+        self.assertEqual(totals['Joe']['sessions'], 2)
+        self.assertEqual(totals['Ann']['hours'], 1.0)
+
+    def test_refetch_drops_deleted_events(self):
+        """Test that a refetched window deletes sessions it no longer returns and totals shrink."""
+        april = (datetime(2025, 4, 1), datetime(2025, 4, 30, 23, 59, 59))
+        may = (datetime(2025, 5, 1), datetime(2025, 5, 31, 23, 59, 59))
+        # evt2 was deleted from the calendar; the May refetch returns nothing
+        self.warehouse.upsert_formatted([], *may, calendars=['primary'])
+        totals = {t['group']: t for t in self.warehouse.totals("artist", *period_bounds(2025))}
+        self.assertEqual(totals['Joe']['revenue'], 300.0)
+        self.assertEqual(totals['Joe']['sessions'], 1)
+        # Other calendars and windows are left alone
+        self.assertEqual(self.warehouse.forget_missing(set(), *april, calendars=['second']), 0)
+        self.assertEqual(len(self.warehouse.query_sessions()), 2)
+
+    def test_invalid_group(self):
+        """Test that unknown groupings are rejected."""
+        with self.assertRaises(ValueError):
+            self.warehouse.totals("weekday")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from unittest.mock import patch
+import contextlib
+import io
+import json
+import os
+import sys
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, parent_dir)
+
+import cli
+
+
+class TestCli(unittest.TestCase):
+
+    def test_stdout_holds_only_json_lines(self):
+        """Test that pipeline prints go to stderr and stdout parses line by line as JSON."""
+        def run_ranges(ranges, *args, **kwargs):
+            for start_date, end_date in ranges:
+                # What the pipeline threads print while a range runs
+                print("DEBUG: Event Data: {'summary': 'Nova'}")
+                print(f"Sheet '{start_date}' created.")
+                yield {'start_date': start_date, 'end_date': end_date, 'status': 'ok', 'events': 2, 'rows': 2}
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with patch('cli.run_ranges', run_ranges), \
+                patch('src.ServiceNode.ServicePool.authenticate', lambda pool: pool), \
+                contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            code = cli.main(['--range', '2025-01-01:2025-01-15', '--range', '2025-01-16'])
+
+        self.assertEqual(code, 0)
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([r.get('start_date') for r in records], ['2025-01-01', '2025-01-16', None])
+        self.assertEqual(records[-1]['events'], 4)
+        self.assertIn("DEBUG: Event Data", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()